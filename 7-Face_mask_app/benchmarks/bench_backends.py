@@ -0,0 +1,114 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import time
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------------
+# Benchmark: accuracy parity, latency and memory of the classifier backends
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder with the Test folder used in the notebook:
+#   python -m benchmarks.bench_backends --test-dir "Dataset/Face Mask Dataset/Test" \
+#       --variants keras tflite-fp16 tflite-int8 onnx
+#
+# Like flow_from_directory() in the notebook, the class folders are sorted (WithMask = 0, WithoutMask = 1).
+# Each backend runs in its own process, so the memory of one doesn't count for the others.
+
+
+# Load the test images with the same preprocessing as preprocess_faces() (RGB, 224x224, / 255)
+def load_test_split(test_dir, limit=None):
+
+    classes = sorted(d for d in os.listdir(test_dir) if os.path.isdir(os.path.join(test_dir, d)))
+    images, labels = [], []
+    for label, name in enumerate(classes):
+        paths = sorted(glob.glob(os.path.join(test_dir, name, "*.png")) + glob.glob(os.path.join(test_dir, name, "*.jpg")))
+        for path in paths[:limit]:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            images.append(cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), (224, 224)))
+            labels.append(label)
+
+    faces = np.stack(images).astype("float32") / 255.0
+    return faces, np.array(labels), classes
+
+
+# Peak resident memory of this process in MB (ru_maxrss is in KB on Linux)
+def peak_rss_mb():
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Runs in a fresh process: load one backend, predict the whole test split, time batch sizes 1 and 16
+def measure(variant, test_dir, limit, repeat):
+
+    from utils.detection import load_mask_model
+
+    faces, labels, _ = load_test_split(test_dir, limit)
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    model = load_mask_model(variant)
+    load_s = time.perf_counter() - start
+
+    preds = np.concatenate([model.predict(faces[i:i + 32], verbose=0)[:, 0] for i in range(0, len(faces), 32)])
+
+    latency = {}
+    for batch in (1, 16):
+        sample = faces[:batch]
+        model.predict(sample, verbose=0)        # Warm-up
+        times = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            model.predict(sample, verbose=0)
+            times.append((time.perf_counter() - t) * 1000)
+        latency[batch] = float(np.median(times))
+
+    return {
+        "variant": variant,
+        "preds": preds,
+        "labels": labels,
+        "load_s": load_s,
+        "latency_1": latency[1],
+        "latency_16": latency[16],
+        "rss_mb": peak_rss_mb() - rss_before,
+        "size_mb": os.path.getsize(model.path) / 1e6,
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare the mask classifier backends")
+    parser.add_argument("--test-dir", required=True, help="Test folder of the dataset (one sub-folder per class)")
+    parser.add_argument("--variants", nargs="+", default=["keras", "tflite-fp16", "tflite-int8", "onnx"])
+    parser.add_argument("--limit", type=int, help="Max images per class (default: all)")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for variant in args.variants:
+        with ctx.Pool(1) as pool:
+            rows.append(pool.apply(measure, (variant, args.test_dir, args.limit, args.repeat)))
+
+    reference = rows[0]["preds"] > 0.5
+
+    print(f"{'backend':<12} | {'accuracy':>8} | {'agree w/ ' + rows[0]['variant']:>14} | {'max |Δp|':>8} | "
+          f"{'load (s)':>8} | {'1 face (ms)':>11} | {'16 faces (ms)':>13} | {'RSS (MB)':>8} | {'file (MB)':>9}")
+    print("-" * 118)
+    for row in rows:
+        pred_classes = row["preds"] > 0.5
+        accuracy = float(np.mean(pred_classes == row["labels"]))
+        agreement = float(np.mean(pred_classes == reference))
+        max_diff = float(np.max(np.abs(row["preds"] - rows[0]["preds"])))
+        print(f"{row['variant']:<12} | {accuracy * 100:>7.2f}% | {agreement * 100:>13.2f}% | {max_diff:>8.4f} | "
+              f"{row['load_s']:>8.2f} | {row['latency_1']:>11.2f} | {row['latency_16']:>13.2f} | "
+              f"{row['rss_mb']:>8.0f} | {row['size_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
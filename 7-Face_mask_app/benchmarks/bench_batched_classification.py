@@ -0,0 +1,86 @@
+import argparse
+import time
+
+import numpy as np
+
+from utils.detection import load_mask_model, preprocess_faces, classify_faces
+
+# ---------------------------------------------------------
+# Benchmark: per-face vs batched mask classification
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python -m benchmarks.bench_batched_classification --faces 1 2 5 10 20 --repeat 20
+#
+# For every number of faces N we build a synthetic 720p frame with N face boxes and compare:
+# - per-face → N calls of model.predict with batch size = 1 (the old detect_mask_dnn behaviour)
+# - batched  → 1 call of model.predict with batch size = N
+
+
+# Synthetic frame with N face boxes laid out on a grid
+def make_frame(n_faces, width=1280, height=720, face=96):
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+    cols = width // face
+    boxes = []
+    for i in range(n_faces):
+        x1 = (i % cols) * face
+        y1 = (i // cols) * face % (height - face)
+        boxes.append((x1, y1, x1 + face, y1 + face))
+
+    return frame, boxes
+
+
+# Median latency (in ms) of fn() over `repeat` runs
+def time_ms(fn, repeat):
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return float(np.median(times))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Per-face vs batched mask classification latency")
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = load_mask_model()
+
+    # Warm-up (the first Keras call builds the graph)
+    frame, boxes = make_frame(1)
+    classify_faces(model, preprocess_faces(frame, boxes))
+
+    print(f"{'faces':>5} | {'per-face (ms)':>13} | {'batched (ms)':>12} | {'speedup':>7}")
+    print("-" * 48)
+
+    for n in args.faces:
+        frame, boxes = make_frame(n)
+
+        # Old behaviour: one forward pass for every face
+        def per_face():
+            for box in boxes:
+                classify_faces(model, preprocess_faces(frame, [box]))
+
+        # New behaviour: one forward pass for the whole frame
+        def batched():
+            classify_faces(model, preprocess_faces(frame, boxes))
+
+        # Both paths must give the same labels
+        single = [classify_faces(model, preprocess_faces(frame, [box]))[0][0] for box in boxes]
+        together = [label for label, _ in classify_faces(model, preprocess_faces(frame, boxes))]
+        assert single == together, "Batched labels differ from per-face labels"
+
+        t_single = time_ms(per_face, args.repeat)
+        t_batch = time_ms(batched, args.repeat)
+        print(f"{n:>5} | {t_single:>13.1f} | {t_batch:>12.1f} | {t_single / t_batch:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_detection_skipping import read_clip
+from utils.detection import detect_faces_mode, roi_pixels
+from utils.tracking import iou_matrix, match_boxes
+
+# ---------------------------------------------------------
+# Benchmark: recall and latency of the detection modes (full / downscale / ROI / tiled)
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder on a recorded clip:
+#   python -m benchmarks.bench_detection_modes --video entrance_4k.mp4 --modes full downscale:640 tiled:2x2 tiled:3x3
+#   python -m benchmarks.bench_detection_modes --video entrance_4k.mp4 --roi 0.3 0 0.7 1 --ground-truth labels.jsonl
+#
+# A mode is written "full", "downscale:<input width>" or "tiled:<rows>x<cols>". --roi applies to every mode.
+#
+# Recall needs reference faces:
+# - --ground-truth → a JSONL file with {"type": "frame", "frame": <index>, "faces": [{"box": [x, y, w, h]}, ...]} lines
+#   (the format written by process_footage.py, e.g. a run checked / corrected by hand). If it covers several clips,
+#   only the lines whose "file" is --video are used (same path, or else same file name).
+# - otherwise the faces found by --reference (default "tiled:3x3", the most thorough mode) are used.
+# With --roi, only the reference faces whose centre is inside the ROI count: the modes don't look outside it.
+#
+# For every mode we report the median / p95 latency of the face detector per frame, the faces per frame,
+# and the recall (fraction of the reference faces found at the same place, IoU > 0.5).
+
+
+# "tiled:2x3" → {"mode": "tiled", "tiles": (2, 3)}
+def parse_mode(spec, roi=None):
+
+    name, _, value = spec.partition(":")
+    detection = {"mode": name, "roi": roi}
+    if name == "downscale" and value:
+        detection["input_width"] = int(value)
+    elif name == "tiled" and value:
+        rows, cols = value.lower().split("x")
+        detection["tiles"] = (int(rows), int(cols))
+    return detection
+
+
+# Reference boxes of one clip from a JSONL file, one list of (x, y, w, h) per frame index
+# The lines of other clips are skipped (matched by path, or by file name if the paths differ).
+def read_ground_truth(path, n_frames, video):
+
+    with open(path, encoding="utf-8") as f:
+        records = [record for record in map(json.loads, f) if record.get("type") == "frame"]
+
+    # A line without "file" belongs to the only clip of the file
+    same_path = [r for r in records if "file" not in r or os.path.abspath(r["file"]) == os.path.abspath(video)]
+    if not same_path:
+        same_path = [r for r in records if os.path.basename(r["file"]) == os.path.basename(video)]
+        clips = {r["file"] for r in same_path}
+        if len(clips) > 1:
+            raise SystemExit(f"{path} has several clips named {os.path.basename(video)}: {sorted(clips)}")
+    if not same_path:
+        raise SystemExit(f"{path} has no frame of {video}")
+
+    reference = [[] for _ in range(n_frames)]
+    for record in same_path:
+        if record["frame"] < n_frames:
+            reference[record["frame"]] = [tuple(face["box"]) for face in record["faces"]]
+    return reference
+
+
+# Keep the reference faces whose centre is inside the ROI (a mode with a ROI can't find the others)
+def inside_roi(reference, roi, w, h):
+
+    if roi is None:
+        return reference
+    x1, y1, x2, y2 = roi_pixels(roi, w, h)
+    return [[(x, y, bw, bh) for x, y, bw, bh in boxes if x1 <= x + bw / 2 < x2 and y1 <= y + bh / 2 < y2]
+            for boxes in reference]
+
+
+# Run the face detector on every frame, It returns the (x, y, w, h) boxes of every frame and the latencies (ms).
+def run(frames, detection):
+
+    outputs, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        boxes = detect_faces_mode(frame, detection)
+        latencies.append((time.perf_counter() - start) * 1000)
+        outputs.append([(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in boxes])
+    return outputs, latencies
+
+
+def recall(reference, outputs):
+
+    total, found = 0, 0
+    for ref, out in zip(reference, outputs):
+        total += len(ref)
+        if ref and out:
+            found += len(match_boxes(iou_matrix(ref, out), 0.5))
+    return found / total if total else 1.0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Recall and latency of the face detection modes")
+    parser.add_argument("--video", required=True, help="Recorded clip to process")
+    parser.add_argument("--modes", nargs="+", default=["full", "downscale:640", "tiled:2x2", "tiled:3x3"])
+    parser.add_argument("--roi", type=float, nargs=4, metavar=("X1", "Y1", "X2", "Y2"),
+                        help="Region of interest in fractions of the frame")
+    parser.add_argument("--ground-truth", help="JSONL file with the reference faces of every frame")
+    parser.add_argument("--reference", default="tiled:3x3", help="Mode used as reference without --ground-truth")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--output", help="Optional CSV file to record the numbers")
+    args = parser.parse_args()
+
+    frames = read_clip(args.video, args.max_frames)
+    if not frames:
+        raise SystemExit(f"No frames could be read from {args.video}")
+
+    roi = tuple(args.roi) if args.roi else None
+    h, w = frames[0].shape[:2]
+    if args.ground_truth:
+        reference = read_ground_truth(args.ground_truth, len(frames), args.video)
+    else:
+        reference, _ = run(frames, parse_mode(args.reference))
+    reference = inside_roi(reference, roi, w, h)
+
+    # Warm-up: the first forward pass loads the network
+    detect_faces_mode(frames[0])
+
+    rows = []
+    for spec in args.modes:
+        outputs, latencies = run(frames, parse_mode(spec, roi))
+        rows.append({
+            "mode": spec,
+            "median_ms": round(float(np.median(latencies)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "faces_per_frame": round(sum(len(out) for out in outputs) / len(frames), 2),
+            "recall": round(recall(reference, outputs), 3),
+        })
+
+    source = args.ground_truth or f"mode {args.reference}"
+    print(f"{len(frames)} frames ({w}x{h}) from {args.video}, reference: {source}" + (f", ROI {roi}" if roi else ""))
+    print(f"{'mode':>14} | {'median ms':>9} | {'p95 ms':>7} | {'faces/frame':>11} | {'recall':>6}")
+    print("-" * 60)
+    for row in rows:
+        print(f"{row['mode']:>14} | {row['median_ms']:>9} | {row['p95_ms']:>7} | {row['faces_per_frame']:>11} | "
+              f"{row['recall']:>6}")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
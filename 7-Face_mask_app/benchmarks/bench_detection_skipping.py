@@ -0,0 +1,115 @@
+import argparse
+import csv
+import time
+
+import cv2
+
+from utils.detection import load_mask_model
+from utils.live import LiveDetector
+from utils.tracking import iou_matrix, match_boxes
+
+# ---------------------------------------------------------
+# Benchmark: FPS vs accuracy of detection skipping (detect every K frames)
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder on a recorded clip:
+#   python -m benchmarks.bench_detection_skipping --video entrance.mp4 --k 1 2 3 5 10 --output skipping.csv
+#
+# K=1 (detector on every frame) is the reference. For every other K we report:
+# - fps → Frames processed per second
+# - box_recall → Fraction of the reference faces found at the same place (IoU > 0.5)
+# - label_agreement → Fraction of those faces with the same mask label as the reference
+# - detector_runs → How many frames really ran the detector (K frames + forced runs)
+
+
+# Read up to max_frames frames of the clip in memory (so decoding is not part of the timing)
+def read_clip(path, max_frames):
+
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+# Run the live detector with a given K, It returns the results of every frame and the FPS.
+def run(model, frames, k, threshold):
+
+    live = LiveDetector(model, threshold=threshold, detect_every=k)
+    outputs = []
+
+    start = time.perf_counter()
+    for frame in frames:
+        results, _ = live.process(frame.copy())
+        outputs.append(results)
+    elapsed = time.perf_counter() - start
+
+    return outputs, len(frames) / elapsed, live.stats
+
+
+# Compare the results of every frame with the reference
+def accuracy(reference, outputs):
+
+    total, found, same_label = 0, 0, 0
+    for ref, out in zip(reference, outputs):
+        total += len(ref)
+        if not ref or not out:
+            continue
+        matches = match_boxes(iou_matrix([r["box"] for r in ref], [o["box"] for o in out]), 0.5)
+        found += len(matches)
+        same_label += sum(ref[i]["label"] == out[j]["label"] for i, j in matches)
+
+    recall = found / total if total else 1.0
+    agreement = same_label / found if found else 1.0
+    return recall, agreement
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="FPS vs accuracy of detection skipping")
+    parser.add_argument("--video", required=True, help="Recorded clip to process")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 2, 3, 5, 10])
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--output", help="Optional CSV file to record the numbers")
+    args = parser.parse_args()
+
+    frames = read_clip(args.video, args.max_frames)
+    if not frames:
+        raise SystemExit(f"No frames could be read from {args.video}")
+
+    model = load_mask_model()
+    reference, _, _ = run(model, frames, 1, args.threshold)
+
+    rows = []
+    for k in args.k:
+        outputs, fps, stats = run(model, frames, k, args.threshold)
+        recall, agreement = accuracy(reference, outputs)
+        rows.append({
+            "k": k,
+            "fps": round(fps, 1),
+            "box_recall": round(recall, 3),
+            "label_agreement": round(agreement, 3),
+            "detector_runs": stats["detector_runs"],
+            "forced_runs": stats["forced_runs"],
+        })
+
+    print(f"{len(frames)} frames from {args.video}")
+    print(f"{'K':>3} | {'fps':>6} | {'box recall':>10} | {'label agreement':>15} | {'detector runs':>13} | {'forced':>6}")
+    print("-" * 70)
+    for row in rows:
+        print(f"{row['k']:>3} | {row['fps']:>6} | {row['box_recall']:>10} | {row['label_agreement']:>15} | "
+              f"{row['detector_runs']:>13} | {row['forced_runs']:>6}")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_batched_classification import time_ms
+from benchmarks.bench_detection_skipping import read_clip
+from utils.display import encode_jpeg
+
+# ---------------------------------------------------------
+# Benchmark: what the display path sends to the browser
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python -m benchmarks.bench_display --video clip.mp4 --widths 1920 960 640 --qualities 95 80 60 --fps 15
+#
+# For every viewer width and JPEG quality: encoding time, size of one frame, and the bandwidth of ONE viewer
+# at the display FPS cap, compared with the raw RGB array that st.image received before.
+# Without --video a synthetic 1080p frame is used (smooth background + shapes, closer to a camera than noise).
+
+
+def synthetic_frame(width=1920, height=1080):
+
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.dstack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                       np.full((height, width), 128, np.float32)]).astype(np.uint8)
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        cx, cy = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.circle(frame, (cx, cy), int(rng.integers(20, 120)), tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+        cv2.putText(frame, "ID 12", (cx, cy), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2)
+    return frame
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="JPEG display path: size, encoding time, bandwidth")
+    parser.add_argument("--video", default=None, help="Clip to take the frames from (default: synthetic 1080p)")
+    parser.add_argument("--widths", type=int, nargs="+", default=[1920, 960, 640])
+    parser.add_argument("--qualities", type=int, nargs="+", default=[95, 80, 60])
+    parser.add_argument("--fps", type=float, default=15, help="Display FPS cap")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    frames = read_clip(args.video, 20) if args.video else [synthetic_frame()]
+    if not frames:
+        raise SystemExit(f"Could not read {args.video}")
+    frame = frames[len(frames) // 2]
+    h, w = frame.shape[:2]
+
+    # Before: the full RGB array, converted and sent to the browser for every viewer
+    raw_kb = frame.nbytes / 1024
+    rgb_ms = time_ms(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), args.repeat)
+    print(f"Frame {w}x{h}: raw RGB = {raw_kb:.0f} kB/frame ({raw_kb * args.fps / 1024:.1f} MB/s per viewer "
+          f"at {args.fps:g} FPS), BGR→RGB {rgb_ms:.2f} ms")
+    print()
+    print(f"{'width':>6} {'quality':>8} {'encode ms':>10} {'kB/frame':>9} {'kB/s per viewer':>16} {'vs raw':>8}")
+
+    for width in args.widths:
+        for quality in args.qualities:
+            jpeg = encode_jpeg(frame, width, quality)
+            encode = time_ms(lambda: encode_jpeg(frame, width, quality), args.repeat)
+            kb = len(jpeg) / 1024
+            print(f"{min(width, w):>6} {quality:>8} {encode:>10.2f} {kb:>9.1f} {kb * args.fps:>16.0f} "
+                  f"{raw_kb / kb:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
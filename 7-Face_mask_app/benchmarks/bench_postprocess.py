@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import numpy as np
+
+from utils.detection import filter_detections
+
+# ---------------------------------------------------------
+# Microbenchmark: SSD post-processing, Python loop vs vectorized
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python -m benchmarks.bench_postprocess --faces 0 5 20 50 --repeat 2000
+#
+# It builds synthetic (200, 7) SSD output tensors with N confident faces (the rest are low-confidence slots),
+# checks that both versions return the same boxes, then times them.
+
+
+# Synthetic SSD output of one frame: 200 candidate slots, n_faces of them above the confidence threshold
+def make_detections(n_faces, slots=200, seed=0):
+
+    rng = np.random.default_rng(seed)
+    det = np.zeros((slots, 7), dtype="float32")
+    det[:, 1] = 1.0
+    det[:, 2] = rng.uniform(0.0, 0.4, slots)
+    det[:n_faces, 2] = rng.uniform(0.5, 1.0, n_faces)
+
+    # Some boxes go outside the frame (negative or > 1), like the real detector output
+    x1 = rng.uniform(-0.1, 0.9, slots)
+    y1 = rng.uniform(-0.1, 0.9, slots)
+    det[:, 3] = x1
+    det[:, 4] = y1
+    det[:, 5] = x1 + rng.uniform(0.0, 0.3, slots)
+    det[:, 6] = y1 + rng.uniform(0.0, 0.3, slots)
+    return det
+
+
+# The old detect_mask_dnn loop (one candidate at a time), kept as the reference
+def loop_postprocess(detections, w, h):
+
+    boxes = []
+    for i in range(detections.shape[0]):
+        confidence = detections[i, 2]
+        if confidence < 0.5:
+            continue
+
+        box = detections[i, 3:7] * np.array([w, h, w, h])
+        x1, y1, x2, y2 = box.astype("int")
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+
+        if x2 <= x1 or y2 <= y1:
+            continue
+        boxes.append((x1, y1, x2, y2))
+
+    return boxes
+
+
+# Median latency (in µs) of fn() over `repeat` runs
+def time_us(fn, repeat):
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e6)
+
+    return float(np.median(times))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="SSD post-processing microbenchmark")
+    parser.add_argument("--faces", type=int, nargs="+", default=[0, 5, 20, 50])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    w, h = args.width, args.height
+
+    print(f"{'faces':>5} | {'loop (us)':>9} | {'vectorized (us)':>15} | {'+NMS (us)':>9} | {'speedup':>7}")
+    print("-" * 60)
+
+    for n in args.faces:
+        det = make_detections(n)
+
+        # Both versions must keep exactly the same boxes
+        expected = [tuple(int(v) for v in box) for box in loop_postprocess(det, w, h)]
+        boxes, _ = filter_detections(det, w, h)
+        assert [tuple(box) for box in boxes.tolist()] == expected, "Vectorized boxes differ from the loop"
+
+        t_loop = time_us(lambda: loop_postprocess(det, w, h), args.repeat)
+        t_vec = time_us(lambda: filter_detections(det, w, h), args.repeat)
+        t_nms = time_us(lambda: filter_detections(det, w, h, nms_threshold=0.3), args.repeat)
+        print(f"{n:>5} | {t_loop:>9.1f} | {t_vec:>15.1f} | {t_nms:>9.1f} | {t_loop / t_vec:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import subprocess
+import sys
+
+# ---------------------------------------------------------
+# Benchmark: app startup time and cost of the first inference
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python -m benchmarks.bench_startup --image people.jpg --variants keras tflite-fp16 onnx
+#
+# --image must be a photo with at least one visible face (a webcam snapshot, a frame of a recording...):
+# on an image without faces the mask classifier is never called, and its cold start would not be measured.
+#
+# Every measurement runs in a fresh Python process (cold imports, nothing cached), and reports:
+# - import → Time to import utils.detection (nothing is loaded any more at import time)
+# - face_net / classifier → Time to load each model on first use
+# - first / second inference → detect_mask_dnn() on the image, first call (first classifier call, graph tracing...)
+#   vs warm call. The run fails if no face was classified.
+
+# The code run in the fresh process, It prints one JSON line with the timings.
+CHILD = r"""
+import json, sys, time
+import cv2
+
+t = time.perf_counter()
+from utils.detection import detect_mask_dnn, load_mask_model
+from utils.models import get_face_net, load_times
+import_s = time.perf_counter() - t
+
+t = time.perf_counter()
+get_face_net()
+model = load_mask_model(sys.argv[1])
+load_s = time.perf_counter() - t
+
+frame = cv2.imread(sys.argv[2])
+if frame is None:
+    sys.exit(f"Could not read the image {sys.argv[2]}")
+
+t = time.perf_counter()
+results = detect_mask_dnn(model, frame)
+first_s = time.perf_counter() - t
+
+# No face → the classifier was never called, the "first inference" would only be the face detector
+if len(results) == 0:
+    sys.exit(f"No face found in {sys.argv[2]}, use an image with at least one visible face")
+
+t = time.perf_counter()
+detect_mask_dnn(model, frame)
+second_s = time.perf_counter() - t
+
+times = load_times()
+print(json.dumps({
+    "import": import_s,
+    "face_net": times.get("face_net", 0.0),
+    "classifier": sum(v for k, v in times.items() if k.startswith("classifier")),
+    "load_total": load_s,
+    "first": first_s,
+    "second": second_s,
+    "faces": len(results),
+    "tensorflow_imported": "tensorflow" in sys.modules,
+}))
+"""
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Startup and first-inference timings")
+    parser.add_argument("--image", required=True, help="Photo with at least one visible face")
+    parser.add_argument("--variants", nargs="+", default=["keras", "tflite-fp16", "tflite-int8", "onnx"])
+    args = parser.parse_args()
+
+    print(f"{'backend':<12} | {'import (s)':>10} | {'face_net (s)':>12} | {'classifier (s)':>14} | "
+          f"{'1st inference (ms)':>18} | {'2nd inference (ms)':>18} | {'faces':>5} | {'TF loaded':>9}")
+    print("-" * 118)
+
+    for variant in args.variants:
+        out = subprocess.run([sys.executable, "-c", CHILD, variant, args.image], capture_output=True, text=True)
+        # A killed child (or one that exits silently) writes nothing → report the exit code instead
+        if out.returncode != 0:
+            print(f"{variant:<12} | failed: {(out.stderr.strip().splitlines() or [f'exit code {out.returncode}'])[-1]}")
+            continue
+        lines = out.stdout.strip().splitlines()
+        if not lines:
+            print(f"{variant:<12} | failed: no output (exit code {out.returncode})")
+            continue
+
+        r = json.loads(lines[-1])
+        print(f"{variant:<12} | {r['import']:>10.2f} | {r['face_net']:>12.2f} | {r['classifier']:>14.2f} | "
+              f"{r['first'] * 1000:>18.1f} | {r['second'] * 1000:>18.1f} | {r['faces']:>5} | "
+              f"{str(r['tensorflow_imported']):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import time
+
+import numpy as np
+
+from utils.tracking import Tracker, iou, iou_matrix
+
+# ---------------------------------------------------------
+# Benchmark: old list-scan tracking vs the Tracker
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python -m benchmarks.bench_tracking --people 10 100 300 500 --frames 200
+#
+# A synthetic crowd of N people walks across a 4K frame. Every frame a few people leave and new ones enter,
+# so over a shift the total number of IDs keeps growing while the number of visible people stays ~N.
+
+
+# The old live-page tracking: scalar iou() against every tracked person, greedy first match, never expires
+class ListScanTracker:
+
+    def __init__(self):
+
+        self.people = []
+        self.next_id = 1
+
+    def update(self, boxes):
+
+        ids = []
+        for box in boxes:
+            assigned_id = None
+            for person in self.people:
+                if iou(box, person["box"]) > 0.35:
+                    assigned_id = person["id"]
+                    person["box"] = box
+                    break
+            if assigned_id is None:
+                assigned_id = self.next_id
+                self.next_id += 1
+                self.people.append({"id": assigned_id, "box": box})
+            ids.append(assigned_id)
+
+        return ids
+
+
+# Synthetic crowd: it yields the list of (x, y, w, h) boxes of each frame
+def crowd(n_people, n_frames, churn=0.02, width=3840, height=2160, size=40, seed=0):
+
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 0], [width - size, height - size], size=(n_people, 2))
+    vel = rng.uniform(-3, 3, size=(n_people, 2))
+
+    for _ in range(n_frames):
+        pos = np.clip(pos + vel, 0, [width - size, height - size])
+
+        # Some people leave, new people enter somewhere else
+        leaving = rng.random(n_people) < churn
+        pos[leaving] = rng.uniform([0, 0], [width - size, height - size], size=(leaving.sum(), 2))
+
+        yield [(int(x), int(y), size, size) for x, y in pos]
+
+
+# Per-frame latency (ms): mean and last 10% of the frames (when the old tracker has grown the most)
+def run(tracker, frames):
+
+    times = []
+    for boxes in frames:
+        start = time.perf_counter()
+        tracker.update(boxes)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tail = times[-max(1, len(times) // 10):]
+    return float(np.mean(times)), float(np.mean(tail))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Tracking benchmark with hundreds of simultaneous tracks")
+    parser.add_argument("--people", type=int, nargs="+", default=[10, 100, 300, 500])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    # Quick check: the vectorized matrix gives the same IoU as the scalar function
+    boxes = [(10, 10, 50, 50), (30, 30, 50, 50), (200, 200, 10, 10)]
+    expected = np.array([[iou(a, b) for b in boxes] for a in boxes])
+    assert np.allclose(iou_matrix(boxes, boxes), expected)
+
+    print(f"{'people':>6} | {'list-scan mean/last (ms)':>24} | {'list size':>9} | "
+          f"{'Tracker mean/last (ms)':>22} | {'active tracks':>13}")
+    print("-" * 88)
+
+    for n in args.people:
+        frames = list(crowd(n, args.frames))
+
+        old = ListScanTracker()
+        old_mean, old_tail = run(old, frames)
+
+        new = Tracker(max_age=30, use_velocity=True)
+        new_mean, new_tail = run(new, frames)
+
+        print(f"{n:>6} | {old_mean:>11.2f} / {old_tail:>10.2f} | {len(old.people):>9} | "
+              f"{new_mean:>10.2f} / {new_tail:>9.2f} | {len(new):>13}")
+
+
+if __name__ == "__main__":
+    main()
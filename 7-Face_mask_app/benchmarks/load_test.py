@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_batched_classification import make_frame
+
+# ---------------------------------------------------------
+# Load test of the detection service (serve.py)
+# ---------------------------------------------------------
+# Start the service, then run it from the "7-Face_mask_app" folder (needs aiohttp):
+#   python serve.py --port 8500
+#   python -m benchmarks.load_test --url http://127.0.0.1:8500 --clients 1 8 32 --duration 20
+#   python -m benchmarks.load_test --image entrance.jpg --cameras 4
+#
+# For every number of concurrent clients, each client sends images in a loop for --duration seconds
+# (closed loop: the next request leaves when the answer arrives). We report:
+# - req/s → Successful requests per second
+# - p50 / p95 / p99 → Latency seen by the clients (ms)
+# - rejected → 503 answers (backpressure), errors → anything else that failed
+# With --cameras N the requests are spread over N camera IDs, so the tracking path is tested too.
+
+
+async def client(session, url, body, camera, deadline, latencies, counts):
+
+    params = {"camera": camera} if camera else {}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with session.post(url + "/detect", data=body, params=params) as response:
+                await response.read()
+                status = response.status
+        except Exception:
+            counts["errors"] += 1
+            continue
+
+        if status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        elif status == 503:
+            counts["rejected"] += 1
+            await asyncio.sleep(0.05)         # Back off a little, like a real client would
+        else:
+            counts["errors"] += 1
+
+
+async def run(url, body, n_clients, duration, cameras):
+
+    import aiohttp
+
+    latencies, counts = [], {"rejected": 0, "errors": 0}
+    connector = aiohttp.TCPConnector(limit=n_clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            client(session, url, body, f"cam{i % cameras}" if cameras else None, deadline, latencies, counts)
+            for i in range(n_clients)
+        ])
+        elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0.0, 0.0, 0.0)
+    return {
+        "clients": n_clients,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "ok": len(latencies),
+        **counts,
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Load test of the mask detection service")
+    parser.add_argument("--url", default="http://127.0.0.1:8500")
+    parser.add_argument("--image", help="Image to send (a synthetic 720p frame with --faces boxes otherwise)")
+    parser.add_argument("--faces", type=int, default=5)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--cameras", type=int, default=0, help="Spread the requests over N camera IDs (tracking)")
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image) if args.image else make_frame(args.faces)[0]
+    if frame is None:
+        raise SystemExit(f"Could not read {args.image}")
+    body = cv2.imencode(".jpg", frame)[1].tobytes()
+
+    print(f"{'clients':>7} | {'req/s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'ok':>6} | "
+          f"{'rejected':>8} | {'errors':>6}")
+    print("-" * 80)
+    for n in args.clients:
+        row = asyncio.run(run(args.url.rstrip("/"), body, n, args.duration, args.cameras))
+        print(f"{row['clients']:>7} | {row['req_per_s']:>7} | {row['p50_ms']:>7} | {row['p95_ms']:>7} | "
+              f"{row['p99_ms']:>7} | {row['ok']:>6} | {row['rejected']:>8} | {row['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
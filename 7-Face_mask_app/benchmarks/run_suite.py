@@ -0,0 +1,251 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_batched_classification import make_frame
+from benchmarks.bench_detection_skipping import read_clip
+from benchmarks.bench_tracking import crowd
+from utils.detection import detect_faces, load_mask_model, predict_faces, preprocess_faces, run_face_net
+from utils.drawing import draw_results
+from utils.live import LiveDetector
+from utils.models import REPO_DIR
+from utils.tracking import Tracker
+
+# ---------------------------------------------------------
+# Benchmark suite: every piece of the detection / tracking stack, time + memory, with a history
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder (CPU only is fine):
+#   python -m benchmarks.run_suite
+#   python -m benchmarks.run_suite --faces 0 1 5 20 50 --video entrance.mp4 --repeat 30
+#
+# For every number of faces N (synthetic 720p frames with N given face boxes):
+# - face_net_forward → The Caffe SSD forward pass (300x300)
+# - preprocess → Cropping / resizing / normalizing the N faces
+# - predict_per_face → N calls of model.predict with 1 face (the old behaviour)
+# - predict_batched → 1 call of model.predict with the N faces
+# - tracking → Tracker.update with N moving people
+# - annotate → Drawing the N boxes and labels
+# - end_to_end → LiveDetector.process (detection + classification + tracking on every frame), only with --video:
+#   the synthetic frames are noise, the face detector finds nobody in them and the classifier would never run.
+#
+# Every benchmark reports the median / p95 time, the peak Python + NumPy allocations (tracemalloc, measured in a
+# separate run because tracemalloc slows the code down) and the resident memory (RSS) of the process.
+#
+# Every run is appended to data/benchmarks/history.jsonl (commit, machine, config, results), or to --history.
+# data/ is ignored by git: the timings belong to the machine, not to the source tree. The baseline is the
+# last run of the same machine with the same config (--variant, --faces, --video, --max-frames, --repeat):
+# comparing a tflite-int8 run with a keras run would only measure the backend switch.
+# A benchmark more than --tolerance slower than the baseline is reported as a regression
+# (and the exit code is 1, so it can run in CI).
+
+HISTORY_PATH = os.path.join(REPO_DIR, "data", "benchmarks", "history.jsonl")
+
+
+# Current resident memory of the process in MB (Linux), or the peak if /proc is not available
+def rss_mb():
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Time fn() `repeat` times, then run it once more under tracemalloc for the peak allocations
+def measure(fn, repeat):
+
+    fn()                                    # Warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(float(np.median(times)), 3),
+        "p95_ms": round(float(np.percentile(times, 95)), 3),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+
+# Result dicts for N boxes (what the annotate stage receives)
+def fake_results(boxes):
+
+    return [
+        {"box": (x1, y1, x2 - x1, y2 - y1), "label": "With Mask" if i % 2 else "Without Mask",
+         "confidence": 0.9, "id": i + 1}
+        for i, (x1, y1, x2, y2) in enumerate(boxes)
+    ]
+
+
+# All the benchmarks for one number of faces, It returns {benchmark name: stats}.
+def run_faces(model, n_faces, repeat):
+
+    frame, boxes = make_frame(n_faces)
+    faces = preprocess_faces(frame, boxes)
+    results = {}
+
+    results["face_net_forward"] = measure(lambda: run_face_net([frame]), repeat)
+    results["preprocess"] = measure(lambda: preprocess_faces(frame, boxes), repeat)
+    if n_faces > 0:
+        per_face = lambda: [predict_faces(model, faces[i:i + 1]) for i in range(n_faces)]
+        results["predict_per_face"] = measure(per_face, repeat)
+        results["predict_batched"] = measure(lambda: predict_faces(model, faces), repeat)
+
+    # Tracking: one update per call, the people keep moving from call to call
+    people = crowd(n_faces, 10 ** 6, width=1280, height=720, size=96)
+    tracker = Tracker(use_velocity=True)
+    results["tracking"] = measure(lambda: tracker.update(next(people)), repeat)
+
+    # Annotation: always on a fresh copy, like the live page
+    boxes_results = fake_results(boxes)
+    results["annotate"] = measure(lambda: draw_results(frame.copy(), boxes_results), repeat)
+
+    return results
+
+
+# End to end on a list of frames: it returns stats per frame
+def run_end_to_end(model, frames, repeat):
+
+    live = LiveDetector(model, detect_every=1)
+    index = {"i": 0}
+
+    def step():
+        live.process(frames[index["i"] % len(frames)])
+        index["i"] += 1
+
+    return measure(step, max(repeat, len(frames)))
+
+
+def git_commit():
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine():
+
+    return {"host": platform.node(), "cpu": platform.processor() or platform.machine(),
+            "cores": os.cpu_count(), "python": platform.python_version()}
+
+
+# The last run of the same machine with the same config in the history file
+def last_run(path, this_machine, config):
+
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if run["machine"] == this_machine and run.get("config") == config:
+                last = run
+    return last
+
+
+# Compare with the baseline, It returns a list of (benchmark, old ms, new ms) that got slower than the tolerance.
+def regressions(baseline, results, tolerance):
+
+    slower = []
+    for name, stats in results.items():
+        old = baseline["results"].get(name) if baseline else None
+        if old and old["median_ms"] > 0 and stats["median_ms"] > old["median_ms"] * (1 + tolerance):
+            slower.append((name, old["median_ms"], stats["median_ms"]))
+    return slower
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark suite of the detection and tracking stack")
+    parser.add_argument("--faces", type=int, nargs="+", default=[0, 1, 5, 20, 50])
+    parser.add_argument("--video", help="Recorded clip with people, needed for the end-to-end benchmark")
+    parser.add_argument("--max-frames", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--variant", default="keras", help="Classifier backend")
+    parser.add_argument("--history", default=HISTORY_PATH, help="History file (JSON lines)")
+    parser.add_argument("--no-history", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Slowdown reported as a regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    rss_start = rss_mb()
+    model = load_mask_model(args.variant)
+    detect_faces(make_frame(1)[0])                  # Load the face detector too
+    rss_models = rss_mb()
+
+    results = {}
+    for n in args.faces:
+        for name, stats in run_faces(model, n, args.repeat).items():
+            results[f"{name}[faces={n}]"] = stats
+
+    # End to end: on the recorded clip only (real faces → the classifier and the tracker really run)
+    if args.video:
+        frames = read_clip(args.video, args.max_frames)
+        if not frames:
+            raise SystemExit(f"No frames could be read from {args.video}")
+        results[f"end_to_end[{os.path.basename(args.video)}]"] = run_end_to_end(model, frames, args.repeat)
+    else:
+        print("end_to_end skipped: it needs a recorded clip with people (--video)")
+
+    # Everything that changes the numbers apart from the code: the baseline must have the same config
+    config = {
+        "variant": args.variant, "faces": args.faces, "repeat": args.repeat,
+        "video": os.path.basename(args.video) if args.video else None,
+        "max_frames": args.max_frames if args.video else None,
+    }
+    run = {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": machine(),
+        "variant": args.variant,
+        "config": config,
+        "memory": {"rss_start_mb": round(rss_start, 1), "rss_models_mb": round(rss_models, 1),
+                   "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)},
+        "results": results,
+    }
+
+    print(f"{'benchmark':<40} | {'median ms':>9} | {'p95 ms':>8} | {'peak alloc KB':>13} | {'RSS MB':>7}")
+    print("-" * 90)
+    for name, stats in results.items():
+        print(f"{name:<40} | {stats['median_ms']:>9} | {stats['p95_ms']:>8} | {stats['peak_alloc_kb']:>13} | "
+              f"{stats['rss_mb']:>7}")
+    print(f"Memory: {run['memory']}")
+
+    baseline = last_run(args.history, run["machine"], config)
+    slower = regressions(baseline, results, args.tolerance)
+    if baseline:
+        print(f"Baseline: {baseline['time']} (commit {baseline['commit']})")
+        for name, old, new in slower:
+            print(f"REGRESSION {name}: {old} ms → {new} ms (+{(new / old - 1) * 100:.0f}%)")
+        if not slower:
+            print(f"No regression above {args.tolerance * 100:.0f}%")
+    else:
+        print(f"No baseline yet for this machine and config: {config}")
+
+    if not args.no_history:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+
+    if slower:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
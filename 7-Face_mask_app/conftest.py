@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app imports its modules as "utils.x" (it runs from this folder), the tests do the same:
+#   cd 7-Face_mask_app && python -m pytest -q
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
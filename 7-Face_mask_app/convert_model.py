@@ -0,0 +1,105 @@
+import argparse
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from utils.detection import FACE_SIZE
+from utils.models import CLASSIFIER_PATH
+
+# ---------------------------------------------------------
+# Convert MobileNetV2.h5 into lighter artifacts for the other backends
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python convert_model.py --h5 MobileNetV2.h5 --formats tflite-fp16 tflite-int8 onnx --calibration-dir "Dataset/Train"
+#
+# It writes, next to the .h5 (or in --out-dir):
+# - MobileNetV2_fp16.tflite → float16 weights (half the size, same accuracy)
+# - MobileNetV2_int8.tflite → int8 post-training quantization (needs --calibration-dir with some training images)
+# - MobileNetV2.onnx → ONNX model for OpenCV DNN (needs the tf2onnx package)
+#
+# Then choose the backend in the Settings page, or use load_mask_model("tflite-fp16") / ("tflite-int8") / ("onnx").
+
+
+# Representative images for int8 calibration: the same preprocessing as preprocess_faces() (RGB, 224x224, / 255)
+def representative_dataset(calibration_dir, count=200):
+
+    paths = sorted(glob.glob(os.path.join(calibration_dir, "**", "*.png"), recursive=True))
+    paths += sorted(glob.glob(os.path.join(calibration_dir, "**", "*.jpg"), recursive=True))
+    rng = np.random.default_rng(0)
+    if len(paths) > count:
+        paths = list(rng.choice(paths, count, replace=False))
+
+    def generator():
+        for path in paths:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            image = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), FACE_SIZE)
+            yield [image[np.newaxis].astype("float32") / 255.0]
+
+    return generator
+
+
+def convert_tflite(model, output, quantization, calibration_dir=None):
+
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        if not calibration_dir:
+            raise SystemExit("int8 quantization needs --calibration-dir (a folder of training images)")
+        # Input and output stay float32, so the backend is a drop-in replacement.
+        converter.representative_dataset = representative_dataset(calibration_dir)
+
+    with open(output, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(model, output):
+
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, FACE_SIZE[1], FACE_SIZE[0], 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=output)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Convert the Keras mask model to TFLite / ONNX")
+    parser.add_argument("--h5", default=CLASSIFIER_PATH, help="Keras model to convert")
+    parser.add_argument("--out-dir", help="Output folder (default: next to the .h5)")
+    parser.add_argument("--formats", nargs="+", default=["tflite-fp16", "tflite-int8", "onnx"],
+                        choices=["tflite-fp16", "tflite-int8", "onnx"])
+    parser.add_argument("--calibration-dir", help="Images for int8 calibration (e.g. the Train folder)")
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+
+    model = load_model(args.h5)
+    base = os.path.splitext(os.path.basename(args.h5))[0]
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.h5))
+    os.makedirs(out_dir, exist_ok=True)
+
+    for fmt in args.formats:
+        if fmt == "tflite-fp16":
+            output = os.path.join(out_dir, base + "_fp16.tflite")
+            convert_tflite(model, output, "fp16")
+        elif fmt == "tflite-int8":
+            output = os.path.join(out_dir, base + "_int8.tflite")
+            convert_tflite(model, output, "int8", args.calibration_dir)
+        else:
+            output = os.path.join(out_dir, base + ".onnx")
+            convert_onnx(model, output)
+
+        print(f"{fmt:<12} → {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,69 @@
+import time
+
 import streamlit as st
 import pandas as pd
 
+from utils.aggregates import get_aggregator
+from utils.event_store import get_event_store
+
 # Set the dashboard title
 st.title('📊 Dashboard')
 
-# Validation: Check if 'logs' exist in session_state and are not empty
+# The events (new person / label change) are read from the local event store written by the live detection.
+# The charts read the pre-aggregated buckets (per second / minute / hour), not the whole history,
+# so rendering stays fast however long the system has been running.
+store = get_event_store()
+aggregator = get_aggregator()
+
+# Filters: camera and time window
+cameras = aggregator.cameras()
+camera = st.selectbox("Camera", ["All cameras"] + cameras)
+camera_id = None if camera == "All cameras" else camera
+
+# Time window → (bucket tier, window length in seconds)
+windows = {
+    "Last 5 minutes": ("second", 300),
+    "Last hour": ("minute", 3600),
+    "Last 24 hours": ("hour", 86400),
+    "Last 7 days": ("hour", 7 * 86400),
+}
+window = st.selectbox("Time window", list(windows))
+tier, seconds = windows[window]
+since = time.time() - seconds
+
+points = aggregator.series(tier, since=since, camera_id=camera_id)
+
+# Validation: Check if there are people in the window
 # This prevents crashes if the dashboard is accessed before detection starts
-if 'logs' not in st.session_state or len(st.session_state['logs']) == 0:
-    st.info("No data yet. Take a snapshot first.")
+if len(points) == 0:
+    st.info("No data yet. Start the live detection first.")
 else:
-    # Convert the list of log dictionaries into a Pandas DataFrame for easier plotting
-    df = pd.DataFrame(st.session_state['logs'])
-    
-    # 1. Show Raw Data Table
-    st.subheader('Statistics:')
-    st.dataframe(df)
-    
-    # 2. Visualize Trends (Line Charts)
-    # Plotting 'Without Mask' counts over time (snapshots)
-    st.subheader('Number of people without masks throughout history:')
-    st.line_chart(df['without_mask'])
-    
+    # 1. Totals of new people in the window
+    totals = aggregator.totals(tier, since=since, camera_id=camera_id)
+    col1, col2 = st.columns(2)
+    col1.metric("People with masks", totals.get("With Mask", 0))
+    col2.metric("People without masks", totals.get("Without Mask", 0))
+
+    # 2. Visualize Trends (Line Charts): new people per bucket
+    df = pd.DataFrame(
+        [{"time": start, "With Mask": counts.get("With Mask", 0), "Without Mask": counts.get("Without Mask", 0)}
+         for start, counts in points]
+    )
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+    df = df.set_index("time")
+
+    # Plotting 'Without Mask' counts over time
+    st.subheader(f'Number of people without masks per {tier}:')
+    st.line_chart(df["Without Mask"])
+
     # Plotting 'With Mask' counts over time
-    st.subheader('Number of people with masks throughout history:')
-    st.line_chart(df['with_mask'])
\ No newline at end of file
+    st.subheader(f'Number of people with masks per {tier}:')
+    st.line_chart(df["With Mask"])
+
+    # 3. Show the latest events (only the last ones are read)
+    events = store.query(since=since, camera_id=camera_id, limit=200)
+    if events:
+        events = pd.DataFrame(events)
+        events["time"] = pd.to_datetime(events["ts"], unit="s")
+        st.subheader('Latest events:')
+        st.dataframe(events[["time", "camera_id", "track_id", "event", "label", "confidence"]])
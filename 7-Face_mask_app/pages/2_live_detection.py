@@ -1,39 +1,33 @@
 import streamlit as st
-import cv2
+import os
 import time
-from utils.camera import get_live_frame
-from utils.detection import load_mask_model, detect_mask_dnn
-from imutils.video import VideoStream
-import numpy as np
+import uuid
+from utils.camera_tracking import get_camera_tracking, tracking_settings
+from utils.detection import load_mask_model
+from utils.display import get_display
+from utils.live_pipeline import get_live_pipeline
+from utils.models import REPO_DIR, load_times
+from utils.metrics import FrameProfiler, get_metrics
 
 
-def iou(box1, box2):
-    x1, y1, w1, h1 = box1
-    X1, Y1, W1, H1 = x1, y1, x1 + w1, y1 + h1
-    
-    x2, y2, w2, h2 = box2
-    X2, Y2, W2, H2 = x2, y2, x2 + w2, y2 + h2
-    
-    xi1 = max(X1, X2)
-    yi1 = max(Y1, Y2)
-    xi2 = min(W1, W2)
-    yi2 = min(H1, H2)
-    
-    inter_area = max(0, xi2 - xi1) * max(0, yi2 - yi1)
-    if inter_area == 0:
-        return 0.0
-    
-    box1_area = (W1 - X1) * (H1 - Y1)
-    box2_area = (W2 - X2) * (H2 - Y2)
-    
-    union = box1_area + box2_area - inter_area
-    return inter_area / union
-
 # It places a large title at the top of the Streamlit page.
 st.title("🎥 Live Mask Detection")
 
 ip_url = st.session_state.get("ip_url", "")
 threshold = st.session_state.get("threshold", 0.5)
+detect_every = st.session_state.get("detect_every", 1)
+use_class_cache = st.session_state.get("use_class_cache", True)
+model_variant = st.session_state.get("model_variant", "keras")
+# Detection mode of this camera (full frame, downscaled input, ROI, tiles), saved per camera URL in the Settings page
+detection = st.session_state.get("camera_detection", {}).get(ip_url)
+# Trace mode (Metrics page): profile the inference of the next N frames with cProfile, 0 = off
+profile_frames = st.session_state.get("profile_frames", 0)
+metrics_file = st.session_state.get("metrics_file", "")
+# Display path (Settings page): viewer resolution, JPEG quality and display FPS cap
+display_width = st.session_state.get("display_width", 960)
+jpeg_quality = st.session_state.get("jpeg_quality", 80)
+display_fps = st.session_state.get("display_fps", 15)
+metrics = get_metrics()
 
 
 # Make sure there is a camera link.
@@ -48,32 +42,34 @@ if not ip_url:
 st.write(f"Current Camera: {ip_url}")
 
 # Loading the model
-model = load_mask_model()
-
-# Playing VideoStream
-# Initialize the video stream from the IP address and start the background thread
-# start(): This is the command that gives the camera a signal: "Start shooting and record the images to memory immediately."
-vs = VideoStream(src=ip_url).start()
-# Allow the camera sensor to warm up (auto-exposure adjustment)
-time.sleep(1.0)
+# Only the first run of the process really loads it, the next reruns and sessions reuse the same instance.
+model = load_mask_model(model_variant)
+st.caption("Model load times (s): " + ", ".join(f"{k.split(':')[0]}={v:.2f}" for k, v in load_times().items()))
 
 # empty(): function in Streamlit creates a placeholder container that can dynamically hold and update elements. This is particularly useful for replacing or clearing content in real-time without reloading the entire app.
 frame_slot = st.empty()
 
+# Display stream of this camera (utils/display.py): the annotated frame is downsized and JPEG-encoded once,
+# and every viewer of this camera (other tabs, the Camera Wall, the MJPEG endpoint) gets the same bytes.
+# The camera itself is one persistent background connection per URL (camera.py), opened by the live pipeline below:
+# it reconnects by itself if the camera glitches, and there is no warm-up sleep, we simply wait for the first frame.
+display = get_display(ip_url)
+display.configure(max_width=display_width, quality=jpeg_quality, max_fps=display_fps)
+
 # --------------------------------
 # Creating Tracking (ID) variables
 # --------------------------------
-# List of people being followed
-# If this is your first time opening the page, an empty list is created: Each item in it → Person (ID + bounding box, Last seen time)
-if "tracked_people" not in st.session_state:
-    st.session_state["tracked_people"] = []
-
-# NEXT ID
-# This is the ID counter:
-# First person to enter → gets ID = 1
-# Next → 2, then 3…
-if "next_id" not in st.session_state:
-    st.session_state["next_id"] = 1
+# The tracker keeps the people being followed (ID + bounding box + frames since last seen)
+# and the ID counter: First person to enter → gets ID = 1, Next → 2, then 3…
+# People not seen for max_age frames are forgotten, so the tracker doesn't grow forever.
+# The classification cache keeps the running mask label of every tracked person (keyed by ID),
+# so a person is classified once and not on every frame.
+# The event logger records "new_track" / "label_change" events in the event store.
+#
+# All three belong to the CAMERA, not to this browser tab (utils/camera_tracking.py): every tab and the Camera Wall
+# share them, so a person is tracked and recorded only once, whoever is watching.
+# The settings (threshold, detect_every...) are passed with each frame by its producer (the live pipeline below).
+tracking = get_camera_tracking(ip_url, model)
 
 # LIVE STATE
 # It controls the on/off operation of the live stream.
@@ -103,154 +99,106 @@ st.button("Start Live Detection", on_click=start_live)
 # Pressing → makes "live" = False
 st.button("Stop", on_click=stop_live)
 
+# ------------------------------------------------
+# Live pipeline of this camera
+# ------------------------------------------------
+# Capture → Inference/Tracking/Logging → Drawing/Encoding, each stage in its own thread (utils/live_pipeline.py).
+# The live detector runs the full detect_mask_dnn() only every K frames (Settings page),
+# in between the faces are followed with optical flow and keep their last mask label.
+# The tracker matches the boxes of the frame with the people already tracked (IoU > 0.35 ==> same person).
+# Only real events are saved (a new person, or a person whose label changed), with the time, camera and ID.
+# The events are written to the local database (data/events.db) by a background thread, so this never blocks.
+#
+# The pipeline belongs to the CAMERA: every browser tab on this camera is just a viewer of the same pipeline,
+# so the model runs once per frame and the display stream gets one producer, whatever the number of tabs.
+live_pipeline = get_live_pipeline(ip_url, model)
+
+# Settings of this tab. The tabs on the same camera share its pipeline, so they share one setting:
+# this run sets it, and if another tab changes it later, the loop below says so.
+settings = tracking_settings(threshold, detect_every, detection, use_class_cache)
+live_pipeline.configure(threshold=threshold, detect_every=detect_every, detection=detection, use_cache=use_class_cache)
+
+# Opt-in trace mode: only the inference stage is profiled (the other threads mostly wait)
+profiler = None
+if profile_frames > 0:
+    profile_path = os.path.join(REPO_DIR, "data", "profiles", f"live_{int(time.time())}")
+    profiler = FrameProfiler(profile_frames, output=profile_path)
+    live_pipeline.profile(profiler)
+
+
 # If the user presses "Start Live Detection" Button → 'live' = True
 if st.session_state["live"]:
     
+    # This run of the page is one viewer of the camera's pipeline: the first viewer starts it,
+    # the last one to leave stops it. A viewer that vanished (tab closed, session expired...) is forgotten after 10 s.
+    viewer = uuid.uuid4().hex
+    live_pipeline.attach(viewer)
+    
+    # Placeholders for the camera status and the per-stage throughput and queue depth
+    camera_slot = st.empty()
+    stats_slot = st.empty()
+    cache_slot = st.empty()
+    display_slot = st.empty()
+    settings_slot = st.empty()
+    last_stats = 0.0
+    seq = 0
+    
     # Then the loop enters. The loop continues as long as `live` equals `True`. 
-    while st.session_state["live"]:
-        
-        # get_live_frame() returns the last image coming from the VideoStream (from camera.py).
-        frame = get_live_frame(vs)
-        
-        # If the camera loses connection → break.
-        if frame is None:
-            st.error("Lost connection to camera.")
-            break
-        
-        # Running the model on the frame
-        # The list returns the following format:
-        """results.append({
-            'box': (x1, y1, x2 - x1, y2 - y1),   # (x, y, width, height)
-            'label': label,
-            'confidence': float(conf)
-        })"""
-        results = detect_mask_dnn(model, frame, threshold)
-        
-        # List of new people only (to register later). If a new person appears (new ID) → it will be placed in new_people.
-        new_people = []
-        
-        # ------------
-        # IOU Tracking
-        # ------------
-        # Rotate on each result detected in the current timeframe
-        for r in results:
-            box = r["box"]
-            assigned_id = None
-            
-            # --------------
-            # Tracking Logic
-            # --------------
-            # Attempting to match the current box with previously tracked individuals
-            # The first time someone appears on camera ==> It will not be implemented on any element, because it simply is ==> for person in []: (empty)
-            for person in st.session_state["tracked_people"]:
-                # Calculate the intersection ratio (IoU) to confirm whether it is the same person or not
-                # If IOU > 0.35 ==> This is the same person
-                if iou(box, person["box"]) > 0.35:
-                    assigned_id = person["id"]     # Recovering the old ID
-                    person["box"] = box            # Update the box's location with the new coordinates
-                    break
-            
-            # ------------------------------------
-            # Registering a new person (New Entry)
-            # ------------------------------------
-            # If no match is found (assigned_id is still None)
-            # If it's not there → Give it a new ID
-            if assigned_id is None:
-                assigned_id = st.session_state["next_id"]     # Pull a new ID
-                st.session_state["next_id"] += 1              # Increase the counter for the next person
-                
-                # Add the person to the tracked_people list
-                st.session_state["tracked_people"].append({
-                    "id": assigned_id,
-                    "box": box
-                })
-                
-                # Add it to the "new_people" list so we only count it once in the statistics
-                new_people.append(r)
-            
-            # Link the ID to the result to display it later
-            # So that we can use it while drawing on the frame.
-            r["id"] = assigned_id
-        
-        
-        # --------------------------------------------
-        # Draw the boxes and write the ID on the frame
-        # --------------------------------------------
-        for r in results:
-            # Retrieve the person's data.
-            x, y, w, h = r["box"]
-            label = r["label"]
-            conf = r["confidence"]
-            person_id = r["id"]             # Person's ID
-            
-            # Color identification: Green for the mask, red without the mask
-            color = (0, 255, 0) if label == "With Mask" else (0, 0, 255)
+    # This loop is the UI publishing, it runs in the Streamlit script thread (only this thread may call st.*).
+    # Whatever ends it (Stop button, error, another page, a rerun, the session closing), this viewer detaches.
+    try:
+        while st.session_state["live"]:
             
-            # ------- Box drawing -------
-            # frame ==> The current image coming from the camera.
-            # (x, y) ==> The top left dot of the box.
-            # (x + w, y + h) ==> The bottom right point of the box.
-            # color ==> Color of the box.
-            # 3 ==> Text thickness..
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 3)
-            
-            # Write the text over the box (ID - Status - Confirmation percentage)
-            cv2.putText(
-                frame,                                          # The current image coming from the camera.
-                f"ID {person_id} - {label} {conf*100:.1f}%",    # This is the text that will be displayed.
-                (x, y - 10),                                    # Writing location: 10 pixels above the box.
-                cv2.FONT_HERSHEY_SIMPLEX,                       # Font type.
-                0.6,                                            # Text size.
-                color,                                          # Text color (same color as the rectangle).
-                2                                               # Text thickness.
-            )
-        
-        # Display the final image in the Streamlit interface (with color conversion to RGB)
-        frame_slot.image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            # "Still watching" → keeps the pipeline alive
+            live_pipeline.heartbeat(viewer)
         
+            # If a stage failed → break.
+            error = live_pipeline.error()
+            if error is not None:
+                st.error(error)
+                break
         
-        # --------------------------
-        # Updating Records (Logging)        
-        # --------------------------
-        # If it's the first time we record logs → we create a new list.
-        if "logs" not in st.session_state:
-            st.session_state["logs"] = []
+            # Refresh the camera and pipeline statistics once per second
+            if time.time() - last_stats > 1.0:
+                camera_stats = live_pipeline.camera.stats()
+                # If the camera loses connection → show it, the camera reconnects by itself.
+                if camera_stats["status"] != "live":
+                    camera_slot.warning(f"Camera {camera_stats['status']}... (reconnects: {camera_stats['reconnects']})")
+                else:
+                    camera_slot.caption(f"Camera: {camera_stats}")
+                stats_slot.dataframe(live_pipeline.stats())
+                if live_pipeline.settings != settings:
+                    settings_slot.warning(f"Another tab on this camera changed its settings: {live_pipeline.settings}")
+                else:
+                    settings_slot.empty()
+                display_slot.caption(f"Display: {display.stats()}")
+                if use_class_cache:
+                    # How many classifier calls the cache saves
+                    cache_slot.caption(f"Classification cache: {tracking.cache.stats()}")
+                if metrics_file:
+                    metrics.write_prometheus(metrics_file)
+                last_stats = time.time()
         
-        """
-        st.session_state["logs"]
-        It is simply a variable stored within Streamlit, its function is to store data over time even if the code is rerun 1000 times.
-        Streamlit reloads the entire page on every button click or update, 
-        so we need to use session_state to store persistent values that won't be lost.
-        """
+            # Trace mode finished → say where the profile is, and switch it off
+            if profiler is not None and profiler.done:
+                st.success(f"Profile of {profile_frames} frames written to {profiler.output}.prof / .txt")
+                st.session_state["profile_frames"] = 0
+                profiler = None
         
+            # Wait for the next annotated frame of the camera (no fixed sleep: we show frames as soon as they are ready)
+            jpeg, new_seq, timestamp = display.wait_for_frame(seq, timeout=0.5)
+            if jpeg is None:
+                continue
+            seq = new_seq
         
-        
-        # Add a new record
-        # How many new people appeared wearing a mask?
-        # How many new people appeared without a mask?
-        st.session_state["logs"].append({
-            # new_people ==> This is a list of people who made their first appearance in the current frame.
-            
-            # Counting the number of people who appeared for the first time and "With Mask" for the current frame (This counts how many times this condition is true)
-            "with_mask": sum(r["label"] == "With Mask" for r in new_people),
-            # Counting the number of people who appeared for the first time and "Without Mask" for the current frame (This counts how many times this condition is true)
-            "without_mask": sum(r["label"] == "Without Mask" for r in new_people)
-        })
-        """
-        If you have two new values:
-        First: With Mask → True
-        Second: Without Mask → False
-        The sum function only adds the True values. In Python, True = 1 and False = 0.
-        Therefore, the result = 1
-        """
-        # The RESULTS WILL BE ==> 
-        """
-        logs = [
-        {"with_mask": 1, "without_mask": 0}, # Frame showing a new person wearing a mask
-        {"with_mask": 0, "without_mask": 2}, # Frame showing two new people without masks
-        {"with_mask": 0, "without_mask": 0}, # Frame with no new people
-        ...
-        ]
-        """
-        # Slight delay to reduce processor load (Optional)
-        time.sleep(0.05)
+            # Display the final image in the Streamlit interface
+            # The JPEG bytes are sent as they are: much smaller than the raw RGB array of the full camera frame.
+            with metrics.timer("display_ms"):
+                frame_slot.image(jpeg)
+            metrics.tick("frames")
+            # UI-side latency (camera capture → frame handed to the browser) and bytes sent per frame
+            metrics.observe("display_latency_ms", (time.time() - timestamp) * 1000)
+            metrics.observe("display_sent_kb", len(jpeg) / 1024)
+    
+    finally:
+        live_pipeline.detach(viewer)
@@ -1,4 +1,7 @@
 import streamlit as st
+import pandas as pd
+
+from utils.detection import DEFAULT_DETECTION, DETECTION_MODES
 
 # Set the dashboard title
 st.title("⚙️ Settings")
@@ -11,10 +14,96 @@ ip_url = st.text_input("IP Camera URL", st.session_state.get("ip_url", "http://1
 # Allows adjusting how strict the model is (Higher = fewer false positives)
 threshold = st.slider("Mask Detection Threshold", 0.3, 0.9, st.session_state.get("threshold", 0.5))
 
+# Classifier runtime
+# keras = the original .h5 model, the others are lighter files made by convert_model.py (faster on CPU-only machines)
+variants = ["keras", "tflite-fp16", "tflite-int8", "onnx"]
+model_variant = st.selectbox("Classifier backend", variants, variants.index(st.session_state.get("model_variant", "keras")))
+
+# Slider for Detection Skipping (K)
+# The full face detector + mask model run only every K frames, the faces are followed with optical flow in between.
+# 1 = detect on every frame (most accurate), higher = faster but labels are refreshed less often
+detect_every = st.slider("Run the detector every K frames", 1, 10, st.session_state.get("detect_every", 1))
+
+# Checkbox for the Classification Cache
+# A person with a confident label is not re-classified on every frame, only when the label is unsure,
+# the face box changed a lot, or every few seconds.
+use_class_cache = st.checkbox("Reuse the mask label of each tracked person", st.session_state.get("use_class_cache", True))
+
+# Face detection mode of THIS camera (each camera URL keeps its own settings)
+# - full: the whole frame resized to 300x300 (the original behaviour)
+# - downscale: the frame resized to a fixed width, keeping its aspect ratio
+# - tiled: the frame cut into overlapping tiles, best for small / distant faces on 1080p and 4K cameras
+st.subheader("Face detection for this camera")
+camera_detection = st.session_state.get("camera_detection", {})
+detection = {**DEFAULT_DETECTION, **camera_detection.get(ip_url, {})}
+
+mode = st.selectbox("Detection mode", DETECTION_MODES, DETECTION_MODES.index(detection["mode"]))
+input_width = st.slider("Detector input width (downscale mode)", 160, 1280, detection["input_width"], step=32)
+rows = st.slider("Tile rows (tiled mode)", 1, 4, detection["tiles"][0])
+cols = st.slider("Tile columns (tiled mode)", 1, 4, detection["tiles"][1])
+
+# Region of interest: only this part of the frame is analyzed (e.g. the doorway), in % of the frame
+roi = detection["roi"] or (0.0, 0.0, 1.0, 1.0)
+roi_x = st.slider("Region of interest: left → right (%)", 0, 100, (int(roi[0] * 100), int(roi[2] * 100)))
+roi_y = st.slider("Region of interest: top → bottom (%)", 0, 100, (int(roi[1] * 100), int(roi[3] * 100)))
+roi = (roi_x[0] / 100, roi_y[0] / 100, roi_x[1] / 100, roi_y[1] / 100)
+
+# Display in the browser (Live Detection + Camera Wall pages)
+# The annotated frame is downsized to this width and JPEG-encoded once, whatever the number of viewers.
+# Display FPS → how many frames per second are sent to the browser at most, independently of the detection.
+st.subheader("Display")
+display_width = st.slider("Viewer width (px)", 320, 1920, st.session_state.get("display_width", 960), step=32)
+jpeg_quality = st.slider("JPEG quality", 30, 95, st.session_state.get("jpeg_quality", 80))
+display_fps = st.slider("Display FPS cap", 1, 30, st.session_state.get("display_fps", 15))
+
+# Cameras of the wall (Camera Wall page): one row per camera
+# max_fps → How many frames per second of this camera are analyzed at most (the others are skipped),
+# so a busy camera can't take all the CPU of the shared inference worker.
+st.subheader("Camera wall")
+cameras = st.session_state.get("cameras", [{"name": "Camera 1", "url": ip_url, "max_fps": 5.0}])
+cameras = st.data_editor(
+    pd.DataFrame(cameras, columns=["name", "url", "max_fps"]),
+    num_rows="dynamic",
+    use_container_width=True,
+)
+
+# Keep only the complete rows (a camera needs a URL), the name defaults to the URL.
+# An empty cell of the editor is NaN (or None), not an empty string → checked with pd.isna, not with `or`.
+def wall_cameras(table):
+    rows = []
+    for row in table.to_dict("records"):
+        url = row["url"].strip() if isinstance(row["url"], str) else ""
+        if not url:
+            continue
+        name = str(row["name"]).strip() if not pd.isna(row["name"]) else ""
+        rows.append({"name": name or url, "url": url,
+                     "max_fps": float(row["max_fps"]) if pd.notna(row["max_fps"]) else 5.0})
+    return rows
+
+wall = wall_cameras(cameras)
+# The wall shows one tile per camera: a name or a URL used twice would make two rows share (or hide) a tile
+duplicates = sorted({cam[key] for key in ("name", "url") for cam in wall if sum(c[key] == cam[key] for c in wall) > 1})
+
 # Save Button Logic
 if st.button("Save Settings"):
     
+    if duplicates:
+        st.error(f"Every camera of the wall needs its own name and URL, used twice: {', '.join(duplicates)}")
+        st.stop()
+    
     # Update the global session state so these values are accessible in other pages
     st.session_state["ip_url"] = ip_url
     st.session_state["threshold"] = threshold
+    st.session_state["detect_every"] = detect_every
+    st.session_state["use_class_cache"] = use_class_cache
+    st.session_state["model_variant"] = model_variant
+    st.session_state["display_width"] = display_width
+    st.session_state["jpeg_quality"] = jpeg_quality
+    st.session_state["display_fps"] = display_fps
+    camera_detection[ip_url] = {
+        "mode": mode, "input_width": input_width, "tiles": (rows, cols), "overlap": detection["overlap"],
+        "roi": None if roi == (0.0, 0.0, 1.0, 1.0) else roi,
+    }
+    st.session_state["camera_detection"] = camera_detection
+    st.session_state["cameras"] = wall
     st.success('Settings saved')
\ No newline at end of file
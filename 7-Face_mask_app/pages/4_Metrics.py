@@ -0,0 +1,80 @@
+import os
+
+import streamlit as st
+import pandas as pd
+
+from utils.display import start_mjpeg_server
+from utils.metrics import get_metrics, start_metrics_server
+from utils.models import REPO_DIR
+
+# Set the page title
+st.title("⏱️ Metrics")
+
+# Where the time of the live loop goes: every stage records its duration (see utils/metrics.py)
+# - stage_* → Time of each pipeline stage (capture, inference, annotate)
+# - face_net_forward, preprocess, mask_predict, detect_faces, optical_flow, tracking, classify → Inside the inference
+# - draw, display → Drawing the boxes, and sending the frame to the browser (frame_slot.image)
+# - display_encode, display_latency → JPEG encoding, and camera capture → frame handed to the browser
+metrics = get_metrics()
+
+summary = metrics.summary()
+if len(summary) == 0:
+    st.info("No data yet. Start the live detection first.")
+else:
+    # 1. Frames per second, faces per frame and bytes sent to the browser
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Displayed FPS", f"{metrics.rate('frames'):.1f}")
+    faces = summary.get("faces_per_frame")
+    col2.metric("Faces per frame (mean)", faces["mean"] if faces else 0)
+    sent = summary.get("display_sent_kb")
+    col3.metric("Sent to the browser (kB/s)", f"{metrics.rate('frames') * sent['mean']:.0f}" if sent else 0)
+
+    # 2. Latency percentiles of every stage (over the last 1000 values)
+    timers = pd.DataFrame([{"stage": name[:-3], **stats} for name, stats in summary.items() if name.endswith("_ms")])
+    st.subheader("Latency per stage (ms)")
+    st.dataframe(timers.set_index("stage"))
+
+    if st.button("Reset the metrics"):
+        metrics.reset()
+        st.rerun()
+
+# 3. Export in Prometheus text format
+st.subheader("Export")
+
+# Local endpoint: only one server per process, it keeps running until the app stops
+port = st.number_input("Metrics endpoint port", 1024, 65535, st.session_state.get("metrics_port", 9108))
+if st.button("Start the /metrics endpoint"):
+    try:
+        start_metrics_server(int(port))
+        st.session_state["metrics_port"] = int(port)
+        st.success(f"Metrics served at http://localhost:{int(port)}/metrics")
+    except OSError as e:
+        st.error(f"Could not start the endpoint: {e}")
+
+# MJPEG stream of every camera, for viewers outside Streamlit (an <img> tag, VLC, a video wall...)
+# The clients get the frames already encoded for the Streamlit pages, nothing is encoded again per client.
+mjpeg_port = st.number_input("MJPEG endpoint port", 1024, 65535, st.session_state.get("mjpeg_port", 8600))
+if st.button("Start the MJPEG endpoint"):
+    try:
+        start_mjpeg_server(int(mjpeg_port))
+        st.session_state["mjpeg_port"] = int(mjpeg_port)
+        # camera = the camera URL (URL-encoded) for the Live Detection page, wall:<name> for a camera of the wall
+        st.success(f"Streams served at http://localhost:{int(mjpeg_port)}/stream?camera=...")
+    except OSError as e:
+        st.error(f"Could not start the endpoint: {e}")
+
+# File: rewritten every second by the live page (e.g. for the node_exporter textfile collector)
+default_file = os.path.join(REPO_DIR, "data", "metrics.prom")
+metrics_file = st.text_input("Metrics file (empty = off)", st.session_state.get("metrics_file", ""), placeholder=default_file)
+
+# 4. Trace mode: cProfile over the inference of the next N frames
+# The profile is written to data/profiles/ (.prof for snakeviz / pstats, .txt with the top functions).
+profile_frames = st.number_input("Profile the next N frames (0 = off)", 0, 10000, st.session_state.get("profile_frames", 0))
+
+if st.button("Save"):
+    st.session_state["metrics_file"] = metrics_file
+    st.session_state["profile_frames"] = int(profile_frames)
+    st.success("Saved, it applies the next time the live detection starts")
+
+with st.expander("Prometheus text"):
+    st.code(metrics.to_prometheus(), language="text")
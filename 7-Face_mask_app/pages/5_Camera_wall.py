@@ -0,0 +1,111 @@
+import time
+import uuid
+
+import streamlit as st
+
+from utils.detection import load_mask_model
+from utils.display import get_display
+from utils.inference_worker import get_inference_worker
+
+# Set the page title
+st.title("🧱 Camera Wall")
+
+cameras = st.session_state.get("cameras", [])
+threshold = st.session_state.get("threshold", 0.5)
+detect_every = st.session_state.get("detect_every", 1)
+use_class_cache = st.session_state.get("use_class_cache", True)
+model_variant = st.session_state.get("model_variant", "keras")
+camera_detection = st.session_state.get("camera_detection", {})
+display_width = st.session_state.get("display_width", 960)
+jpeg_quality = st.session_state.get("jpeg_quality", 80)
+display_fps = st.session_state.get("display_fps", 15)
+
+# Make sure there are cameras
+if not cameras:
+    st.warning("Please go to the Settings page and add the cameras of the wall.")
+    st.stop()
+
+# One model and ONE inference worker for the whole process (utils/inference_worker.py):
+# every camera is analyzed by the same thread in turn (round-robin, with the FPS cap of each camera),
+# and every browser tab showing the wall only reads the latest annotated frames.
+# The cameras are registered only while the wall is running (see below), so the worker does nothing
+# when no wall page is open.
+model = load_mask_model(model_variant)
+worker = get_inference_worker(model)
+
+# Register the cameras of the wall for this viewer (calling it again also counts as a view)
+def register_cameras(viewer):
+    for cam in cameras:
+        worker.add_camera(
+            cam["name"], cam["url"], max_fps=cam["max_fps"], threshold=threshold, detect_every=detect_every,
+            detection=camera_detection.get(cam["url"]), use_cache=use_class_cache, viewer=viewer,
+        )
+
+for cam in cameras:
+    # Display stream of the camera (utils/display.py). It is the same stream as on the Live Detection page
+    # (one per camera URL, one producer), so the wall keeps the full display width: the tile scales it down.
+    get_display(cam["url"]).configure(max_width=display_width, quality=jpeg_quality, max_fps=display_fps)
+
+# LIVE STATE (same on/off logic as the Live Detection page)
+if "wall_live" not in st.session_state:
+    st.session_state["wall_live"] = False
+
+def start_wall():
+    st.session_state["wall_live"] = True
+
+def stop_wall():
+    st.session_state["wall_live"] = False
+
+st.button("Start the wall", on_click=start_wall)
+st.button("Stop", on_click=stop_wall)
+
+# Grid: up to 3 cameras per row, one placeholder per camera
+n_cols = min(3, len(cameras))
+slots = {}
+for i in range(0, len(cameras), n_cols):
+    for cam, col in zip(cameras[i:i + n_cols], st.columns(n_cols)):
+        col.caption(cam["name"])
+        slots[cam["url"]] = col.empty()
+
+stats_slot = st.empty()
+error_slot = st.empty()
+
+if st.session_state["wall_live"]:
+
+    shown = {}              # Last output shown for each camera (so the same frame is not sent twice)
+    last_stats = 0.0
+
+    # This run of the page is one viewer of the worker. Whatever ends the loop (Stop button, another page, a rerun,
+    # the session closing), it detaches: the cameras nobody else shows stop being analyzed right away.
+    viewer = uuid.uuid4().hex
+    register_cameras(viewer)
+
+    try:
+        while st.session_state["wall_live"]:
+
+            for cam in cameras:
+                jpeg, _, seq = worker.latest(cam["url"])
+                if jpeg is None:
+                    # No frame yet, or the worker forgot the camera (no latest() for a while) → register it again
+                    register_cameras(viewer)
+                    continue
+                if shown.get(cam["url"]) != seq:
+                    slots[cam["url"]].image(jpeg)
+                    shown[cam["url"]] = seq
+
+            # Per-camera statistics of the worker, once per second
+            if time.time() - last_stats > 1.0:
+                stats = worker.stats()
+                stats_slot.dataframe(stats)
+                # Errors of the cameras whose last frame failed (cleared as soon as they work again)
+                errors = [f"{row['camera']}: {row['error']}" for row in stats if row["error"]]
+                if errors:
+                    error_slot.warning("Errors: " + " | ".join(errors))
+                else:
+                    error_slot.empty()
+                last_stats = time.time()
+
+            # The wall never refreshes faster than ~20 times per second
+            time.sleep(0.05)
+    finally:
+        worker.detach(viewer)
@@ -0,0 +1,296 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+# ---------------------------------------------------------
+# Offline batch processing of recorded footage and image folders
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder:
+#   python process_footage.py recordings/ snapshots/ --output audit.jsonl --workers 4 --every 2
+#
+# - Every video is a task, and image folders are cut into tasks of --chunk-size images (a folder of 10k images uses
+#   all the cores, not one). The tasks are spread over a pool of processes (one per core by default).
+# - Inside a task, the video is decoded in a separate thread while the main thread runs the detection,
+#   the IoU tracker gives an ID to every person (see utils/live.py).
+# - --every N processes only 1 frame out of N, --detect-every K runs the detector every K processed frames.
+# - The results are streamed to the output while the footage is processed:
+#     JSONL → one {"type": "frame"} line per processed frame, one {"type": "track"} line per person at the end of each video
+#     Parquet → <output>_faces.parquet (one row per face) and <output>_tracks.parquet (needs pyarrow)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".mpg", ".mpeg", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# Turn the inputs (files and folders) into tasks: one per video, one per chunk of chunk_size images of a folder
+def find_tasks(inputs, chunk_size=200):
+
+    tasks = []
+    for path in inputs:
+        if os.path.isfile(path):
+            kind = "video" if path.lower().endswith(VIDEO_EXTENSIONS) else "images"
+            tasks.append((kind, path, [path] if kind == "images" else None))
+            continue
+
+        images = []
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    tasks.append(("video", full, None))
+                elif name.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(full)
+        for start in range(0, len(images), chunk_size):
+            chunk = images[start:start + chunk_size]
+            tasks.append(("images", f"{path} [{start + 1}-{start + len(chunk)}]", chunk))
+
+    return tasks
+
+
+# Decode the frames in a separate thread, It yields (frame_index, time_s, frame).
+# The queue is bounded and blocking: offline we never drop frames, the decoder just waits for the detector.
+def decoded_frames(path, every=1, queue_size=32):
+
+    frames = queue.Queue(maxsize=queue_size)
+    done = object()
+
+    def decode():
+        cap = cv2.VideoCapture(path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        index = 0
+        while True:
+            # grab() still DECODES every frame (FFmpeg has to, the next frames depend on it): for the frames we
+            # don't need, it only skips retrieve() (colour conversion + copy). So --every saves the detection and
+            # that conversion, not the decoding. Skipping the decoding itself would need a seek
+            # (cap.set(cv2.CAP_PROP_POS_FRAMES, ...)), which only pays off for strides longer than a keyframe interval.
+            if not cap.grab():
+                break
+            if index % every == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    frames.put((index, index / fps if fps else None, frame))
+            index += 1
+        cap.release()
+        frames.put(done)
+
+    threading.Thread(target=decode, daemon=True).start()
+
+    while True:
+        item = frames.get()
+        if item is done:
+            return
+        yield item
+
+
+# Settings and output queue of a worker process (set by init_worker)
+_worker = {}
+
+
+def init_worker(records, options):
+
+    # One process per core already → no need for OpenCV threads inside each process
+    if options["workers"] > 1:
+        cv2.setNumThreads(1)
+
+    _worker["records"] = records
+    _worker["options"] = options
+
+
+def face_records(results):
+
+    return [
+        {"id": r["id"], "box": list(r["box"]), "label": r["label"], "confidence": round(r["confidence"], 4)}
+        for r in results
+    ]
+
+
+# Process one task in a worker process, It returns (task path, number of processed frames).
+def process_task(task):
+
+    from utils.detection import detect_mask_dnn, load_mask_model
+    from utils.live import LiveDetector
+
+    kind, path, images = task
+    options = _worker["options"]
+    records = _worker["records"]
+    model = load_mask_model(options["variant"])
+
+    batch = []
+    count = 0
+
+    def flush():
+        if batch:
+            records.put(list(batch))
+            batch.clear()
+
+    if kind == "images":
+        for image_path in images:
+            frame = cv2.imread(image_path)
+            if frame is None:
+                continue
+            results = detect_mask_dnn(model, frame, options["threshold"])
+            for i, r in enumerate(results):
+                r["id"] = i + 1
+            batch.append({"type": "frame", "file": image_path, "frame": 0, "time_s": None, "faces": face_records(results)})
+            count += 1
+            if len(batch) >= 100:
+                flush()
+        flush()
+        return path, count
+
+    live = LiveDetector(model, threshold=options["threshold"], detect_every=options["detect_every"])
+    tracks = {}
+
+    for index, time_s, frame in decoded_frames(path, options["every"]):
+        results, _ = live.process(frame)
+        batch.append({"type": "frame", "file": path, "frame": index, "time_s": time_s, "faces": face_records(results)})
+        count += 1
+
+        # Per-track summary: first/last frame and how many frames with / without mask
+        for r in results:
+            track = tracks.setdefault(r["id"], {"first_frame": index, "with_mask": 0, "without_mask": 0})
+            track["last_frame"] = index
+            track["with_mask" if r["label"] == "With Mask" else "without_mask"] += 1
+
+        if len(batch) >= 100:
+            flush()
+
+    for track_id, track in tracks.items():
+        label = "With Mask" if track["with_mask"] >= track["without_mask"] else "Without Mask"
+        batch.append({"type": "track", "file": path, "id": track_id, "label": label, **track})
+    flush()
+
+    return path, count
+
+
+# Writes the records to JSONL (or Parquet) while the workers produce them
+class ResultWriter:
+
+    def __init__(self, output, fmt):
+
+        self.fmt = fmt
+        self.output = output
+        self.rows = {"faces": [], "tracks": []}
+        self.writers = {}
+
+        if fmt == "jsonl":
+            self.file = open(output, "w", encoding="utf-8")
+
+    def write(self, records):
+
+        if self.fmt == "jsonl":
+            for record in records:
+                self.file.write(json.dumps(record) + "\n")
+            return
+
+        # Parquet: one row per face, and one row per track
+        for record in records:
+            if record["type"] == "track":
+                self.rows["tracks"].append({k: v for k, v in record.items() if k != "type"})
+                continue
+            for face in record["faces"]:
+                x, y, w, h = face["box"]
+                self.rows["faces"].append({
+                    # NaN instead of None for images, so the column type stays float in every row group
+                    "file": record["file"], "frame": record["frame"],
+                    "time_s": record["time_s"] if record["time_s"] is not None else float("nan"),
+                    "id": face["id"], "x": x, "y": y, "w": w, "h": h,
+                    "label": face["label"], "confidence": face["confidence"],
+                })
+        for name in self.rows:
+            if len(self.rows[name]) >= 10000:
+                self.flush_parquet(name)
+
+    def flush_parquet(self, name):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.rows[name]:
+            return
+        table = pa.Table.from_pylist(self.rows[name])
+        if name not in self.writers:
+            base = os.path.splitext(self.output)[0]
+            self.writers[name] = pq.ParquetWriter(f"{base}_{name}.parquet", table.schema)
+        self.writers[name].write_table(table)
+        self.rows[name].clear()
+
+    def close(self):
+
+        if self.fmt == "jsonl":
+            self.file.close()
+            return
+        for name in self.rows:
+            self.flush_parquet(name)
+        for writer in self.writers.values():
+            writer.close()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Headless mask detection on recorded videos and image folders")
+    parser.add_argument("inputs", nargs="+", help="Video files, image files or folders")
+    parser.add_argument("--output", default="results.jsonl", help="Output file")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of processes")
+    parser.add_argument("--every", type=int, default=1, help="Process 1 frame out of N")
+    parser.add_argument("--detect-every", type=int, default=1, help="Run the detector every K processed frames")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--variant", default="keras", help="Classifier backend (keras, tflite-fp16, tflite-int8, onnx)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Images per task for the image folders")
+    args = parser.parse_args()
+
+    tasks = find_tasks(args.inputs, max(1, args.chunk_size))
+    if not tasks:
+        raise SystemExit("No videos or images found.")
+
+    # Longest videos first, so one big file doesn't start last
+    tasks.sort(key=lambda task: os.path.getsize(task[1]) if task[0] == "video" else 0, reverse=True)
+    workers = max(1, min(args.workers, len(tasks)))
+    options = {
+        "workers": workers, "every": max(1, args.every), "detect_every": args.detect_every,
+        "threshold": args.threshold, "variant": args.variant,
+    }
+
+    ctx = multiprocessing.get_context("spawn")
+    records = ctx.Queue(maxsize=256)
+    writer = ResultWriter(args.output, args.format)
+
+    # Writer thread: streams the records to the output as they arrive (None = end)
+    def write_loop():
+        while True:
+            item = records.get()
+            if item is None:
+                break
+            writer.write(item)
+
+    write_thread = threading.Thread(target=write_loop, daemon=True)
+    write_thread.start()
+
+    start = time.perf_counter()
+    total = 0
+    try:
+        with ctx.Pool(workers, initializer=init_worker, initargs=(records, options)) as pool:
+            for path, count in pool.imap_unordered(process_task, tasks):
+                total += count
+                elapsed = time.perf_counter() - start
+                print(f"{path}: {count} frames  (total {total} frames, {total / elapsed:.1f} frames/s)")
+    finally:
+        # Even if a worker raised (or Ctrl+C): write what was already produced and close the output properly,
+        # so the JSONL ends on a complete line and the Parquet files get their footer.
+        records.put(None)
+        write_thread.join()
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {total} frames from {len(tasks)} tasks in {elapsed:.1f} s "
+          f"→ {total / elapsed:.1f} frames/s with {workers} workers. Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
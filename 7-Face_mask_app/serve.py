@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+import queue
+import time
+
+import cv2
+import numpy as np
+
+from utils.detection import load_mask_model
+from utils.engine import DetectionEngine
+from utils.event_store import TrackEventLogger, get_event_store
+from utils.tracking import Tracker
+
+# ---------------------------------------------------------
+# Local HTTP / WebSocket mask detection service
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder (needs the aiohttp package: pip install aiohttp):
+#   python serve.py --port 8500 --concurrency 16 --workers 2 --max-batch 8
+#
+# Endpoints:
+# - POST /detect → Body = one image (JPEG / PNG bytes). Query parameters:
+#       threshold → Mask threshold between 0 and 1 (default: --threshold), anything else → 400
+#       camera → (Optional) Camera ID: the faces get a track "id" from the tracker of this camera,
+#                and new people / label changes are recorded and sent to the WebSocket clients.
+#                The tracker of a camera that sent nothing for --camera-timeout seconds is forgotten.
+#   Answer: {"faces": [{"box": [x, y, w, h], "label": ..., "confidence": ..., "id": ...}], "latency_ms": ...}
+# - GET /ws/events?camera=door → WebSocket, one JSON message per track event (all cameras without ?camera=)
+# - GET /health → Engine and queue statistics
+#
+# The model runs in the DetectionEngine threads (utils/engine.py), never in the event loop:
+# the requests that arrive together are micro-batched (one face detector pass, one mask model pass).
+# Backpressure: at most --concurrency requests are processed at the same time, at most --max-waiting more can wait,
+# after that (or if the engine queue is full) the service answers 503 + Retry-After right away.
+
+try:
+    from aiohttp import WSMsgType, web
+except ImportError:
+    web = None
+
+
+class MaskService:
+
+    def __init__(self, engine, threshold=0.5, concurrency=16, max_waiting=64, timeout=10.0, camera_timeout=300.0):
+
+        self.engine = engine
+        self.threshold = threshold
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.camera_timeout = camera_timeout
+
+        self.slots = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+
+        # Per-camera tracking: the frames of one camera are tracked in the order they arrive
+        self.trackers = {}
+        self.loggers = {}
+        self.camera_locks = {}
+        self.camera_last_seen = {}
+
+        # WebSocket clients: (camera filter, queue of events)
+        self.clients = set()
+
+        self.stats = {"requests": 0, "rejected": 0, "errors": 0}
+
+    async def detect(self, request):
+
+        # Bad parameters → 400 right away, before taking a slot
+        try:
+            threshold = float(request.query.get("threshold", self.threshold))
+        except ValueError:
+            threshold = None
+        if threshold is None or not 0.0 <= threshold <= 1.0:
+            self.stats["errors"] += 1
+            return web.json_response({"error": "threshold must be a number between 0 and 1"}, status=400)
+
+        # Backpressure: too many requests already waiting → reject now instead of queueing forever
+        if self.slots.locked() and self.waiting >= self.max_waiting:
+            return self.overloaded()
+
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        start = time.perf_counter()
+        try:
+            body = await request.read()
+            camera_id = request.query.get("camera")
+
+            # Decoding the image is CPU work too → in a thread, not in the event loop
+            loop = asyncio.get_running_loop()
+            frame = await loop.run_in_executor(None, cv2.imdecode, np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                self.stats["errors"] += 1
+                return web.json_response({"error": "The body is not a JPEG / PNG image"}, status=400)
+
+            if camera_id is None:
+                results = await self.run_engine("http", frame, threshold)
+            else:
+                results = await self.track(camera_id, frame, threshold)
+        except queue.Full:
+            return self.overloaded()
+        except asyncio.TimeoutError:
+            self.stats["errors"] += 1
+            return web.json_response({"error": "Timeout"}, status=504)
+        finally:
+            self.slots.release()
+
+        self.stats["requests"] += 1
+        return web.json_response({"faces": results, "latency_ms": round((time.perf_counter() - start) * 1000, 2)})
+
+    def overloaded(self):
+
+        self.stats["rejected"] += 1
+        return web.json_response({"error": "Overloaded, retry later"}, status=503, headers={"Retry-After": "1"})
+
+    # Send the frame to the engine (micro-batching thread) and wait for its results without blocking the loop
+    async def run_engine(self, camera_id, frame, threshold):
+
+        future = self.engine.submit(camera_id, frame, threshold)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+    # Detection + tracking of one camera, the events are recorded and broadcast to the WebSocket clients
+    async def track(self, camera_id, frame, threshold):
+
+        self.evict_idle_cameras()
+        self.camera_last_seen[camera_id] = time.time()
+        if camera_id not in self.trackers:
+            self.trackers[camera_id] = Tracker(use_velocity=True)
+            self.loggers[camera_id] = TrackEventLogger(get_event_store(), camera_id=camera_id)
+            self.camera_locks[camera_id] = asyncio.Lock()
+
+        async with self.camera_locks[camera_id]:
+            results = await self.run_engine(camera_id, frame, threshold)
+            ids, _ = self.trackers[camera_id].update([r["box"] for r in results])
+            for r, track_id in zip(results, ids):
+                r["id"] = track_id
+            self.broadcast(self.loggers[camera_id].update(results))
+
+        return results
+
+    # Forget the trackers of the cameras that sent nothing for camera_timeout seconds (the dicts don't grow forever).
+    # A camera with a request in progress is kept.
+    def evict_idle_cameras(self):
+
+        now = time.time()
+        for camera_id, last_seen in list(self.camera_last_seen.items()):
+            if now - last_seen > self.camera_timeout and not self.camera_locks[camera_id].locked():
+                for cameras in (self.trackers, self.loggers, self.camera_locks, self.camera_last_seen):
+                    del cameras[camera_id]
+
+    def broadcast(self, events):
+
+        for camera_filter, events_queue in self.clients:
+            for event in events:
+                if camera_filter is not None and event["camera_id"] != camera_filter:
+                    continue
+                # A slow client loses its oldest events, it never slows down the detection
+                if events_queue.full():
+                    events_queue.get_nowait()
+                events_queue.put_nowait(event)
+
+    async def events(self, request):
+
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+
+        client = (request.query.get("camera"), asyncio.Queue(maxsize=1000))
+        self.clients.add(client)
+
+        # Read the socket in the background so a closed connection is noticed
+        async def read():
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+
+        reader = asyncio.create_task(read())
+        try:
+            while not ws.closed and not reader.done():
+                try:
+                    event = await asyncio.wait_for(client[1].get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                await ws.send_str(json.dumps(event))
+        finally:
+            self.clients.discard(client)
+            reader.cancel()
+
+        return ws
+
+    async def health(self, request):
+
+        return web.json_response({
+            "status": "ok",
+            "service": {**self.stats, "waiting": self.waiting, "websocket_clients": len(self.clients),
+                        "cameras": len(self.trackers)},
+            "engine": {**self.engine.stats, "pending": self.engine.pending.qsize(),
+                       "average_batch_size": round(self.engine.average_batch_size(), 2)},
+        })
+
+
+def create_app(model, threshold=0.5, concurrency=16, max_waiting=64, max_batch=8, max_wait=0.01, workers=1,
+               camera_timeout=300.0):
+
+    engine = DetectionEngine(model, max_batch=max_batch, max_wait=max_wait,
+                             max_pending=concurrency + max_batch, workers=workers)
+    app = web.Application(client_max_size=20 * 1024 * 1024)
+
+    async def startup(app):
+        # The semaphore must be created inside the running event loop
+        app["service"] = MaskService(engine.start(), threshold, concurrency, max_waiting, camera_timeout=camera_timeout)
+
+    async def cleanup(app):
+        engine.stop()
+
+    app.on_startup.append(startup)
+    app.on_cleanup.append(cleanup)
+
+    # The service only exists once the app started → the routes are coroutines that look it up at request time
+    # (aiohttp wants `async def` handlers, a lambda returning a coroutine is deprecated).
+    async def detect(request):
+        return await app["service"].detect(request)
+
+    async def events(request):
+        return await app["service"].events(request)
+
+    async def health(request):
+        return await app["service"].health(request)
+
+    app.router.add_post("/detect", detect)
+    app.router.add_get("/ws/events", events)
+    app.router.add_get("/health", health)
+    return app
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="HTTP / WebSocket mask detection service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--variant", default="keras", help="Classifier backend (keras, tflite-fp16, tflite-int8, onnx)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests processed at the same time")
+    parser.add_argument("--max-waiting", type=int, default=64, help="Requests waiting before answering 503")
+    parser.add_argument("--max-batch", type=int, default=8, help="Maximum images per engine batch")
+    parser.add_argument("--max-wait", type=float, default=0.01, help="Maximum wait (s) to fill a batch")
+    parser.add_argument("--workers", type=int, default=1, help="Engine threads")
+    parser.add_argument("--camera-timeout", type=float, default=300.0, help="Forget a camera's tracker after N s idle")
+    args = parser.parse_args()
+
+    if web is None:
+        raise SystemExit("The service needs aiohttp: pip install aiohttp")
+
+    model = load_mask_model(args.variant)
+    app = create_app(model, args.threshold, args.concurrency, args.max_waiting, args.max_batch, args.max_wait,
+                     args.workers, args.camera_timeout)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
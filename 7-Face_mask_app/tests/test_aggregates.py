@@ -0,0 +1,64 @@
+from utils.aggregates import TimeSeriesAggregator
+
+
+def new_track(ts, camera_id="door", label="With Mask"):
+
+    return {"ts": ts, "camera_id": camera_id, "event": "new_track", "label": label}
+
+
+def test_counts_per_bucket_and_label():
+
+    aggregator = TimeSeriesAggregator()
+    aggregator.add_events([
+        new_track(1000.2), new_track(1000.7, label="Without Mask"), new_track(1001.5),
+        {"ts": 1001.6, "camera_id": "door", "event": "label_change", "label": "With Mask"},
+    ])
+
+    assert aggregator.series("second") == [(1000, {"With Mask": 1, "Without Mask": 1}), (1001, {"With Mask": 1})]
+    assert aggregator.totals("minute") == {"With Mask": 2, "Without Mask": 1}
+
+
+def test_late_event_keeps_the_buckets_in_time_order():
+
+    aggregator = TimeSeriesAggregator()
+    aggregator.add_events([new_track(1000.0), new_track(1001.0)])
+    # Arrives after the newer buckets (another logger was slower)
+    aggregator.add_events([new_track(999.9)])
+
+    assert list(aggregator.buckets["second"]["door"]) == [999, 1000, 1001]
+    assert aggregator.series("second", since=1000) == [(1000, {"With Mask": 1}), (1001, {"With Mask": 1})]
+    assert aggregator.series("second") == [(999, {"With Mask": 1}), (1000, {"With Mask": 1}), (1001, {"With Mask": 1})]
+
+
+def test_late_event_in_an_existing_bucket():
+
+    aggregator = TimeSeriesAggregator()
+    aggregator.add_events([new_track(1000.0), new_track(1002.0), new_track(1000.5)])
+
+    assert aggregator.series("second", since=1000) == [(1000, {"With Mask": 2}), (1002, {"With Mask": 1})]
+
+
+def test_old_buckets_are_evicted_oldest_first():
+
+    aggregator = TimeSeriesAggregator(tiers={"second": (1, 3)})
+    aggregator.add_events([new_track(10.0), new_track(12.0), new_track(11.0)])
+
+    # A newer bucket pushes out the oldest one (10), even though 11 arrived last
+    aggregator.add_events([new_track(13.0)])
+    assert list(aggregator.buckets["second"]["door"]) == [11, 12, 13]
+
+    # Too old to be kept → ignored
+    aggregator.add_events([new_track(10.5)])
+    assert aggregator.totals("second") == {"With Mask": 3}
+    assert aggregator.size() == 3
+
+
+def test_series_per_camera_and_all_cameras():
+
+    aggregator = TimeSeriesAggregator()
+    aggregator.add_events([new_track(60.0, "door"), new_track(61.0, "hall"), new_track(125.0, "hall")])
+
+    assert aggregator.series("minute", camera_id="door") == [(60, {"With Mask": 1})]
+    assert aggregator.series("minute") == [(60, {"With Mask": 2}), (120, {"With Mask": 1})]
+    assert aggregator.series("minute", camera_id="nowhere") == []
+    assert aggregator.cameras() == ["door", "hall"]
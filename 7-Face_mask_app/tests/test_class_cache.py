@@ -0,0 +1,67 @@
+from utils.class_cache import ClassificationCache
+
+BOX = (10, 10, 50, 50)
+
+
+def test_confident_label_is_reused_until_refresh_interval():
+
+    cache = ClassificationCache(threshold=0.5, refresh_interval=2.0)
+    assert cache.lookup(1, BOX, now=0.0) is None
+    assert cache.update(1, BOX, 0.95, now=0.0)[0] == "Without Mask"
+
+    label, confidence = cache.lookup(1, BOX, now=1.0)
+    assert label == "Without Mask" and confidence == 0.95
+
+    # Too old → classify again
+    assert cache.lookup(1, BOX, now=2.5) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_unsure_prediction_is_not_reused():
+
+    cache = ClassificationCache(threshold=0.5, margin=0.2)
+    cache.update(1, BOX, 0.6, now=0.0)
+    assert cache.lookup(1, BOX, now=0.1) is None
+
+
+def test_moved_box_is_classified_again():
+
+    cache = ClassificationCache(min_iou=0.5)
+    cache.update(1, BOX, 0.05, now=0.0)
+    assert cache.lookup(1, (40, 40, 50, 50), now=0.1) is None
+    assert cache.lookup(1, (12, 11, 50, 50), now=0.1) is not None
+
+
+def test_running_prediction_is_smoothed():
+
+    cache = ClassificationCache(smoothing=0.5)
+    cache.update(1, BOX, 1.0, now=0.0)
+    label, confidence = cache.update(1, BOX, 0.0, now=0.1)
+    assert cache.entries[1]["pred"] == 0.5
+    assert label == "With Mask" and confidence == 0.5
+
+
+def test_entries_unused_for_ttl_are_evicted():
+
+    cache = ClassificationCache(ttl=10.0)
+    cache.update(1, BOX, 0.9, now=0.0)
+    cache.update(2, BOX, 0.9, now=5.0)
+
+    # Eviction runs on update: track 1 was last used 11 s ago, track 2 only 6 s ago
+    cache.update(3, BOX, 0.9, now=11.0)
+    assert list(cache.entries) == [2, 3]
+    assert cache.evictions == 1
+
+
+def test_least_recently_used_is_evicted_above_max_size():
+
+    cache = ClassificationCache(max_size=2, ttl=100.0)
+    cache.update(1, BOX, 0.9, now=0.0)
+    cache.update(2, BOX, 0.9, now=0.1)
+
+    # Using track 1 makes track 2 the least recently used one
+    assert cache.lookup(1, BOX, now=0.2) is not None
+    cache.update(3, BOX, 0.9, now=0.3)
+
+    assert list(cache.entries) == [1, 3]
+    assert cache.evictions == 1
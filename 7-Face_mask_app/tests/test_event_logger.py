@@ -0,0 +1,37 @@
+from utils.event_store import TrackEventLogger
+
+
+class FakeStore:
+
+    def __init__(self):
+
+        self.rows = []
+
+    def record(self, camera_id, track_id, event, label, confidence, ts=None):
+
+        self.rows.append((ts, track_id, event))
+
+
+def person(track_id, label="With Mask"):
+
+    return {"id": track_id, "label": label, "confidence": 0.9}
+
+
+def test_events_are_stamped_with_the_capture_time():
+
+    store = FakeStore()
+    logger = TrackEventLogger(store, camera_id="door")
+
+    events = logger.update([person(1)], timestamp=1000.5)
+    logger.update([person(1, label="Without Mask")], timestamp=1001.25)
+
+    assert events[0]["ts"] == 1000.5
+    assert store.rows == [(1000.5, 1, "new_track"), (1001.25, 1, "label_change")]
+
+
+def test_without_timestamp_the_logging_time_is_used():
+
+    store = FakeStore()
+    TrackEventLogger(store, camera_id="door").update([person(1)])
+
+    assert store.rows[0][0] > 1e9
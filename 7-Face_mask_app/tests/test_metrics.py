@@ -0,0 +1,31 @@
+import sys
+import threading
+
+from utils.metrics import Metrics
+
+
+def test_observations_from_many_threads_are_all_counted():
+
+    metrics = Metrics()
+
+    def work():
+        for _ in range(20000):
+            metrics.observe("stage_ms", 1.0)
+            metrics.tick("frames")
+
+    # Switch threads as often as possible, so a non-atomic `+=` would lose updates
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert metrics.counts["stage_ms"] == 8 * 20000
+    assert metrics.sums["stage_ms"] == 8 * 20000
+    assert metrics.counts["frames"] == 8 * 20000
+    assert "facemask_stage_ms_count 160000" in metrics.to_prometheus()
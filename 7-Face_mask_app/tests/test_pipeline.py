@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from utils.pipeline import Pipeline
+
+
+def run_for(pipeline, seconds=0.5):
+
+    pipeline.start()
+    try:
+        end = time.time() + seconds
+        while time.time() < end:
+            pipeline.get(timeout=0.05)
+    finally:
+        pipeline.stop()
+
+
+def test_stage_that_consumes_its_items_is_counted():
+
+    counter = {"n": 0}
+    def source():
+        time.sleep(0.005)
+        counter["n"] += 1
+        return counter["n"]
+
+    pipeline = Pipeline(queue_size=2, idle_timeout=None)
+    pipeline.add_stage("capture", source)
+    # Sink: it uses every item and sends nothing downstream
+    pipeline.add_stage("annotate", lambda item: None)
+    run_for(pipeline)
+
+    capture, annotate = pipeline.stats()
+    assert capture["processed"] > 0
+    assert annotate["processed"] > 0 and annotate["fps"] > 0
+
+
+def test_source_without_new_item_is_not_counted():
+
+    def source():
+        time.sleep(0.01)
+        return None
+
+    pipeline = Pipeline(queue_size=2, idle_timeout=None)
+    pipeline.add_stage("capture", source)
+    run_for(pipeline, 0.2)
+
+    assert pipeline.stats()[0]["processed"] == 0
+
+
+def test_sink_stage_has_no_output_queue():
+
+    pipeline = Pipeline(queue_size=2, idle_timeout=None)
+    pipeline.add_stage("capture", lambda: 1)
+    pipeline.add_stage("annotate", lambda item: None, sink=True)
+
+    assert pipeline.stats()[1]["queue_depth"] == 0
+    with pytest.raises(RuntimeError):
+        pipeline.get(timeout=0.01)
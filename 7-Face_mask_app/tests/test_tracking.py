@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import utils.tracking as tracking
+from utils.tracking import Tracker, iou, iou_matrix, match_boxes
+
+
+# ---------------
+# IoU and matching
+# ---------------
+def test_iou_matrix_matches_scalar_iou():
+
+    a = [(0, 0, 10, 10), (5, 5, 10, 10), (100, 100, 4, 4)]
+    b = [(0, 0, 10, 10), (20, 20, 5, 5)]
+    matrix = iou_matrix(a, b)
+
+    assert matrix.shape == (3, 2)
+    for i, box_a in enumerate(a):
+        for j, box_b in enumerate(b):
+            assert matrix[i, j] == pytest.approx(iou(box_a, box_b))
+
+
+def test_iou_matrix_empty_and_degenerate_boxes():
+
+    assert iou_matrix([], [(0, 0, 10, 10)]).shape == (0, 1)
+    # Two zero-area boxes: union 0 → IoU 0, not NaN
+    assert iou_matrix([(5, 5, 0, 0)], [(5, 5, 0, 0)])[0, 0] == 0.0
+
+
+def test_match_boxes_empty():
+
+    assert match_boxes(np.zeros((0, 3)), 0.3) == []
+    assert match_boxes(np.zeros((2, 0)), 0.3) == []
+
+
+# Greedy takes (0, 0) first and leaves track 1 unmatched, the Hungarian assignment matches both tracks
+CROSSED = np.array([[0.9, 0.8],
+                    [0.85, 0.0]])
+
+
+def test_hungarian_maximizes_total_iou():
+
+    pytest.importorskip("scipy")
+    assert sorted(match_boxes(CROSSED, 0.3)) == [(0, 1), (1, 0)]
+
+
+def test_greedy_fallback_without_scipy(monkeypatch):
+
+    monkeypatch.setattr(tracking, "linear_sum_assignment", None)
+    assert match_boxes(CROSSED, 0.3) == [(0, 0)]
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_match_boxes_drops_pairs_below_min_iou(monkeypatch, use_scipy):
+
+    if use_scipy:
+        pytest.importorskip("scipy")
+    else:
+        monkeypatch.setattr(tracking, "linear_sum_assignment", None)
+
+    # The only possible pairs are at (or below) the threshold → nothing is matched
+    assert match_boxes(np.array([[0.3, 0.1], [0.2, 0.3]]), 0.3) == []
+
+
+# -------
+# Tracker
+# -------
+def test_same_person_keeps_its_id():
+
+    tracker = Tracker()
+    ids, is_new = tracker.update([(10, 10, 50, 50), (200, 10, 50, 50)])
+    assert ids == [1, 2] and is_new == [True, True]
+
+    # Slightly moved, and in the other order
+    ids, is_new = tracker.update([(202, 12, 50, 50), (12, 11, 50, 50)])
+    assert ids == [2, 1] and is_new == [False, False]
+
+
+def test_track_expires_after_max_age_and_ids_are_not_reused():
+
+    tracker = Tracker(max_age=2)
+    tracker.update([(10, 10, 50, 50)])
+
+    # Missing for max_age frames → still remembered
+    for _ in range(2):
+        tracker.update([])
+    assert len(tracker) == 1
+    ids, is_new = tracker.update([(10, 10, 50, 50)])
+    assert ids == [1] and is_new == [False]
+
+    # Missing for max_age + 1 frames → forgotten, the same place gives a NEW id
+    for _ in range(3):
+        tracker.update([])
+    assert len(tracker) == 0
+    ids, is_new = tracker.update([(10, 10, 50, 50)])
+    assert ids == [2] and is_new == [True]
+
+
+def test_velocity_keeps_a_person_who_speeds_up():
+
+    # 10 px per frame, then 25 px per frame on a 40 px wide box: without prediction the IoU of two
+    # consecutive boxes drops below the threshold (0.23), with the constant-velocity prediction it stays above
+    xs = [0, 10, 20, 30, 40, 65, 90, 115, 140, 165]
+    boxes = [(x, 100, 40, 40) for x in xs]
+
+    plain, predicted = Tracker(), Tracker(use_velocity=True)
+    plain_ids = [plain.update([box])[0][0] for box in boxes]
+    predicted_ids = [predicted.update([box])[0][0] for box in boxes]
+
+    assert len(set(plain_ids)) > 1
+    assert set(predicted_ids) == {1}
@@ -0,0 +1,382 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from utils.detection import FACE_SIZE
+from utils.models import REPO_DIR
+
+# ---------------------------------------------------------
+# Training of the mask classifiers with a tf.data pipeline (instead of ImageDataGenerator)
+# ---------------------------------------------------------
+# Run it from the "7-Face_mask_app" folder with the dataset folders used in the notebook:
+#   python train.py --train-dir "Dataset/Train" --val-dir "Dataset/Validation" --test-dir "Dataset/Test" \
+#       --models mobilenetv2 vgg16 resnet50 --store tfrecord --baseline-epochs 1
+#
+# Same models, head, normalization (/ 255), augmentation and callbacks as V3_Face_Mask_Detection_Project.ipynb,
+# but the images are not decoded again for every epoch and every model:
+#
+# 1. Decode once: every PNG is decoded and resized to 224x224 ONE time, then kept in
+#    - --store tfrecord → sharded TFRecord files of raw uint8 pixels in --cache-dir (reused by the next runs),
+#      about 150 KB per image
+#    - --store memory → RAM (tf.data cache, for this run only)
+# 2. The batches are augmented with Keras preprocessing layers (the whole batch at once, in parallel map calls),
+#    and prefetched, so the next batch is ready when the model finishes the current one.
+# 3. --mixed-precision float16 (GPU) / bfloat16 (recent CPUs): the model computes in 16 bits, the output stays float32.
+# 4. --feature-cache: the backbone is frozen, so its output for an image never changes. We run it ONCE per image,
+#    then every model head trains on the cached features (seconds per epoch instead of minutes).
+#    The cached features are not augmented: use it to compare the architectures quickly, then train the chosen
+#    one without it.
+# 5. --baseline-epochs N: first train N epochs with the notebook's ImageDataGenerator, to compare the epoch times.
+#
+# The trained models are saved as <Model>.h5 in --output-dir (data/models by default), ready for the app
+# (copy the file to Models/ or use FACE_MASK_CLASSIFIER) or for convert_model.py.
+
+MODELS = {
+    # name: (Keras application, use Flatten instead of GlobalAveragePooling2D (as in the notebook), file name)
+    "mobilenetv2": ("MobileNetV2", False, "MobileNetV2.h5"),
+    "vgg16": ("VGG16", True, "VGG16.h5"),
+    "resnet50": ("ResNet50", False, "ResNet50.h5"),
+}
+
+
+# The images of a split and their labels (the sorted class folders → 0, 1, like flow_from_directory)
+def list_images(split_dir):
+
+    classes = sorted(d for d in os.listdir(split_dir) if os.path.isdir(os.path.join(split_dir, d)))
+    paths, labels = [], []
+    for label, name in enumerate(classes):
+        for ext in ("*.png", "*.jpg", "*.jpeg"):
+            files = sorted(glob.glob(os.path.join(split_dir, name, ext)))
+            paths += files
+            labels += [label] * len(files)
+    return paths, labels, classes
+
+
+# Read one image file → 224x224 uint8 RGB (the same bilinear resize as preprocess_faces() in the app)
+def decode_image(path, label):
+
+    import tensorflow as tf
+
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, (FACE_SIZE[1], FACE_SIZE[0]))
+    return tf.cast(tf.round(image), tf.uint8), label
+
+
+# Fingerprint of the content of a split: relative path, label, size and modification time of every image.
+# Two datasets with the same number of images (or a re-labelled one: an image moved to the other class folder)
+# get different fingerprints, so the store is rebuilt instead of training on stale pixels.
+def dataset_fingerprint(split_dir, paths, labels):
+
+    digest = hashlib.sha1()
+    for path, label in sorted(zip(paths, labels)):
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path, split_dir)}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------
+# Decode-once stores
+# ---------------------------------------------------------
+# Sharded TFRecord store of a split, written only if it doesn't exist yet. It returns the list of shard files.
+def build_tfrecords(split_dir, cache_dir, split, shards=8):
+
+    import tensorflow as tf
+
+    out_dir = os.path.join(cache_dir, split)
+    meta_path = os.path.join(out_dir, "meta.json")
+    paths, labels, classes = list_images(split_dir)
+    fingerprint = dataset_fingerprint(split_dir, paths, labels)
+
+    # Reuse the store if it was made from the same files (same content, not only the same number of images)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if (meta.get("fingerprint") == fingerprint and meta["count"] == len(paths) and meta["classes"] == classes
+                and meta["size"] == list(FACE_SIZE)):
+            return [os.path.join(out_dir, name) for name in meta["files"]]
+
+    # Rebuild: the shards of the old store must go (with another --shards they would not all be overwritten)
+    os.makedirs(out_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(out_dir, "*.tfrecord")) + [meta_path]:
+        if os.path.exists(old):
+            os.remove(old)
+    start = time.perf_counter()
+
+    # Decoding in parallel, writing one shard per writer (image i goes to shard i % shards)
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels)).map(decode_image, num_parallel_calls=tf.data.AUTOTUNE)
+    files = [os.path.join(out_dir, f"{split}-{i:03d}-of-{shards:03d}.tfrecord") for i in range(shards)]
+    writers = [tf.io.TFRecordWriter(path) for path in files]
+    for i, (image, label) in enumerate(ds.as_numpy_iterator()):
+        example = tf.train.Example(features=tf.train.Features(feature={
+            "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[image.tobytes()])),
+            "label": tf.train.Feature(int64_list=tf.train.Int64List(value=[label])),
+        }))
+        writers[i % shards].write(example.SerializeToString())
+    for writer in writers:
+        writer.close()
+
+    with open(meta_path, "w") as f:
+        json.dump({"count": len(paths), "classes": classes, "size": list(FACE_SIZE), "fingerprint": fingerprint,
+                   "files": [os.path.basename(path) for path in files]}, f)
+    print(f"{split}: {len(paths)} images decoded into {shards} TFRecord shards in {time.perf_counter() - start:.1f} s")
+    return files
+
+
+def parse_example(record):
+
+    import tensorflow as tf
+
+    features = tf.io.parse_single_example(record, {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64),
+    })
+    image = tf.reshape(tf.io.decode_raw(features["image"], tf.uint8), (FACE_SIZE[1], FACE_SIZE[0], 3))
+    return image, features["label"]
+
+
+# Unbatched dataset of (uint8 image, label) for one split, and its number of images
+def load_split(split_dir, split, store, cache_dir, shards):
+
+    import tensorflow as tf
+
+    paths, labels, _ = list_images(split_dir)
+    if store == "tfrecord":
+        files = build_tfrecords(split_dir, cache_dir, split, shards)
+        ds = tf.data.TFRecordDataset(files, num_parallel_reads=tf.data.AUTOTUNE)
+        ds = ds.map(parse_example, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+        ds = ds.map(decode_image, num_parallel_calls=tf.data.AUTOTUNE).cache()
+    return ds, len(paths)
+
+
+# The augmentation of the notebook's ImageDataGenerator, as Keras layers working on a whole batch
+# (rotation 20°, shift 0.2, zoom 0.3, horizontal flip, fill_mode nearest).
+# ImageDataGenerator's shear_range has no Keras layer equivalent, it is left out.
+def make_augmenter():
+
+    import tensorflow as tf
+
+    return tf.keras.Sequential([
+        tf.keras.layers.RandomRotation(20 / 360, fill_mode="nearest"),
+        tf.keras.layers.RandomTranslation(0.2, 0.2, fill_mode="nearest"),
+        tf.keras.layers.RandomZoom(0.3, fill_mode="nearest"),
+        tf.keras.layers.RandomFlip("horizontal"),
+    ])
+
+
+# Shuffle → batch → normalize (+ augment) in parallel → prefetch
+def prepare(ds, batch_size, training, augmenter=None):
+
+    import tensorflow as tf
+
+    if training:
+        ds = ds.shuffle(4096, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+
+    def normalize(images, labels):
+        images = tf.cast(images, tf.float32) / 255.0
+        if augmenter is not None:
+            images = augmenter(images, training=True)
+        return images, tf.cast(labels, tf.float32)
+
+    return ds.map(normalize, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+# ---------------------------------------------------------
+# Models (same head as build_model() in the notebook)
+# ---------------------------------------------------------
+def make_backbone(name):
+
+    import tensorflow as tf
+
+    application = getattr(tf.keras.applications, MODELS[name][0])
+    backbone = application(weights="imagenet", include_top=False, input_shape=(FACE_SIZE[1], FACE_SIZE[0], 3))
+    backbone.trainable = False
+    return backbone
+
+
+def make_head(name, feature_shape):
+
+    import tensorflow as tf
+    from tensorflow.keras import layers
+
+    inputs = tf.keras.Input(shape=feature_shape)
+    x = layers.Flatten()(inputs) if MODELS[name][1] else layers.GlobalAveragePooling2D()(inputs)
+    x = layers.Dropout(0.3)(x)
+    x = layers.Dense(128, activation="relu")(x)
+    x = layers.Dropout(0.3)(x)
+    # The output stays float32 with mixed precision (a float16 sigmoid + binary crossentropy is not stable)
+    outputs = layers.Dense(1, activation="sigmoid", dtype="float32")(x)
+    return tf.keras.Model(inputs, outputs, name=f"{name}_head")
+
+
+def compile_model(model):
+
+    model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def callbacks():
+
+    import tensorflow as tf
+
+    return [
+        tf.keras.callbacks.ReduceLROnPlateau(monitor="val_loss", factor=0.5, patience=5),
+        tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=10, restore_best_weights=True),
+    ]
+
+
+# Remembers the duration of every epoch
+def epoch_timer():
+
+    import tensorflow as tf
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+
+        def on_train_begin(self, logs=None):
+            self.times = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.times.append(time.perf_counter() - self.start)
+
+    return EpochTimer()
+
+
+# "Before": the notebook's ImageDataGenerator pipeline, for a few epochs only
+def baseline_epochs(name, args):
+
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+    train_datagen = ImageDataGenerator(
+        rescale=1. / 255, rotation_range=20, width_shift_range=0.2, height_shift_range=0.2,
+        shear_range=0.2, zoom_range=0.3, horizontal_flip=True, fill_mode="nearest",
+    )
+    flow = dict(target_size=(FACE_SIZE[1], FACE_SIZE[0]), batch_size=args.batch_size, class_mode="binary")
+    train_generator = train_datagen.flow_from_directory(args.train_dir, **flow)
+    validation_generator = ImageDataGenerator(rescale=1. / 255).flow_from_directory(args.val_dir, **flow)
+
+    backbone = make_backbone(name)
+    model = compile_model(make_full_model(backbone, make_head(name, backbone.output_shape[1:])))
+    timer = epoch_timer()
+    model.fit(train_generator, validation_data=validation_generator, epochs=args.baseline_epochs, callbacks=[timer])
+    return timer.times
+
+
+def make_full_model(backbone, head):
+
+    import tensorflow as tf
+
+    return tf.keras.Model(backbone.input, head(backbone.output), name=backbone.name)
+
+
+# Run the frozen backbone once on a dataset → (float16 features, labels)
+def extract_features(backbone, ds):
+
+    features, labels = [], []
+    for images, batch_labels in ds:
+        features.append(backbone(images, training=False).numpy().astype("float16"))
+        labels.append(batch_labels.numpy())
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def train_model(name, data, args):
+
+    backbone = make_backbone(name)
+    head = make_head(name, backbone.output_shape[1:])
+    timer = epoch_timer()
+
+    if args.feature_cache:
+        start = time.perf_counter()
+        train_x, train_y = extract_features(backbone, data["train_plain"])
+        val_x, val_y = extract_features(backbone, data["val"])
+        print(f"{name}: backbone features of {len(train_x) + len(val_x)} images in {time.perf_counter() - start:.1f} s "
+              f"({(train_x.nbytes + val_x.nbytes) / 1e6:.0f} MB)")
+
+        compile_model(head).fit(
+            train_x, train_y, batch_size=args.batch_size, epochs=args.epochs, validation_data=(val_x, val_y),
+            callbacks=callbacks() + [timer],
+        )
+        model = compile_model(make_full_model(backbone, head))
+    else:
+        model = compile_model(make_full_model(backbone, head))
+        model.fit(data["train"], validation_data=data["val"], epochs=args.epochs, callbacks=callbacks() + [timer])
+
+    return model, timer.times
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Train the mask classifiers with a cached tf.data pipeline")
+    parser.add_argument("--train-dir", required=True)
+    parser.add_argument("--val-dir", required=True)
+    parser.add_argument("--test-dir", help="Optional test split, evaluated at the end")
+    parser.add_argument("--models", nargs="+", default=["mobilenetv2"], choices=list(MODELS))
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--store", choices=["tfrecord", "memory"], default="tfrecord",
+                        help="Where the decoded images are kept")
+    parser.add_argument("--cache-dir", default=os.path.join(REPO_DIR, "data", "train_cache"), help="Folder of the TFRecord store")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--mixed-precision", choices=["off", "float16", "bfloat16"], default="off")
+    parser.add_argument("--feature-cache", action="store_true", help="Train the heads on cached backbone features")
+    parser.add_argument("--baseline-epochs", type=int, default=0, help="Time N epochs of the notebook pipeline first")
+    parser.add_argument("--output-dir", default=os.path.join(REPO_DIR, "data", "models"))
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    if args.mixed_precision != "off":
+        tf.keras.mixed_precision.set_global_policy(f"mixed_{args.mixed_precision}")
+
+    # The decoded splits are shared by all the models
+    train_ds, n_train = load_split(args.train_dir, "train", args.store, args.cache_dir, args.shards)
+    val_ds, n_val = load_split(args.val_dir, "validation", args.store, args.cache_dir, args.shards)
+    data = {
+        "train": prepare(train_ds, args.batch_size, training=True, augmenter=make_augmenter()),
+        "train_plain": prepare(train_ds, args.batch_size, training=False),
+        "val": prepare(val_ds, args.batch_size, training=False),
+    }
+    print(f"{n_train} training and {n_val} validation images, store: {args.store}, "
+          f"mixed precision: {args.mixed_precision}, feature cache: {args.feature_cache}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary = []
+    for name in args.models:
+        before = baseline_epochs(name, args) if args.baseline_epochs > 0 else []
+        model, after = train_model(name, data, args)
+
+        path = os.path.join(args.output_dir, MODELS[name][2])
+        model.save(path)
+
+        row = {"model": name, "epochs": len(after), "file": path,
+               "before_s": round(float(np.mean(before)), 1) if before else None,
+               "first_epoch_s": round(after[0], 1),
+               # The first epoch also fills the cache / builds the graph, the next ones show the steady speed
+               "epoch_s": round(float(np.mean(after[1:] or after)), 1)}
+        if args.test_dir:
+            test_ds, _ = load_split(args.test_dir, "test", args.store, args.cache_dir, args.shards)
+            accuracy = model.evaluate(prepare(test_ds, args.batch_size, training=False), verbose=0)[1]
+            row["test_accuracy"] = round(float(accuracy), 4)
+        summary.append(row)
+
+    print(f"{'model':>12} | {'before (s/epoch)':>16} | {'first epoch (s)':>15} | {'after (s/epoch)':>15} | {'speedup':>7}")
+    print("-" * 80)
+    for row in summary:
+        speedup = f"{row['before_s'] / row['epoch_s']:.1f}x" if row["before_s"] and row["epoch_s"] else "-"
+        print(f"{row['model']:>12} | {str(row['before_s'] or '-'):>16} | {row['first_epoch_s']:>15} | "
+              f"{row['epoch_s']:>15} | {speedup:>7}")
+        if "test_accuracy" in row:
+            print(f"{'':>12}   test accuracy: {row['test_accuracy']}")
+
+
+if __name__ == "__main__":
+    main()
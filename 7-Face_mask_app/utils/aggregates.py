@@ -0,0 +1,151 @@
+import collections
+import threading
+import time
+
+from utils.event_store import get_event_store
+
+# ---------------------------------------------------------
+# Rolling per-second / per-minute / per-hour counts for the Dashboard
+# ---------------------------------------------------------
+"""
+Every new person ("new_track" event) adds 1 to the bucket of its camera and label in each tier:
+- "second" → 1 s buckets, the last hour
+- "minute" → 1 min buckets, the last 24 hours
+- "hour"   → 1 h buckets, the last 30 days
+
+Only the last `keep` buckets of every tier are kept, so memory stays bounded however long the system runs,
+and a chart reads only the buckets it displays instead of the whole event history.
+
+The buckets of a camera are always kept in time order (series() and the eviction depend on it). Several loggers
+write asynchronously, so an event can arrive after a newer one: it is inserted at its place, not at the end.
+
+The aggregator listens to the event store: it is updated by the writer thread after every batch,
+and at start it loads the counts already in the database with one GROUP BY query per tier.
+
+Usage:
+    aggregator = get_aggregator()
+    points = aggregator.series("minute", since=time.time() - 3600)   # [(bucket_start, {"With Mask": 3, ...}), ...]
+"""
+TIERS = {
+    # name: (bucket size in seconds, number of buckets kept)
+    "second": (1, 3600),
+    "minute": (60, 24 * 60),
+    "hour": (3600, 24 * 30),
+}
+
+
+class TimeSeriesAggregator:
+
+    def __init__(self, tiers=TIERS):
+
+        self.tiers = tiers
+        # tier → camera_id → OrderedDict(bucket_start → Counter(label → count)), oldest bucket first
+        self.buckets = {tier: {} for tier in tiers}
+        self.lock = threading.Lock()
+
+    # Add `count` people to one bucket, and forget the buckets that are too old
+    def add_count(self, tier, camera_id, ts, label, count=1):
+
+        size, keep = self.tiers[tier]
+        start = int(ts // size) * size
+        camera = self.buckets[tier].setdefault(camera_id, collections.OrderedDict())
+
+        if camera:
+            newest = next(reversed(camera))
+            if start < newest - size * (keep - 1):
+                return                          # Older than everything we keep
+            if start > newest:
+                cutoff = start - size * (keep - 1)
+                while camera and next(iter(camera)) < cutoff:
+                    camera.popitem(last=False)
+
+        if start not in camera:
+            camera[start] = collections.Counter()
+            self.keep_order(camera, start)
+        camera[start][label] += count
+
+    # A late event created a bucket older than the newest one → move the newer buckets after it.
+    # Late events are only a few buckets late, so only those few buckets move.
+    def keep_order(self, camera, start):
+
+        newer = []
+        for bucket in reversed(camera):
+            if bucket == start:
+                continue
+            if bucket < start:
+                break
+            newer.append(bucket)
+
+        for bucket in reversed(newer):
+            camera.move_to_end(bucket)
+
+    # Listener of the event store: events → dicts with ts, camera_id, event and label
+    def add_events(self, events):
+
+        with self.lock:
+            for e in events:
+                if e["event"] != "new_track":
+                    continue
+                for tier in self.tiers:
+                    self.add_count(tier, e["camera_id"], e["ts"], e["label"])
+
+    # Fill the buckets from the database (already aggregated by SQLite, oldest first)
+    def load(self, store):
+
+        now = time.time()
+        with self.lock:
+            for tier, (size, keep) in self.tiers.items():
+                for camera_id, start, label, count in store.bucket_counts(size, since=now - size * keep):
+                    self.add_count(tier, camera_id, start, label, count)
+
+    # Buckets newer than `since` (all cameras summed if camera_id is None), oldest first.
+    # It walks back from the newest bucket and stops at `since` → O(number of buckets returned).
+    def series(self, tier, since=None, camera_id=None):
+
+        with self.lock:
+            cameras = self.buckets[tier]
+            selected = cameras.values() if camera_id is None else [cameras.get(camera_id, {})]
+
+            points = collections.defaultdict(collections.Counter)
+            for camera in selected:
+                for start in reversed(camera):
+                    if since is not None and start < since:
+                        break
+                    points[start].update(camera[start])
+
+        return sorted(points.items())
+
+    # Sum of the buckets newer than `since`, e.g. {"With Mask": 120, "Without Mask": 14}
+    def totals(self, tier, since=None, camera_id=None):
+
+        total = collections.Counter()
+        for _, counts in self.series(tier, since, camera_id):
+            total.update(counts)
+        return dict(total)
+
+    def cameras(self):
+
+        with self.lock:
+            return sorted({camera_id for cameras in self.buckets.values() for camera_id in cameras})
+
+    # Number of buckets in memory (bounded by cameras x sum of `keep`)
+    def size(self):
+
+        with self.lock:
+            return sum(len(camera) for cameras in self.buckets.values() for camera in cameras.values())
+
+
+# One aggregator for the whole process, connected to the event store
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator():
+
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            aggregator = TimeSeriesAggregator()
+            get_event_store().add_listener(aggregator.add_events, backfill=aggregator.load)
+            _aggregator = aggregator
+        return _aggregator
@@ -0,0 +1,138 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+
+# ---------------------------------------------------------
+# Interchangeable inference runtimes for the mask classifier
+# ---------------------------------------------------------
+"""
+All the backends take the same input and give the same output as the Keras model:
+- input → (N, 224, 224, 3) float32 batch from preprocess_faces() (RGB, values 0 → 1)
+- output → (N, 1) array of "Without Mask" probabilities
+
+So any of them can be passed as `model` to detect_mask_dnn(), classify_faces(), LiveDetector...
+
+- keras → The original MobileNetV2.h5 (needs TensorFlow, imported only when this backend is used)
+- tflite → TFLite float16 or int8 model made by convert_model.py (needs tflite-runtime or TensorFlow)
+- onnx → ONNX model made by convert_model.py, run with OpenCV DNN (no TensorFlow at all)
+
+One instance is shared by the whole process (utils/models.py): the live pages, the camera wall worker and the
+engine threads of serve.py can call predict() at the same time. A TFLite interpreter and an OpenCV Net keep the
+input / output of the running call in the instance (set_tensor → invoke → get_tensor, setInput → forward),
+so these two backends hold their own lock during predict(), like face_net_lock for the face detector.
+A Keras model can be called from several threads, it has no lock.
+"""
+
+
+# Keras .h5 model
+class KerasBackend:
+
+    name = "keras"
+
+    def __init__(self, path):
+
+        # TensorFlow is slow to import → only when this backend is really used
+        from tensorflow.keras.models import load_model
+
+        self.path = path
+        self.model = load_model(path)
+
+    def predict(self, faces, batch_size=None, verbose=0):
+
+        return self.model.predict(faces, batch_size=batch_size or len(faces), verbose=verbose)
+
+
+# TFLite model (float16 or int8 post-training quantization)
+class TFLiteBackend:
+
+    name = "tflite"
+
+    def __init__(self, path, num_threads=None):
+
+        # The small tflite-runtime package is enough, TensorFlow is only the fallback
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.path = path
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads or os.cpu_count())
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = None
+        self.interpreter.allocate_tensors()
+        self.lock = threading.Lock()
+
+    def predict(self, faces, batch_size=None, verbose=0):
+
+        with self.lock:
+            return self.run(faces)
+
+    def run(self, faces):
+
+        # The interpreter has a fixed input shape → resize it only when the number of faces changes
+        if self.batch_size != len(faces):
+            self.interpreter.resize_tensor_input(self.input["index"], [len(faces), *faces.shape[1:]])
+            self.interpreter.allocate_tensors()
+            self.input = self.interpreter.get_input_details()[0]
+            self.output = self.interpreter.get_output_details()[0]
+            self.batch_size = len(faces)
+
+        # int8 models: quantize the input and de-quantize the output
+        # The values are clipped to the range of the integer type first, otherwise they would wrap around.
+        scale, zero_point = self.input["quantization"]
+        if self.input["dtype"] != np.float32 and scale:
+            info = np.iinfo(self.input["dtype"])
+            faces = np.clip(np.round(faces / scale + zero_point), info.min, info.max).astype(self.input["dtype"])
+
+        self.interpreter.set_tensor(self.input["index"], faces)
+        self.interpreter.invoke()
+        preds = self.interpreter.get_tensor(self.output["index"])
+
+        scale, zero_point = self.output["quantization"]
+        if self.output["dtype"] != np.float32 and scale:
+            preds = (preds.astype("float32") - zero_point) * scale
+
+        return preds
+
+
+# ONNX model run by OpenCV DNN
+class OpenCVBackend:
+
+    name = "onnx"
+
+    def __init__(self, path):
+
+        self.path = path
+        self.net = cv2.dnn.readNetFromONNX(path)
+        self.lock = threading.Lock()
+
+    def predict(self, faces, batch_size=None, verbose=0):
+
+        # The model exported from Keras keeps the NHWC layout, so the batch goes in as it is.
+        faces = np.ascontiguousarray(faces, dtype="float32")
+        with self.lock:
+            self.net.setInput(faces)
+            return self.net.forward().reshape(len(faces), -1)
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OpenCVBackend,
+}
+
+
+# Create a backend by name ("keras", "tflite" or "onnx")
+def load_backend(name, path):
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', choose one of {list(BACKENDS)}")
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found for the '{name}' backend: {path}")
+
+    return BACKENDS[name](path)
@@ -1,24 +1,249 @@
 import cv2
 import threading
 import time
-from imutils.video import VideoStream
+import collections
 
 
-def get_snapshot(ip_url):
-    
-    vs = VideoStream(src=ip_url)
-    time.sleep(1.0)
-    
-    frame = vs.read()
-    vs.stop()
-    
+# ---------------------------------------------------------
+# Threaded, reconnecting camera capture
+# ---------------------------------------------------------
+"""
+One background thread per camera URL keeps reading frames and only keeps the most recent one
+(with a sequence number and the time it was captured). If the camera glitches (read fails, or no new frame
+for stall_timeout seconds) the connection is reopened automatically, waiting a bit longer after every
+failed attempt (backoff: 0.5 s, 1 s, 2 s... up to max_backoff).
+
+A network stream that hangs would block cap.read() for the whole FFmpeg timeout (30 s by default), so network
+URLs are opened with an open / read timeout of stall_timeout: a hanging read returns False and the stall is handled
+like any failed read.
+
+Nobody reads the camera for idle_timeout seconds (every viewer left) → the thread stops, the camera is released
+and removed from the registry. The next get_camera() of the same URL opens a new connection.
+
+Usage:
+    camera = get_camera("http://192.168.1.12:8080/video")    # Same object for the same URL in the whole process
+    frame, seq, timestamp = camera.read_latest()
+    frame, seq, timestamp = camera.wait_for_frame(after_seq=seq, timeout=1.0)   # Block until a newer frame
+"""
+class CameraStream:
+
+    def __init__(self, src, stall_timeout=5.0, min_backoff=0.5, max_backoff=10.0, idle_timeout=30.0):
+
+        self.src = src
+        self.stall_timeout = stall_timeout
+        self.idle_timeout = idle_timeout
+        self.last_access = time.time()   # Last time somebody asked for a frame (get_camera / read_latest / wait_for_frame)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        # Latest frame
+        self.frame = None
+        self.seq = 0                 # Sequence number of the latest frame (0 = no frame yet)
+        self.timestamp = None        # time.time() when the latest frame was captured
+        self.cond = threading.Condition()
+
+        self.status = "connecting"
+        self.stopped = False
+        self.thread = None
+
+        # Statistics
+        self.reconnects = 0
+        self.dropped = 0             # Frames replaced by a newer one before anybody read them
+        self.last_read_seq = 0
+        self.recent = collections.deque(maxlen=30)         # Capture times of the last frames (for the FPS)
+        self.decode_ms = collections.deque(maxlen=30)      # Time of the last cap.read() calls
+
+    # Start the background thread
+    def start(self):
+
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped = False
+            self.thread = threading.Thread(target=self.update, name=f"camera-{self.src}", daemon=True)
+            self.thread.start()
+        return self
+
+    # Stop the thread (the camera is released by the thread)
+    def stop(self):
+
+        self.stopped = True
+        with self.cond:
+            self.cond.notify_all()
+
+    # Open the capture, with open / read timeouts for network streams
+    def open(self):
+
+        if isinstance(self.src, str) and "://" in self.src:
+            timeout_ms = int(self.stall_timeout * 1000)
+            return cv2.VideoCapture(self.src, cv2.CAP_ANY, [
+                cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+            ])
+        return cv2.VideoCapture(self.src)
+
+    # Nobody asked for a frame for idle_timeout seconds?
+    def is_idle(self):
+
+        return self.idle_timeout is not None and time.time() - self.last_access > self.idle_timeout
+
+    # Background loop: connect, read frames, reconnect with backoff when something goes wrong
+    def update(self):
+
+        backoff = self.min_backoff
+
+        while not self.stopped:
+            if _release_if_idle(self):
+                break
+
+            self.status = "connecting"
+            cap = self.open()
+
+            if not cap.isOpened():
+                cap.release()
+                self.status = "reconnecting"
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                self.reconnects += 1
+                continue
+
+            self.status = "live"
+            last_frame_time = time.time()
+
+            while not self.stopped:
+                # The last viewer left → release the camera
+                if _release_if_idle(self):
+                    break
+
+                start = time.perf_counter()
+                ok, frame = cap.read()
+                now = time.time()
+
+                if not ok or frame is None:
+                    # A stream can fail a few reads in a row, give up only if it lasts too long
+                    if now - last_frame_time > self.stall_timeout:
+                        self.status = "stalled"
+                        break
+                    time.sleep(0.01)
+                    continue
+
+                self.decode_ms.append((time.perf_counter() - start) * 1000)
+                last_frame_time = now
+                backoff = self.min_backoff
+
+                with self.cond:
+                    if self.seq > self.last_read_seq:
+                        self.dropped += 1
+                    self.frame = frame
+                    self.seq += 1
+                    self.timestamp = now
+                    self.recent.append(now)
+                    self.cond.notify_all()
+
+            cap.release()
+            if not self.stopped and not self.is_idle():
+                self.status = "reconnecting"
+                self.reconnects += 1
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    # The most recent frame: (frame, seq, timestamp), frame is None before the first frame
+    def read_latest(self):
+
+        self.last_access = time.time()
+        with self.cond:
+            self.last_read_seq = self.seq
+            return self.frame, self.seq, self.timestamp
+
+    # Wait until there is a frame newer than after_seq, It returns (None, seq, timestamp) on timeout.
+    def wait_for_frame(self, after_seq=0, timeout=None):
+
+        self.last_access = time.time()
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after_seq or self.stopped, timeout)
+            if self.seq <= after_seq:
+                return None, self.seq, self.timestamp
+            self.last_read_seq = self.seq
+            return self.frame, self.seq, self.timestamp
+
+    # Same as the imutils VideoStream.read(): only the latest frame
+    def read(self):
+
+        return self.read_latest()[0]
+
+    # Capture FPS over the last frames
+    def fps(self):
+
+        recent = list(self.recent)
+        if len(recent) < 2 or recent[-1] == recent[0]:
+            return 0.0
+        return (len(recent) - 1) / (recent[-1] - recent[0])
+
+    def stats(self):
+
+        decode = list(self.decode_ms)
+        status = self.status
+        # Still "live" but nothing arrived for a while: the read is hanging (until the read timeout)
+        if status == "live" and self.timestamp and time.time() - self.timestamp > self.stall_timeout:
+            status = "stalled"
+        return {
+            "status": status,
+            "fps": round(self.fps(), 1),
+            "decode_ms": round(sum(decode) / len(decode), 1) if decode else 0.0,
+            "frame_age_s": round(time.time() - self.timestamp, 2) if self.timestamp else None,
+            "frames": self.seq,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+
+# One persistent connection per camera URL for the whole process
+_cameras = {}
+_cameras_lock = threading.Lock()
+
+
+def get_camera(src):
+
+    with _cameras_lock:
+        camera = _cameras.get(src)
+        if camera is None or camera.stopped:
+            camera = _cameras[src] = CameraStream(src)
+        camera.last_access = time.time()
+        return camera.start()
+
+
+# Called by the camera thread: stop and unregister the camera if nobody used it for idle_timeout seconds.
+# Checked under the registry lock, so a get_camera() running at the same time either keeps it alive or gets a new one.
+def _release_if_idle(camera):
+
+    with _cameras_lock:
+        if not camera.is_idle():
+            return False
+        if _cameras.get(camera.src) is camera:
+            del _cameras[camera.src]
+    camera.stop()
+    camera.status = "released"
+    return True
+
+
+def release_camera(src):
+
+    with _cameras_lock:
+        camera = _cameras.pop(src, None)
+    if camera is not None:
+        camera.stop()
+
+
+def get_snapshot(ip_url, timeout=5.0):
+
+    # Reuses the persistent connection: no new stream and no fixed 1 s sleep per snapshot
+    frame, _, _ = get_camera(ip_url).wait_for_frame(0, timeout)
+
     if frame is not None:
         return frame
-    
+
     return None
 
 
 def get_live_frame(vs):
-    
+
     frame = vs.read()
-    return frame
\ No newline at end of file
+    return frame
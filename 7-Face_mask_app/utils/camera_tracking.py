@@ -0,0 +1,100 @@
+import threading
+
+from utils.class_cache import ClassificationCache
+from utils.event_store import TrackEventLogger, get_event_store
+from utils.live import LiveDetector
+from utils.tracking import Tracker
+
+
+# ---------------------------------------------------------
+# One tracker + event logger per camera for the whole process
+# ---------------------------------------------------------
+"""
+The people in front of a camera are the same whoever is watching: two browser tabs on the Live Detection page
+and the Camera Wall all see the same frames. If each of them had its own Tracker and TrackEventLogger, every
+person would be recorded once per viewer as "new_track" (with colliding IDs, both trackers count from 1),
+and the Dashboard would count them twice.
+
+So, like the camera connections (camera.py) and the display streams (display.py), the tracking of a camera
+lives in a process-wide registry keyed by the camera URL:
+- One LiveDetector (Tracker + ClassificationCache) and one TrackEventLogger per camera.
+- process() runs them under a lock, and only for a frame NEWER than the last processed one
+  (by capture time): if two producers get the same camera frame, only the first one tracks and logs it.
+- The settings (threshold, detect_every, detection mode, classification cache on/off) are NOT stored here:
+  every producer (the live pipeline of the camera, the Camera Wall) keeps its own and passes them with each frame,
+  so the wall can't silently change the settings of the Live Detection page, or the other way around.
+
+Usage:
+    settings = tracking_settings(threshold=0.5, detect_every=3, detection=None, use_cache=True)
+    tracking = get_camera_tracking(url, model)
+    results = tracking.process(frame, timestamp, settings)    # None → this frame was already processed
+"""
+class CameraTracking:
+
+    def __init__(self, camera_id, model):
+
+        self.camera_id = camera_id
+        self.tracker = Tracker(iou_threshold=0.35, max_age=30, use_velocity=True)
+        self.cache = ClassificationCache()
+        self.live = LiveDetector(model, tracker=self.tracker, cache=self.cache)
+        self.event_logger = TrackEventLogger(get_event_store(), camera_id=camera_id)
+
+        self.lock = threading.Lock()
+        self.last_timestamp = 0.0       # Capture time of the last processed frame
+
+    # Settings of the producer of this frame (called under the lock), the tracker and its IDs are kept
+    def apply(self, settings):
+
+        self.live.threshold = settings["threshold"]
+        self.cache.threshold = settings["threshold"]
+        self.live.detect_every = settings["detect_every"]
+        self.live.detection = settings["detection"]
+        self.live.cache = self.cache if settings["use_cache"] else None
+
+    # Switch the classifier (Settings page)
+    def set_model(self, model):
+
+        with self.lock:
+            self.live.model = model
+
+    # Detect + track + log one camera frame (BGR) with the settings of its producer (tracking_settings())
+    # It returns the result dicts (with their "id"), or None if this frame or a newer one was already processed.
+    def process(self, frame, timestamp, settings=None):
+
+        with self.lock:
+            if timestamp is not None and timestamp <= self.last_timestamp:
+                return None
+            self.last_timestamp = timestamp or self.last_timestamp
+
+            self.apply(settings or tracking_settings())
+            results, _ = self.live.process(frame)
+            # Only real events are saved (a new person, or a person whose label changed), once per camera
+            # stamped with the capture time of the frame, not with the time the inference finished
+            self.event_logger.update(results, timestamp)
+            return results
+
+
+# The settings of one producer, as passed to process()
+def tracking_settings(threshold=0.5, detect_every=1, detection=None, use_cache=True):
+
+    return {
+        "threshold": threshold,
+        "detect_every": max(1, int(detect_every)),
+        "detection": detection,
+        "use_cache": bool(use_cache),
+    }
+
+
+_trackings = {}
+_trackings_lock = threading.Lock()
+
+
+def get_camera_tracking(camera_id, model):
+
+    with _trackings_lock:
+        tracking = _trackings.get(camera_id)
+        if tracking is None:
+            tracking = _trackings[camera_id] = CameraTracking(camera_id, model)
+    if tracking.live.model is not model:
+        tracking.set_model(model)
+    return tracking
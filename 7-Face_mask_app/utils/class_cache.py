@@ -0,0 +1,115 @@
+import collections
+import time
+
+from utils.detection import label_prediction
+from utils.tracking import iou
+
+
+# ---------------------------------------------------------
+# Per-track classification cache
+# ---------------------------------------------------------
+"""
+A person who has been stable and confidently labeled for seconds doesn't need MobileNetV2 on every frame.
+For every track ID the cache keeps the running prediction (smoothed over the classifications) and the box
+where the face was last classified. A track is classified again only when:
+
+- its prediction is close to the threshold (|pred - threshold| < margin) → the label is not sure,
+- its box changed a lot since the last classification (IoU < min_iou) → turned the head, got closer...,
+- the last classification is older than refresh_interval seconds.
+
+Entries not used for ttl seconds are removed, and at most max_size tracks are kept (least recently used first).
+
+Usage:
+    cache = ClassificationCache(threshold=0.5)
+    cached = cache.lookup(track_id, box)        # (label, confidence) or None → classify this face
+    label, conf = cache.update(track_id, box, pred)
+"""
+class ClassificationCache:
+
+    def __init__(self, threshold=0.5, margin=0.2, min_iou=0.5, refresh_interval=2.0, ttl=10.0,
+                 max_size=1000, smoothing=0.5):
+
+        self.threshold = threshold
+        self.margin = margin
+        self.min_iou = min_iou
+        self.refresh_interval = refresh_interval
+        self.ttl = ttl
+        self.max_size = max_size
+        self.smoothing = smoothing          # Weight of the new prediction in the running prediction
+
+        # track_id → {"pred", "box", "classified_at", "used_at"}, ordered from least to most recently used
+        self.entries = collections.OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # It returns (label, confidence) if the cached label can be reused, or None if the face must be classified.
+    def lookup(self, track_id, box, now=None):
+
+        now = time.time() if now is None else now
+        entry = self.entries.get(track_id)
+
+        if entry is None or not self.is_fresh(entry, box, now):
+            self.misses += 1
+            return None
+
+        entry["used_at"] = now
+        self.entries.move_to_end(track_id)
+        self.hits += 1
+        return label_prediction(entry["pred"], self.threshold)
+
+    # Save a new classification of the track, It returns the (label, confidence) of the running prediction.
+    def update(self, track_id, box, pred, now=None):
+
+        now = time.time() if now is None else now
+        pred = float(pred)
+
+        entry = self.entries.get(track_id)
+        if entry is not None:
+            pred = self.smoothing * pred + (1 - self.smoothing) * entry["pred"]
+
+        self.entries[track_id] = {"pred": pred, "box": tuple(box), "classified_at": now, "used_at": now}
+        self.entries.move_to_end(track_id)
+        self.evict(now)
+
+        return label_prediction(pred, self.threshold)
+
+    def is_fresh(self, entry, box, now):
+
+        if abs(entry["pred"] - self.threshold) < self.margin:
+            return False
+        if now - entry["classified_at"] > self.refresh_interval:
+            return False
+        if iou(entry["box"], box) < self.min_iou:
+            return False
+        return True
+
+    # Remove the entries not used for ttl seconds, then the least recently used ones above max_size
+    def evict(self, now=None):
+
+        now = time.time() if now is None else now
+
+        while self.entries:
+            track_id, entry = next(iter(self.entries.items()))
+            if now - entry["used_at"] <= self.ttl and len(self.entries) <= self.max_size:
+                break
+            del self.entries[track_id]
+            self.evictions += 1
+
+    # Fraction of the faces that didn't need the classifier
+    def hit_rate(self):
+
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 3),
+            "tracks": len(self.entries),
+            "evictions": self.evictions,
+        }
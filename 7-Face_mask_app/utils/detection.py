@@ -1,54 +1,242 @@
+import threading
+import time
+
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
 
-# Model path
-model_path = r"E:/Omar/Courses/AMIT-main/Final Project of AI/PLAN D (Face Mask Detection)/MobileNetV2.h5"
+from utils.metrics import get_metrics
+from utils.models import face_net_lock, get_face_net, get_mask_model
 
 # Load the model
-def load_mask_model():
+# variant → "keras" (default), "tflite-fp16", "tflite-int8" or "onnx" (see utils/backends.py)
+# The model is loaded only the first time, then the same instance is shared by the whole process (see utils/models.py).
+def load_mask_model(variant="keras", path=None):
     
-    model = load_model(model_path)
+    model = get_mask_model(variant, path)
     return model
 
-# Load the pre-trained Caffe model for face detection
-# 1. prototxt: Defines the model architecture (layers)
-# 2. caffemodel: Contains the trained weights
-face_net = cv2.dnn.readNetFromCaffe(
-    r"E:/Omar/Courses/AMIT-main/Final Project of AI/PLAN D (Face Mask Detection)/deploy.prototxt",
-    r"E:/Omar/Courses/AMIT-main/Final Project of AI/PLAN D (Face Mask Detection)/res10_300x300_ssd_iter_140000.caffemodel"
-)
+# Input size of the MobileNetV2 mask model
+FACE_SIZE = (224, 224)
 
-# Definition of a function
+# Face batch buffer reused between frames, one per thread (the pipeline, the wall worker and the engine threads
+# all preprocess faces at the same time). It only grows: it keeps the size of the largest batch seen so far.
+_face_buffers = threading.local()
+
+
+# Preparing the faces for the mask model
 """
 The function takes:
-- model → Mask detection model (Keras)
-- frame → Camera image
+- frame → Camera image (BGR)
+- boxes → List of (x1, y1, x2, y2) pixel boxes, already clipped to the frame
+- out → (Optional) A preallocated float32 array to write into, by default the cached buffer of this thread
+
+It returns one (N, 224, 224, 3) float32 batch, so all the faces of the frame go to the model together.
+Without `out`, the batch is a view of the thread's buffer: it is overwritten by the next call in the same thread,
+so use it (predict) before preprocessing the next frame.
+"""
+def preprocess_faces(frame, boxes, out=None):
+
+    metrics = get_metrics()
+    start = time.perf_counter()
+
+    # Reuse the buffer of this thread, and allocate a bigger one only when a frame has more faces than ever before.
+    # The faces are written directly into it (no np.expand_dims / np.vstack copies).
+    if out is None:
+        out = getattr(_face_buffers, "batch", None)
+        if out is None or out.shape[0] < len(boxes):
+            out = _face_buffers.batch = np.empty((len(boxes), FACE_SIZE[1], FACE_SIZE[0], 3), dtype="float32")
+    elif out.shape[0] < len(boxes):
+        out = np.empty((len(boxes), FACE_SIZE[1], FACE_SIZE[0], 3), dtype="float32")
+    batch = out[:len(boxes)]
+
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+
+        # We cut out the face from the original image in order to send it to the masked model.
+        face = frame[y1:y2, x1:x2]
+
+        face_rgb = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)    # Convert from BGR → RGB
+        batch[i] = cv2.resize(face_rgb, FACE_SIZE)          # Resize to 224x224 and write it directly into the batch
+
+    # Normalization (in place, same float32 result as img_to_array(face) / 255.0)
+    batch /= 255.0
+
+    metrics.observe("preprocess_ms", (time.perf_counter() - start) * 1000)
+    return batch
+
+
+# Turn a prediction (0 → 1) into a (label, confidence) pair
+def label_prediction(pred, threshold=0.5):
+
+    if pred > threshold:
+        return "Without Mask", pred
+
+    return "With Mask", 1 - pred
+
+
+# Run the mask model on a batch of faces
+# It returns the raw predictions (N,), Values from 0 → 1
+def predict_faces(model, faces):
+
+    # No faces → no need to call the model at all.
+    if len(faces) == 0:
+        return np.empty((0,), dtype="float32")
+
+    # Make prediction for all faces in one forward pass
+    with get_metrics().timer("mask_predict_ms"):
+        return model.predict(faces, batch_size=len(faces), verbose=0)[:, 0]
+
+
+# Classify a batch of faces
+"""
+The function takes:
+- model → Mask detection model (Keras or any backend of utils/backends.py)
+- faces → (N, 224, 224, 3) batch from preprocess_faces()
 - threshold → Threshold separating Mask / No Mask
+
+It returns a list of (label, confidence), in the same order as the faces.
+"""
+def classify_faces(model, faces, threshold=0.5):
+
+    return [label_prediction(pred, threshold) for pred in predict_faces(model, faces)]
+
+
+# Vectorized post-processing of the SSD output of ONE frame
 """
-def detect_mask_dnn(model, frame, threshold=0.5):
+The function takes:
+- detections → (Detections, 7) array, the rows of the SSD output that belong to this frame
+- w, h → Frame width and height
+- conf_threshold → Minimum face confidence
+- nms_threshold → (Optional) IoU threshold for cv2.dnn.NMSBoxes, to remove overlapping boxes of the same face
+
+Caffe models like res10_300x300_ssd return 7 numbers (information) for each discovered face:
+- 0 ==> Batch ID
+- 1 ==> Class ID
+- 2 ==> Confidence
+- 3 ==> Start X (xmin)
+- 4 ==> Start Y (ymin)
+- 5 ==> End X (xmax)
+- 6 ==> End Y (ymax)
+
+It returns:
+- boxes → (N, 4) int array of (x1, y1, x2, y2) pixel boxes
+- scores → (N,) array of their confidences
+"""
+def filter_detections(detections, w, h, conf_threshold=0.5, nms_threshold=None):
     
-    # Extracting frame dimensions ((height, width, channels))
-    # It is later used to convert DNN coordinates from normalized to actual pixels.
-    h, w = frame.shape[:2]
+    # One boolean mask on the confidence column instead of checking the 200 candidates one by one.
+    # If confidence is low → ignore the face.
+    keep = detections[:, 2] >= conf_threshold
+    scores = detections[keep, 2]
+    
+    """
+    The output of the Caffe face detector returns the coordinates as follows: (x1_norm, y1_norm, x2_norm, y2_norm)
+    If the model gives: (0.2, 0.1, 0.7, 0.6)
+    
+    x1 = 20% of the image width
+    y1 = 10% of the image height
+    x2 = 70% of the image width
+    y2 = 60% of the image height
+    But these are not pixels.
+    
+    So, We need to convert them to pixels (all the boxes at once), then to integers.
+    """
+    boxes = (detections[keep, 3:7] * np.array([w, h, w, h])).astype("int")
+    
+    # Protection against coordinates going outside the frame
+    np.clip(boxes[:, 0::2], 0, w, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, h, out=boxes[:, 1::2])
+    
+    # Reject degenerate boxes: if the square comes out empty (its width is 0 or its length is 0), we ignore it so that the program doesn't crash.
+    valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    boxes, scores = boxes[valid], scores[valid]
+    
+    # Optional Non-Maximum Suppression: keep only the best box among boxes that overlap too much.
+    if nms_threshold is not None and len(boxes) > 1:
+        xywh = np.column_stack([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]])
+        idx = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf_threshold, nms_threshold)
+        idx = np.sort(np.array(idx, dtype="int").reshape(-1))
+        boxes, scores = boxes[idx], scores[idx]
+    
+    return boxes, scores
+
+
+# Convert the raw SSD output of ONE frame into a list of (x1, y1, x2, y2) pixel boxes
+def extract_face_boxes(detections, w, h, nms_threshold=None):
+    
+    boxes, _ = filter_detections(detections, w, h, nms_threshold=nms_threshold)
+    return [tuple(box) for box in boxes.tolist()]
+
+
+# Run the Caffe face detector on one frame
+# It returns the list of (x1, y1, x2, y2) face boxes.
+def detect_faces(frame, nms_threshold=None):
+    
+    return detect_faces_batch([frame], nms_threshold)[0]
+
+
+# Run the Caffe face detector on several frames in ONE forward pass
+"""
+The function takes:
+- frames → List of camera images (they can have different sizes, each one is resized to 300x300)
+- nms_threshold → (Optional) IoU threshold to remove overlapping boxes (see filter_detections)
+
+It returns one list of (x1, y1, x2, y2) boxes per frame, in the same order as the frames.
+"""
+def detect_faces_batch(frames, nms_threshold=None):
+    
+    if len(frames) == 0:
+        return []
+    
+    all_detections = run_face_net(frames)
+    
+    all_boxes = []
+    for frame, detections in zip(frames, all_detections):
+        # Extracting frame dimensions ((height, width, channels))
+        # It is later used to convert DNN coordinates from normalized to actual pixels.
+        h, w = frame.shape[:2]
+        all_boxes.append(extract_face_boxes(detections, w, h, nms_threshold))
+    
+    return all_boxes
+
+
+# Run the Caffe face network on several images in ONE forward pass
+"""
+The function takes:
+- frames → List of images (they can have different sizes, each one is resized to `size`)
+- size → (width, height) of the network input, 300x300 is the size the model was trained with
+
+It returns one (Detections, 7) array of raw SSD rows per image, in the same order as the images.
+"""
+def run_face_net(frames, size=(300, 300)):
     
-    # It converts the image (frame) into a blob, which is the format needed by the DNN (Caffe Face Detection Network) model.
+    # It converts the images (frames) into ONE blob, which is the format needed by the DNN (Caffe Face Detection Network) model.
     # blob ==> It is an image that has been: Resized, Reordered, Meaned (subtracted) and Prepared to feed into the neural model, So that the input is ready for use within.
     """
-    frame ==> Camera image
+    frames ==> Images
     1.0 ==> scalefactor
-    (300, 300) ==> This is the required image size for the model.
+    size ==> Network input size, (300, 300) is the size the model was trained with.
     (104.0, 177.0, 123.0) ==> (BGR) These are the Mean subtraction values. The Caffe network was trained on data to which the same process was applied.
     """
-    blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), (104.0, 177.0, 123.0))
+    blob = cv2.dnn.blobFromImages(frames, 1.0, size, (104.0, 177.0, 123.0))
     
-    # Give the model the picture that he will analyze.
-    face_net.setInput(blob)
+    # The face detector is loaded on the first call and shared by all threads (one forward pass at a time).
+    face_net = get_face_net()
+    with face_net_lock, get_metrics().timer("face_net_forward_ms"):
+        # Give the model the pictures that he will analyze.
+        face_net.setInput(blob)
+        
+        # This is the line that actually activates the Face Detector.
+        # detections = [1, 1, Detections of all frames, Data Info]
+        # With several frames, column 0 (Batch ID) tells us which frame every detection belongs to.
+        detections = face_net.forward()[0, 0]
     
-    # This is the line that actually activates the Face Detector.
-    # detections = [Batch Size, Class Label, Detections, Data Info]
-    detections = face_net.forward()
+    if len(frames) == 1:
+        return [detections]
+    return [detections[detections[:, 0] == idx] for idx in range(len(frames))]
+
+
+# Build the result dicts from the boxes and their (label, confidence)
+def build_results(boxes, labels):
     
     # Create a list to save results, All detected faces will be stored there along with:
     # - The box
@@ -62,78 +250,7 @@ def detect_mask_dnn(model, frame, threshold=0.5):
     }
     """
     
-    # Passing over each detected face
-    # detections.shape[2] = Number of faces detected.
-    for i in range(detections.shape[2]):
-        
-        # Caffe models like res10_300x300_ssd when you forward, return the result in the form of a (4D Array), like this: [Batch Size, Class Label, Detections, Data Info]
-        """ 
-        Why [0, 0, i, 2]?
-        
-        - The first zero [0]: This is the batch number. Since we're working on one image (or frame) at a time, we always select image number 0 (the first one).
-        - The second zero [0]: This is the class label. In this particular model, this field is reserved and not being used, so we use 0.
-        - The variable i: This is the number of the discovered face. The model might find 5 faces, so i iterates through them one by one (face 1, 2, 3...).
-        - The last number (and the most important): This specifies what information you want about this face. For each discovered face, the model returns 7 numbers (information) consecutively.
-        """
-        """
-        - 0 ==> Batch ID
-        - 1 ==> Class ID
-        - 2 ==> Confidence
-        - 3 ==> Start X (xmin)
-        - 4 ==> Start Y (ymin)
-        - 5 ==> End X (xmax)
-        - 6 ==> End Y (ymax)
-        """
-        confidence = detections[0, 0, i, 2]
-        # If confidence is low → ignore the face.
-        if confidence < 0.5:
-            continue
-        
-        
-        """
-        The output of the Caffe face detector returns the coordinates as follows: (x1_norm, y1_norm, x2_norm, y2_norm)
-        If the model gives: (0.2, 0.1, 0.7, 0.6)
-        
-        x1 = 20% of the image width
-        y1 = 10% of the image height
-        x2 = 70% of the image width
-        y2 = 60% of the image height
-        But these are not pixels.
-        
-        So, We need to convert it to pixels
-        """
-        box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-        # Converting coordinates to integers, Because the resulting coordinates are float
-        x1, y1, x2, y2 = box.astype("int")
-        
-        # Protection against coordinates going outside the frame
-        x1, y1 = max(0, x1), max(0, y1)
-        x2, y2 = min(w, x2), min(h, y2)
-        
-        # We cut out the face from the original image in order to send it to the masked model.
-        face = frame[y1:y2, x1:x2]
-        # This is an additional protection; if, after all these calculations, the square comes out empty (its width is 0 or its length is 0), we ignore it so that the program doesn't crash.
-        if face.size == 0:
-            continue
-        
-        
-        # Preparing the face for the mask model
-        face_rgb = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)    # Convert from BGR → RGB    
-        face_resized = cv2.resize(face_rgb, (224, 224))     # Resize to 224x224
-        face_array = img_to_array(face_resized) / 255.0     # Convert image to matrix and Normalization
-        face_input = np.expand_dims(face_array, axis=0)     # Add an extra dimension so the image becomes batch size = 1
-        
-        # Make prediction, Value from 0 → 1
-        pred = model.predict(face_input, verbose=0)[0][0]
-        
-        if pred > threshold:
-            label = "Without Mask"
-            color = (255, 0, 0)
-            conf = pred
-        else:
-            label = "With Mask"
-            color = (0, 255, 0)
-            conf = 1 - pred
+    for (x1, y1, x2, y2), (label, conf) in zip(boxes, labels):
         
         # Save face result to (results) list 
         results.append({
@@ -142,4 +259,152 @@ def detect_mask_dnn(model, frame, threshold=0.5):
             'confidence': float(conf)
         })
     
-    return results
\ No newline at end of file
+    return results
+
+
+# Definition of a function
+"""
+The function takes:
+- model → Mask detection model (Keras or any backend of utils/backends.py)
+- frame → Camera image
+- threshold → Threshold separating Mask / No Mask
+- nms_threshold → (Optional) IoU threshold to remove overlapping face boxes
+- detection → (Optional) Detection config of the camera: mode, ROI, tiles (see detect_faces_mode)
+"""
+def detect_mask_dnn(model, frame, threshold=0.5, nms_threshold=None, detection=None):
+    
+    # First pass: find every face in the frame.
+    boxes = detect_faces_mode(frame, detection, nms_threshold)
+    get_metrics().observe("faces_per_frame", len(boxes))
+    
+    # Second pass: classify all the faces of the frame in a single forward pass.
+    labels = classify_faces(model, preprocess_faces(frame, boxes), threshold)
+    
+    return build_results(boxes, labels)
+
+
+# ---------------------------------------------------------
+# Detection modes (per camera): input resolution, region of interest and tiles
+# ---------------------------------------------------------
+"""
+By default the whole frame is squeezed into 300x300, on a 1080p / 4K camera a distant face becomes a few pixels.
+A detection config (a simple dict, one per camera) chooses how the face detector sees the frame:
+
+- "mode":
+    "full" → The whole frame (or ROI) resized to 300x300 (the original behaviour)
+    "downscale" → The frame resized to input_width pixels wide, keeping its aspect ratio (e.g. 640x360),
+                  more detail than 300x300 for wide frames, and a fixed cost whatever the camera resolution
+    "tiled" → The frame cut into tiles (rows x cols, overlapping), each tile resized to 300x300,
+              all tiles in ONE forward pass, then the boxes of neighbouring tiles are merged
+- "roi" → (x1, y1, x2, y2) in fractions of the frame (e.g. (0.3, 0.0, 0.7, 1.0) for a doorway),
+          only that region is analyzed, None = the whole frame
+- "input_width" → Width of the network input in "downscale" mode
+- "tiles" → (rows, cols) in "tiled" mode
+- "overlap" → Fraction of a tile shared with its neighbour, so a face on a border is whole in one tile
+
+Usage:
+    boxes = detect_faces_mode(frame, {"mode": "tiled", "tiles": (2, 3), "roi": (0.3, 0.0, 0.7, 1.0)})
+"""
+DETECTION_MODES = ("full", "downscale", "tiled")
+
+DEFAULT_DETECTION = {"mode": "full", "roi": None, "input_width": 640, "tiles": (2, 2), "overlap": 0.2}
+
+
+# ROI fractions → (x1, y1, x2, y2) pixels inside a (w, h) frame
+def roi_pixels(roi, w, h):
+
+    if roi is None:
+        return 0, 0, w, h
+
+    x1, y1, x2, y2 = roi
+    x1, x2 = int(round(min(max(x1, 0.0), 1.0) * w)), int(round(min(max(x2, 0.0), 1.0) * w))
+    y1, y2 = int(round(min(max(y1, 0.0), 1.0) * h)), int(round(min(max(y2, 0.0), 1.0) * h))
+    if x2 <= x1 or y2 <= y1:
+        return 0, 0, w, h
+    return x1, y1, x2, y2
+
+
+# Split a (w, h) image into rows x cols overlapping tiles, It returns a list of (x1, y1, x2, y2).
+def tile_grid(w, h, tiles=(2, 2), overlap=0.2):
+
+    rows, cols = tiles
+
+    def spans(size, n):
+        if n <= 1:
+            return [(0, size)]
+        # n tiles of length `length`, where two neighbours share overlap * length pixels
+        length = int(np.ceil(size / (n - (n - 1) * overlap)))
+        step = (size - length) / (n - 1)
+        return [(int(round(i * step)), int(round(i * step)) + length) for i in range(n)]
+
+    return [(x1, y1, min(x2, w), min(y2, h)) for y1, y2 in spans(h, rows) for x1, x2 in spans(w, cols)]
+
+
+# Merge the boxes found by several tiles
+"""
+- Two boxes of the same face in two tiles overlap a lot → normal IoU test (like NMS), the best score is kept
+- A face cut by a tile border gives a half box inside the full box of the other tile
+  → then we remove a box if most of it (containment) is inside a bigger kept box.
+
+It returns the indices of the boxes to keep.
+"""
+def merge_boxes(boxes, scores, iou_threshold=0.3, containment=0.7):
+
+    boxes = np.asarray(boxes, dtype="float64").reshape(-1, 4)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    # Intersection area of every pair of boxes
+    inter_w = np.clip(np.minimum(boxes[:, None, 2], boxes[None, :, 2]) - np.maximum(boxes[:, None, 0], boxes[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(boxes[:, None, 3], boxes[None, :, 3]) - np.maximum(boxes[:, None, 1], boxes[None, :, 1]), 0, None)
+    inter = inter_w * inter_h
+    iou = inter / (areas[:, None] + areas[None, :] - inter)
+
+    # 1. Greedy NMS, best score first
+    keep = []
+    for i in np.argsort(-np.asarray(scores)):
+        if all(iou[i, k] <= iou_threshold for k in keep):
+            keep.append(int(i))
+
+    # 2. Drop the partial boxes: mostly inside a bigger kept box
+    return [i for i in keep if not any(areas[k] > areas[i] and inter[i, k] > containment * areas[i] for k in keep)]
+
+
+# Run the face detector on one frame with a detection config (see above)
+# It returns the list of (x1, y1, x2, y2) face boxes in frame coordinates.
+def detect_faces_mode(frame, detection=None, nms_threshold=None):
+
+    if detection is None or (detection.get("mode", "full") == "full" and detection.get("roi") is None):
+        return detect_faces(frame, nms_threshold)
+
+    config = {**DEFAULT_DETECTION, **detection}
+    if config["mode"] not in DETECTION_MODES:
+        raise ValueError(f"Unknown detection mode '{config['mode']}', choose one of {DETECTION_MODES}")
+
+    # Only the region of interest is analyzed, its boxes are moved back to frame coordinates at the end
+    h, w = frame.shape[:2]
+    rx1, ry1, rx2, ry2 = roi_pixels(config["roi"], w, h)
+    region = frame[ry1:ry2, rx1:rx2]
+    rh, rw = region.shape[:2]
+
+    if config["mode"] == "tiled":
+        tiles = tile_grid(rw, rh, config["tiles"], config["overlap"])
+        crops = [region[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+
+        all_boxes, all_scores = [], []
+        for (x1, y1, x2, y2), detections in zip(tiles, run_face_net(crops)):
+            boxes, scores = filter_detections(detections, x2 - x1, y2 - y1)
+            all_boxes.append(boxes + np.array([x1, y1, x1, y1]))
+            all_scores.append(scores)
+
+        boxes, scores = np.concatenate(all_boxes), np.concatenate(all_scores)
+        if len(boxes) > 1:
+            boxes = boxes[np.sort(merge_boxes(boxes, scores, nms_threshold if nms_threshold is not None else 0.3))]
+    else:
+        size = (300, 300)
+        if config["mode"] == "downscale":
+            width = min(int(config["input_width"]), rw)
+            size = (width, max(1, int(round(rh * width / rw))))
+        boxes, _ = filter_detections(run_face_net([region], size)[0], rw, rh, nms_threshold=nms_threshold)
+
+    boxes = boxes + np.array([rx1, ry1, rx1, ry1])
+    return [tuple(box) for box in boxes.tolist()]
@@ -0,0 +1,221 @@
+import collections
+import http.server
+import threading
+import time
+import urllib.parse
+
+import cv2
+
+from utils.metrics import get_metrics
+
+
+# Resize a frame to at most max_width pixels wide and encode it to JPEG (BGR in, bytes out)
+# INTER_AREA gives a clean downscale, and cv2.imencode takes BGR directly → no RGB conversion needed.
+def encode_jpeg(frame, max_width=960, quality=80):
+
+    h, w = frame.shape[:2]
+    if max_width and w > max_width:
+        frame = cv2.resize(frame, (max_width, int(round(h * max_width / w))), interpolation=cv2.INTER_AREA)
+
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return jpeg.tobytes()
+
+
+# ---------------------------------------------------------
+# Display stream: one encoded frame per camera, shared by every viewer
+# ---------------------------------------------------------
+"""
+Sending the full resolution RGB array to st.image makes Streamlit encode it again for every viewer,
+at camera resolution. Instead, the annotated frame is:
+1. Downsized to the viewer resolution (max_width) and JPEG-encoded ONCE (quality is tunable).
+2. Kept as the camera's latest display frame: every viewer (Streamlit sessions, MJPEG clients) sends these bytes as is.
+3. Capped at max_fps: the detection can run faster or slower, the display never encodes more than max_fps frames.
+Each camera has ONE producer (utils/live_pipeline.py, or the Camera Wall worker for the frames it tracked),
+the viewers only read.
+
+Usage:
+    display = get_display("door")
+    display.configure(max_width=960, quality=80, max_fps=15)
+    display.publish(annotated_frame, capture_ts)               # Pipeline / worker thread
+    jpeg, seq, capture_ts = display.wait_for_frame(last_seq, timeout=0.5)   # Viewers
+"""
+class DisplayStream:
+
+    def __init__(self, name, max_width=960, quality=80, max_fps=15.0):
+
+        self.name = name
+        self.max_width = max_width
+        self.quality = quality
+        self.max_fps = max_fps
+
+        # Latest encoded frame
+        self.jpeg = None
+        self.seq = 0
+        self.capture_ts = None           # time.time() when the camera captured this frame
+        self.cond = threading.Condition()
+        self.last_publish = 0.0
+
+        # Statistics
+        self.skipped = 0                 # Frames not encoded because of the FPS cap
+        self.recent = collections.deque(maxlen=60)       # (publish time, bytes) of the last frames
+        self.encode_ms = collections.deque(maxlen=60)
+
+    def configure(self, max_width=None, quality=None, max_fps=None):
+
+        if max_width is not None:
+            self.max_width = int(max_width)
+        if quality is not None:
+            self.quality = int(quality)
+        if max_fps is not None:
+            self.max_fps = float(max_fps)
+
+    # Encode and share a new annotated frame (BGR)
+    # It returns the JPEG bytes, or None if the frame was skipped because of the FPS cap.
+    def publish(self, frame, capture_ts=None):
+
+        # Check-and-set under the lock: two threads publishing at the same time can't both pass the FPS cap
+        now = time.time()
+        with self.cond:
+            if self.max_fps and now - self.last_publish < 1.0 / self.max_fps:
+                self.skipped += 1
+                return None
+            self.last_publish = now
+
+        start = time.perf_counter()
+        jpeg = encode_jpeg(frame, self.max_width, self.quality)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        metrics = get_metrics()
+        metrics.observe("display_encode_ms", elapsed)
+        metrics.observe("display_frame_kb", len(jpeg) / 1024)
+
+        with self.cond:
+            # A frame captured before the one already shown (slower producer) would make the video jump back
+            if capture_ts is not None and self.capture_ts is not None and capture_ts < self.capture_ts:
+                self.skipped += 1
+                return None
+            self.jpeg = jpeg
+            self.seq += 1
+            self.capture_ts = capture_ts if capture_ts is not None else now
+            self.recent.append((now, len(jpeg)))
+            self.encode_ms.append(elapsed)
+            self.cond.notify_all()
+
+        return jpeg
+
+    # The latest frame: (jpeg, seq, capture_ts), jpeg is None before the first frame
+    def latest(self):
+
+        with self.cond:
+            return self.jpeg, self.seq, self.capture_ts
+
+    # Wait until there is a frame newer than after_seq, It returns (None, seq, capture_ts) on timeout.
+    def wait_for_frame(self, after_seq=0, timeout=None):
+
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after_seq, timeout)
+            if self.seq <= after_seq:
+                return None, self.seq, self.capture_ts
+            return self.jpeg, self.seq, self.capture_ts
+
+    def stats(self):
+
+        recent = list(self.recent)
+        encode = list(self.encode_ms)
+        span = recent[-1][0] - recent[0][0] if len(recent) > 1 else 0.0
+        return {
+            "display": self.name,
+            "fps": round((len(recent) - 1) / span, 1) if span > 0 else 0.0,
+            # Bytes per second sent to EACH viewer (the frames are the same for everybody)
+            "kbytes_per_s": round(sum(size for _, size in recent[1:]) / span / 1024, 1) if span > 0 else 0.0,
+            "frame_kb": round(recent[-1][1] / 1024, 1) if recent else 0.0,
+            "encode_ms": round(sum(encode) / len(encode), 2) if encode else 0.0,
+            "skipped": self.skipped,
+        }
+
+
+# One display stream per camera for the whole process
+_displays = {}
+_displays_lock = threading.Lock()
+
+
+def get_display(name):
+
+    with _displays_lock:
+        display = _displays.get(name)
+        if display is None:
+            display = _displays[name] = DisplayStream(name)
+        return display
+
+
+# ---------------------------------------------------------
+# Optional MJPEG endpoint (for browsers / video walls outside Streamlit)
+# ---------------------------------------------------------
+# http://localhost:8600/stream?camera=<display name> → multipart MJPEG stream (works in an <img> tag or VLC)
+# http://localhost:8600/snapshot?camera=<display name> → the latest JPEG
+# Every client sends the same already-encoded bytes, nothing is encoded per client.
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_mjpeg_server(port=8600, host="127.0.0.1"):
+
+    global _server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            name = urllib.parse.parse_qs(url.query).get("camera", [None])[0]
+            with _displays_lock:
+                display = _displays.get(name)
+            if display is None:
+                self.send_error(404, "Unknown camera")
+                return
+
+            if url.path == "/snapshot":
+                jpeg, _, _ = display.latest()
+                if jpeg is None:
+                    self.send_error(503, "No frame yet")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(jpeg)))
+                self.end_headers()
+                self.wfile.write(jpeg)
+                return
+
+            if url.path != "/stream":
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            seq = 0
+            try:
+                while True:
+                    jpeg, new_seq, _ = display.wait_for_frame(seq, timeout=5.0)
+                    if jpeg is None:
+                        continue
+                    seq = new_seq
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg + b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass        # The client went away
+
+        def log_message(self, *args):
+            pass
+
+    # Only one server per process, the next calls return the running one
+    with _server_lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer((host, port), Handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="mjpeg-server", daemon=True).start()
+        return _server
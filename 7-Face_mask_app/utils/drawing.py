@@ -0,0 +1,41 @@
+import cv2
+
+
+# Draw the boxes and write the ID on the frame (in place)
+"""
+The function takes:
+- frame → Camera image (BGR), it is modified directly
+- results → Result dicts with 'box' (x, y, width, height), 'label', 'confidence' and 'id'
+"""
+def draw_results(frame, results):
+
+    for r in results:
+        # Retrieve the person's data.
+        x, y, w, h = r["box"]
+        label = r["label"]
+        conf = r["confidence"]
+        person_id = r["id"]             # Person's ID
+
+        # Color identification: Green for the mask, red without the mask
+        color = (0, 255, 0) if label == "With Mask" else (0, 0, 255)
+
+        # ------- Box drawing -------
+        # frame ==> The current image coming from the camera.
+        # (x, y) ==> The top left dot of the box.
+        # (x + w, y + h) ==> The bottom right point of the box.
+        # color ==> Color of the box.
+        # 3 ==> Text thickness..
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 3)
+
+        # Write the text over the box (ID - Status - Confirmation percentage)
+        cv2.putText(
+            frame,                                          # The current image coming from the camera.
+            f"ID {person_id} - {label} {conf*100:.1f}%",    # This is the text that will be displayed.
+            (x, y - 10),                                    # Writing location: 10 pixels above the box.
+            cv2.FONT_HERSHEY_SIMPLEX,                       # Font type.
+            0.6,                                            # Text size.
+            color,                                          # Text color (same color as the rectangle).
+            2                                               # Text thickness.
+        )
+
+    return frame
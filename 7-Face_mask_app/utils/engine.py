@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils.detection import (
+    FACE_SIZE,
+    build_results,
+    detect_faces_batch,
+    label_prediction,
+    predict_faces,
+    preprocess_faces,
+)
+
+
+# ---------------------------------------------------------
+# Multi-frame, multi-camera batched inference engine
+# ---------------------------------------------------------
+"""
+Instead of running face_net.forward() and the mask model once per frame (and once per face),
+every camera submits its frames to ONE engine. A background thread collects the waiting frames and:
+
+1. Runs the Caffe SSD once on all of them (cv2.dnn.blobFromImages).
+2. Sends every face crop of every frame to the mask model in one batch.
+3. Routes the results back to the camera that sent each frame.
+
+The latency budget is controlled by:
+- max_batch → Maximum number of frames in one batch.
+- max_wait → Maximum time (seconds) the first frame of a batch waits for other frames to arrive.
+- workers → Number of threads taking batches from the queue. The face detector runs one batch at a time,
+            but with 2+ workers the preprocessing and the mask model of a batch overlap with the next forward pass.
+
+Usage:
+    engine = DetectionEngine(model, max_batch=8, max_wait=0.02).start()
+    future = engine.submit("door_1", frame, threshold=0.5)
+    results = future.result()      # Same list of dicts as detect_mask_dnn()
+"""
+class DetectionEngine:
+
+    def __init__(self, model, max_batch=8, max_wait=0.02, max_pending=64, workers=1):
+
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.workers = max(1, int(workers))
+
+        # Frames waiting to be processed: (camera_id, frame, threshold, future)
+        self.pending = queue.Queue(maxsize=max_pending)
+
+        self.stopped = True
+        self.threads = []
+
+        # Statistics (frames / faces / batches processed so far)
+        self.stats = {"frames": 0, "faces": 0, "batches": 0, "busy_seconds": 0.0}
+        self.camera_frames = {}
+        self.stats_lock = threading.Lock()
+
+    # Start the background threads
+    def start(self):
+
+        if any(thread.is_alive() for thread in self.threads):
+            return self
+
+        self.stopped = False
+        self.threads = [
+            threading.Thread(target=self.run, name=f"engine-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    # Stop the background threads (frames still waiting are cancelled)
+    def stop(self):
+
+        self.stopped = True
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+
+        while True:
+            try:
+                _, _, _, future = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    # Send a frame to the engine, It returns a Future that will hold the results of this frame.
+    # If the engine is overloaded (max_pending frames waiting) → queue.Full is raised, so the caller can drop the frame.
+    def submit(self, camera_id, frame, threshold=0.5):
+
+        future = Future()
+        self.pending.put_nowait((camera_id, frame, threshold, future))
+        return future
+
+    # Blocking helper: submit a frame and wait for its results
+    def detect(self, camera_id, frame, threshold=0.5, timeout=None):
+
+        return self.submit(camera_id, frame, threshold).result(timeout=timeout)
+
+    # Collect up to max_batch frames, waiting at most max_wait after the first one
+    def collect_batch(self):
+
+        try:
+            batch = [self.pending.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    # Background loop
+    def run(self):
+
+        while not self.stopped:
+            batch = self.collect_batch()
+            if not batch:
+                continue
+
+            # A future can be cancelled by the caller while it was waiting.
+            batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                outputs = self.process_batch([item[1] for item in batch], [item[2] for item in batch])
+            except Exception as e:
+                for item in batch:
+                    item[3].set_exception(e)
+                continue
+
+            # Route every result back to its camera
+            with self.stats_lock:
+                for camera_id, _, _, _ in batch:
+                    self.camera_frames[camera_id] = self.camera_frames.get(camera_id, 0) + 1
+                self.stats["busy_seconds"] += time.perf_counter() - start
+                self.stats["batches"] += 1
+                self.stats["frames"] += len(batch)
+
+            for (_, _, _, future), results in zip(batch, outputs):
+                future.set_result(results)
+
+    # Run the detector and the classifier on a list of frames
+    # It returns one list of result dicts per frame.
+    def process_batch(self, frames, thresholds):
+
+        # 1. One forward pass of the face detector for all frames
+        all_boxes = detect_faces_batch(frames)
+
+        # 2. One batch with every face of every frame
+        total = sum(len(boxes) for boxes in all_boxes)
+        faces = np.empty((total, FACE_SIZE[1], FACE_SIZE[0], 3), dtype="float32")
+
+        offset = 0
+        for frame, boxes in zip(frames, all_boxes):
+            preprocess_faces(frame, boxes, out=faces[offset:offset + len(boxes)])
+            offset += len(boxes)
+
+        # 3. One forward pass of the mask model for all faces
+        preds = predict_faces(self.model, faces)
+        with self.stats_lock:
+            self.stats["faces"] += total
+
+        # 4. Split the predictions back per frame
+        outputs = []
+        offset = 0
+        for boxes, threshold in zip(all_boxes, thresholds):
+            labels = [label_prediction(pred, threshold) for pred in preds[offset:offset + len(boxes)]]
+            outputs.append(build_results(boxes, labels))
+            offset += len(boxes)
+
+        return outputs
+
+    # Average number of frames per batch (how well the batching works)
+    def average_batch_size(self):
+
+        if self.stats["batches"] == 0:
+            return 0.0
+
+        return self.stats["frames"] / self.stats["batches"]
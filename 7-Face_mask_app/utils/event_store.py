@@ -0,0 +1,264 @@
+import collections
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from utils.models import REPO_DIR
+
+# ---------------------------------------------------------
+# Persistent, append-only event store (SQLite in WAL mode)
+# ---------------------------------------------------------
+"""
+Only real events are stored, not one row per frame:
+- "new_track" → A new person appeared (first label)
+- "label_change" → A tracked person changed label (e.g. took the mask off)
+
+record() never blocks the detection loop: it puts the event on a queue, and a background thread
+writes the events in batches (one transaction per batch). WAL mode lets the Dashboard read while we write.
+
+The database is data/events.db in the repository, or the path in the FACE_MASK_EVENTS_DB environment variable.
+
+Usage:
+    store = get_event_store()
+    store.record("door_1", track_id=7, event="new_track", label="With Mask", confidence=0.98)
+    rows = store.query(since=time.time() - 3600)
+"""
+DEFAULT_DB_PATH = os.environ.get("FACE_MASK_EVENTS_DB", os.path.join(REPO_DIR, "data", "events.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    camera_id TEXT NOT NULL,
+    track_id INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_camera_ts ON events (camera_id, ts);
+"""
+
+COLUMNS = ("ts", "camera_id", "track_id", "event", "label", "confidence")
+
+
+class EventStore:
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=200, flush_interval=1.0, max_pending=10000):
+
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self.connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.dropped = 0            # Events lost because the writer couldn't keep up
+        self.written = 0
+
+        # Functions called with every written batch (e.g. the Dashboard aggregates)
+        self.listeners = []
+        self.write_lock = threading.Lock()
+
+        self.stopped = False
+        self.thread = threading.Thread(target=self.write_loop, name="event-writer", daemon=True)
+        self.thread.start()
+
+    def connect(self):
+
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")       # Safe with WAL, and much faster than FULL
+        return conn
+
+    # Add an event (non-blocking)
+    def record(self, camera_id, track_id, event, label, confidence=None, ts=None):
+
+        row = (time.time() if ts is None else ts, str(camera_id), int(track_id), event, label,
+               None if confidence is None else float(confidence))
+        try:
+            self.pending.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    # Background thread: write the events in batches
+    def write_loop(self):
+
+        conn = self.connect()
+        while not self.stopped or not self.pending.empty():
+            batch = []
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+
+            if not batch:
+                continue
+
+            with self.write_lock:
+                with conn:
+                    conn.executemany(f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", batch)
+                self.written += len(batch)
+
+                if self.listeners:
+                    events = [dict(zip(COLUMNS, row)) for row in batch]
+                    for listener in self.listeners:
+                        listener(events)
+
+        conn.close()
+
+    # Call listener(events) after every written batch.
+    # backfill(store) runs first, while no batch can be written → no event is missed or counted twice.
+    def add_listener(self, listener, backfill=None):
+
+        with self.write_lock:
+            if backfill is not None:
+                backfill(self)
+            self.listeners.append(listener)
+
+    # Read events (a new connection per call → never waits for the writer thread)
+    def query(self, since=None, until=None, camera_id=None, event=None, limit=None):
+
+        where, params = [], []
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        if camera_id is not None:
+            where.append("camera_id = ?")
+            params.append(camera_id)
+        if event is not None:
+            where.append("event = ?")
+            params.append(event)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        conn = self.connect()
+        try:
+            return [dict(zip(COLUMNS, row)) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    # Number of new people per label, e.g. {"With Mask": 120, "Without Mask": 14}
+    def count_people(self, since=None, camera_id=None):
+
+        sql = "SELECT label, COUNT(*) FROM events WHERE event = 'new_track'"
+        params = []
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        if camera_id is not None:
+            sql += " AND camera_id = ?"
+            params.append(camera_id)
+        sql += " GROUP BY label"
+
+        conn = self.connect()
+        try:
+            return dict(conn.execute(sql, params).fetchall())
+        finally:
+            conn.close()
+
+    # New people per (camera, bucket of `size` seconds, label), oldest bucket first
+    def bucket_counts(self, size, since=None):
+
+        sql = "SELECT camera_id, CAST(ts / ? AS INTEGER) * ? AS bucket, label, COUNT(*) FROM events WHERE event = 'new_track'"
+        params = [size, size]
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        sql += " GROUP BY camera_id, bucket, label ORDER BY bucket"
+
+        conn = self.connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # The cameras that have events
+    def cameras(self):
+
+        conn = self.connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT DISTINCT camera_id FROM events ORDER BY camera_id")]
+        finally:
+            conn.close()
+
+    # Stop the writer thread after writing what is still waiting
+    def close(self):
+
+        self.stopped = True
+        self.thread.join(timeout=5.0)
+
+
+# ---------------------------------------------------------
+# Turns the per-frame results of one camera into events
+# ---------------------------------------------------------
+# It remembers the last recorded label of each track (the most recent max_tracks only),
+# and records an event only for new people and label changes.
+class TrackEventLogger:
+
+    def __init__(self, store, camera_id, max_tracks=10000):
+
+        self.store = store
+        self.camera_id = camera_id
+        self.max_tracks = max_tracks
+        self.labels = collections.OrderedDict()
+
+    # results → result dicts with an "id" (from LiveDetector / Tracker)
+    # timestamp → time.time() when the camera captured the frame: the events are stamped with it, so the queueing
+    # and the inference time don't shift them (now, if the capture time is unknown).
+    # It returns the recorded events (dicts with the event store columns).
+    def update(self, results, timestamp=None):
+
+        ts = timestamp if timestamp is not None else time.time()
+        events = []
+        for r in results:
+            track_id, label = r["id"], r["label"]
+            last = self.labels.get(track_id)
+
+            event = None
+            if last is None:
+                event = "new_track"
+            elif last != label:
+                event = "label_change"
+
+            if event is not None:
+                self.store.record(self.camera_id, track_id, event, label, r["confidence"], ts=ts)
+                events.append({"ts": ts, "camera_id": str(self.camera_id), "track_id": int(track_id), "event": event,
+                               "label": label, "confidence": float(r["confidence"])})
+
+            self.labels[track_id] = label
+            self.labels.move_to_end(track_id)
+
+        while len(self.labels) > self.max_tracks:
+            self.labels.popitem(last=False)
+
+        return events
+
+
+# One store for the whole process
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_event_store(path=DEFAULT_DB_PATH):
+
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore(path)
+        return _store
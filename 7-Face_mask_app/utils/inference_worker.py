@@ -0,0 +1,278 @@
+import threading
+import time
+
+from utils.camera import get_camera
+from utils.camera_tracking import get_camera_tracking, tracking_settings
+from utils.display import get_display
+from utils.drawing import draw_results
+from utils.metrics import get_metrics
+
+
+# ---------------------------------------------------------
+# One inference worker for all the cameras and all the viewers
+# ---------------------------------------------------------
+"""
+Every camera of the wall is registered in ONE worker thread per process, which owns the only copy of the model.
+The worker serves the cameras in turn (round-robin): at each turn it takes the newest frame of the next camera
+that has a new frame AND whose FPS cap allows it, runs the tracking of that camera (utils/camera_tracking.py: the
+tracker, classification cache and event logger shared with the Live Detection page), draws the boxes and publishes the annotated frame to the camera's display stream
+(utils/display.py: downsized and JPEG-encoded once, one stream per camera URL, also shown by the Live Detection page).
+A frame is tracked by ONE producer (the worker or the live pipeline of the camera, the first one to get it), so
+every frame of the stream is published once, whoever produced it.
+
+- A busy camera can't starve the others: after it was served it goes to the back of the line.
+- max_fps caps how often a camera is analyzed (the extra frames are simply skipped, the camera keeps the newest).
+- The cameras are keyed by URL (two wall entries, or two sessions, with the same name can't replace each other),
+  the name is only a label.
+- An error is kept per camera and cleared as soon as that camera is served again without error.
+- Viewers only READ the latest JPEG: 10 browser tabs (or MJPEG clients) on the same camera cost the same as 1.
+- Every viewer (one run of the wall page) registers its cameras with its own viewer ID, and detaches when it stops:
+  a camera without viewers is removed right away, and the worker thread stops when no camera is left.
+  A viewer that vanished without detaching (killed session) is dropped after idle_timeout seconds without latest().
+- The wall keeps its own tracking settings per camera (threshold, detect_every, detection mode, cache on/off) and
+  passes them with each frame: the tracker is shared with the Live Detection page, its settings are not.
+- The model is shared with the other pages: the TFLite / ONNX backends hold their own lock during predict().
+
+Usage:
+    worker = get_inference_worker(model)
+    worker.add_camera("door", "http://192.168.1.12:8080/video", max_fps=5, viewer=viewer_id)
+    jpeg, results, seq = worker.latest("http://192.168.1.12:8080/video")
+    worker.detach(viewer_id)
+"""
+class CameraSlot:
+
+    def __init__(self, name, url, model, max_fps, settings):
+
+        self.name = name
+        self.url = url
+        self.camera = get_camera(url)
+        self.max_fps = max_fps
+        self.tracking = get_camera_tracking(url, model)
+        self.settings = settings        # Tracking settings of the wall for this camera (tracking_settings())
+
+        self.last_seq = 0               # Last camera frame we analyzed
+        self.last_run = 0.0             # When we analyzed it (for the FPS cap)
+        self.last_viewed = time.time()  # Last time a viewer asked for this camera
+        self.viewers = set()            # IDs of the viewers (wall page runs) showing this camera
+        self.error = None               # Error of the last frame of this camera (None once a frame succeeds)
+
+        # Latest output, shared by every viewer: the JPEG lives in the display stream of the camera
+        self.display = get_display(url)
+        self.results = []
+
+        # Statistics
+        self.processed = 0
+        self.skipped = 0                # Camera frames never analyzed (FPS cap or worker busy)
+        self.busy_seconds = 0.0
+        self.recent = []
+
+    # Can we analyze a frame of this camera now?
+    def ready(self, now):
+
+        # The camera was released (nobody read it for a while) → open it again
+        if self.camera.stopped:
+            self.camera = get_camera(self.url)
+            self.last_seq = 0
+        if self.camera.seq <= self.last_seq:
+            return False
+        return self.max_fps is None or self.max_fps <= 0 or now - self.last_run >= 1.0 / self.max_fps
+
+    def fps(self):
+
+        if len(self.recent) < 2 or self.recent[-1] == self.recent[0]:
+            return 0.0
+        return (len(self.recent) - 1) / (self.recent[-1] - self.recent[0])
+
+    def stats(self):
+
+        # The display stream has its own "fps" and "skipped" (FPS cap) → prefixed, not mixed up with the worker's
+        display = {key if key.startswith("display") else f"display_{key}": value
+                   for key, value in self.display.stats().items()}
+        return {
+            "camera": self.name,
+            "status": self.camera.status,
+            "fps": round(self.fps(), 1),
+            "max_fps": self.max_fps,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "avg_ms": round(1000 * self.busy_seconds / self.processed, 1) if self.processed else 0.0,
+            "error": self.error or "",
+            **display,
+        }
+
+
+class InferenceWorker:
+
+    def __init__(self, model, idle_timeout=10.0):
+
+        self.model = model
+        self.idle_timeout = idle_timeout
+
+        self.slots = {}                 # url → CameraSlot, in round-robin order
+        self.lock = threading.Lock()
+        self.next_index = 0
+
+        # The thread runs only while there are cameras: `running` is changed under the lock,
+        # so a camera added while the thread is leaving always gets a new thread.
+        self.running = False
+        self.thread = None
+
+    # Start the thread (if it is not running). It stops by itself when no camera is left.
+    def start(self):
+
+        with self.lock:
+            self.start_locked()
+        return self
+
+    def start_locked(self):
+
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name="inference-worker", daemon=True)
+            self.thread.start()
+
+    # Stop serving every camera (the thread leaves at its next turn)
+    def stop(self):
+
+        with self.lock:
+            self.slots.clear()
+
+    # Register a camera for a viewer, or update its settings if it is already there.
+    # Calling it again also counts as a view.
+    def add_camera(self, name, url, max_fps=5.0, threshold=0.5, detect_every=1, detection=None, use_cache=True,
+                   viewer=None):
+
+        settings = tracking_settings(threshold, detect_every, detection, use_cache)
+        with self.lock:
+            slot = self.slots.get(url)
+            if slot is None:
+                slot = self.slots[url] = CameraSlot(name, url, self.model, max_fps, settings)
+            slot.name = name
+            slot.max_fps = max_fps
+            slot.settings = settings
+            slot.last_viewed = time.time()
+            if viewer is not None:
+                slot.viewers.add(viewer)
+            self.start_locked()
+
+    def remove_camera(self, url):
+
+        with self.lock:
+            self.slots.pop(url, None)
+
+    # A viewer left (the wall page stopped): the cameras nobody else shows are removed right away
+    def detach(self, viewer):
+
+        with self.lock:
+            for url, slot in list(self.slots.items()):
+                if viewer in slot.viewers:
+                    slot.viewers.discard(viewer)
+                    if not slot.viewers:
+                        del self.slots[url]
+
+    # Switch the classifier (Settings page), the trackers are kept
+    def set_model(self, model):
+
+        with self.lock:
+            self.model = model
+            for slot in self.slots.values():
+                slot.tracking.set_model(model)
+
+    # The latest annotated frame of a camera: (jpeg, results, seq), jpeg is None before the first one.
+    def latest(self, url):
+
+        slot = self.slots.get(url)
+        if slot is None:
+            return None, [], 0
+        slot.last_viewed = time.time()
+        jpeg, seq, _ = slot.display.latest()
+        return jpeg, slot.results, seq
+
+    # Pick the next camera to serve, round-robin, It returns None if no camera is ready.
+    # No camera left at all → the thread must stop: it returns False (and running is cleared under the lock).
+    def next_slot(self):
+
+        now = time.time()
+        with self.lock:
+            # Forget the cameras nobody looks at anymore (viewers that vanished without detaching)
+            for url in [url for url, slot in self.slots.items() if now - slot.last_viewed > self.idle_timeout]:
+                del self.slots[url]
+
+            if not self.slots:
+                self.running = False
+                return False
+
+            slots = list(self.slots.values())
+            for i in range(len(slots)):
+                slot = slots[(self.next_index + i) % len(slots)]
+                if slot.ready(now):
+                    self.next_index = (self.next_index + i + 1) % len(slots)
+                    return slot
+        return None
+
+    def run(self):
+
+        metrics = get_metrics()
+
+        while True:
+            slot = self.next_slot()
+            if slot is False:
+                break                   # No camera left → nobody is watching, the thread ends
+            if slot is None:
+                time.sleep(0.005)       # Nothing new on any camera
+                continue
+
+            frame, seq, timestamp = slot.camera.read_latest()
+            if frame is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                frame = frame.copy()
+                results = slot.tracking.process(frame, timestamp, slot.settings)
+                if results is None:
+                    # The Live Detection page already tracked and recorded this frame
+                    slot.last_seq = seq
+                    continue
+                draw_results(frame, results)
+                # Encoded once for all the viewers (skipped above the display FPS cap)
+                slot.results = results
+                slot.display.publish(frame, timestamp)
+            except Exception as e:
+                # Keep serving the other cameras, the wall page shows the error of this camera
+                slot.error = str(e)
+                slot.last_seq = seq
+                continue
+            elapsed = time.perf_counter() - start
+            slot.error = None
+
+            slot.skipped += max(0, seq - slot.last_seq - 1)
+            slot.last_seq = seq
+            slot.last_run = time.time()
+
+            slot.processed += 1
+            slot.busy_seconds += elapsed
+            slot.recent = (slot.recent + [slot.last_run])[-30:]
+            metrics.observe("worker_frame_ms", elapsed * 1000)
+
+    def stats(self):
+
+        with self.lock:
+            return [slot.stats() for slot in self.slots.values()]
+
+
+# One worker for the whole process (all sessions / browser tabs)
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_inference_worker(model):
+
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = InferenceWorker(model)
+        elif _worker.model is not model:
+            _worker.set_model(model)
+        # The thread starts with the first camera (add_camera)
+        return _worker
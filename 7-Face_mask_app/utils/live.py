@@ -0,0 +1,204 @@
+import cv2
+import numpy as np
+
+from utils.detection import detect_faces_mode, label_prediction, predict_faces, preprocess_faces
+from utils.metrics import get_metrics
+from utils.tracking import Tracker
+
+
+# Move boxes from the previous frame to the current one with sparse optical flow (Lucas-Kanade)
+"""
+The function takes:
+- prev_gray, gray → Previous and current frames in grayscale
+- boxes → List of (x, y, width, height) boxes in the previous frame
+- max_points → Number of corner points followed inside each box
+
+It returns:
+- new_boxes → The boxes moved by the median motion of their points
+- confidences → For each box, the fraction of its points that were followed successfully (0 → 1)
+"""
+def propagate_boxes(prev_gray, gray, boxes, max_points=20):
+
+    h, w = gray.shape[:2]
+    points, owners = [], []
+
+    # Pick good corner points inside every box
+    for i, (x, y, bw, bh) in enumerate(boxes):
+        roi = prev_gray[y:y + bh, x:x + bw]
+        if roi.size == 0:
+            continue
+        corners = cv2.goodFeaturesToTrack(roi, max_points, 0.01, 3)
+        if corners is None:
+            continue
+        corners = corners.reshape(-1, 2) + np.array([x, y], dtype="float32")
+        points.append(corners)
+        owners.extend([i] * len(corners))
+
+    new_boxes = list(boxes)
+    confidences = [0.0] * len(boxes)
+    if not points:
+        return new_boxes, confidences
+
+    # One optical-flow call for the points of all the boxes
+    points = np.concatenate(points).astype("float32").reshape(-1, 1, 2)
+    moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, winSize=(15, 15), maxLevel=2)
+
+    owners = np.array(owners)
+    status = status.reshape(-1).astype(bool)
+    shift = (moved - points).reshape(-1, 2)
+
+    for i, (x, y, bw, bh) in enumerate(boxes):
+        mine = owners == i
+        good = mine & status
+        if mine.sum() == 0 or good.sum() == 0:
+            continue
+
+        dx, dy = np.median(shift[good], axis=0)
+        nx = int(round(min(max(x + dx, 0), w - 1)))
+        ny = int(round(min(max(y + dy, 0), h - 1)))
+        new_boxes[i] = (nx, ny, min(bw, w - nx), min(bh, h - ny))
+        confidences[i] = float(good.sum() / mine.sum())
+
+    return new_boxes, confidences
+
+
+# ---------------------------------------------------------
+# Live detector: detection every K frames, tracking in between
+# ---------------------------------------------------------
+"""
+Running the Caffe face detector and the mask model on every frame is the biggest CPU cost,
+but faces barely move between two consecutive frames. So:
+
+- Every detect_every frames (K) → full detect_mask_dnn() + Tracker update.
+- In the frames between → the boxes of the tracked people are moved with optical flow,
+  and the mask label of each person is reused from its last classification.
+- If optical flow loses a face (confidence < min_track_confidence) → the detector runs right away.
+- With a ClassificationCache (utils/class_cache.py), even on detection frames the mask model only runs
+  for the people whose cached label is not reliable anymore.
+
+With detect_every=1 and no cache it behaves exactly like calling detect_mask_dnn() + Tracker on every frame.
+
+Usage:
+    live = LiveDetector(model, threshold=0.5, detect_every=3, detection={"mode": "tiled", "tiles": (2, 2)})
+    results, new_people = live.process(frame)      # Same result dicts as detect_mask_dnn() + the "id" key
+"""
+class LiveDetector:
+
+    def __init__(self, model, threshold=0.5, detect_every=1, min_track_confidence=0.5, tracker=None, cache=None,
+                 detection=None):
+
+        self.model = model
+        self.threshold = threshold
+        self.detect_every = max(1, int(detect_every))
+        self.min_track_confidence = min_track_confidence
+        self.tracker = tracker if tracker is not None else Tracker(use_velocity=True)
+        self.cache = cache
+        self.detection = detection      # Detection config of the camera (mode, ROI, tiles), None = whole frame
+
+        self.prev_gray = None
+        self.frame_index = 0
+
+        # Statistics
+        self.stats = {"frames": 0, "detector_runs": 0, "forced_runs": 0, "faces_classified": 0}
+
+    def process(self, frame):
+
+        metrics = get_metrics()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        results = None
+
+        # Frames between two detections → try to follow the faces with optical flow
+        if self.frame_index % self.detect_every != 0 and self.prev_gray is not None:
+            with metrics.timer("optical_flow_ms"):
+                results = self.propagate(gray)
+            if results is None:
+                self.stats["forced_runs"] += 1
+
+        # Detection frame (or tracking failed) → full detection
+        detected = results is None
+        if detected:
+            with metrics.timer("detect_faces_ms"):
+                boxes = detect_faces_mode(frame, self.detection)
+            results = [
+                {"box": (x1, y1, x2 - x1, y2 - y1), "label": None, "confidence": 0.0}
+                for x1, y1, x2, y2 in boxes
+            ]
+            self.stats["detector_runs"] += 1
+
+        with metrics.timer("tracking_ms"):
+            new_people = self.assign_ids(results)
+
+        # The IDs are known now → classify the faces (only the cache misses if there is a cache)
+        if detected:
+            with metrics.timer("classify_ms"):
+                self.classify(frame, results)
+
+        self.prev_gray = gray
+        self.frame_index += 1
+        self.stats["frames"] += 1
+        metrics.observe("faces_per_frame", len(results))
+
+        return results, new_people
+
+    # Move the people seen in the previous frame, reusing their last label
+    # It returns None if the tracking confidence is too low (the detector must run).
+    def propagate(self, gray):
+
+        active = [track for track in self.tracker.tracks if track.missed == 0 and track.label is not None]
+        if not active:
+            return []
+
+        boxes = [tuple(int(v) for v in track.box) for track in active]
+        new_boxes, confidences = propagate_boxes(self.prev_gray, gray, boxes)
+        if min(confidences) < self.min_track_confidence:
+            return None
+
+        labels = [(track.label, track.confidence) for track in active]
+        return [
+            {"box": (x, y, w, h), "label": label, "confidence": float(conf)}
+            for (x, y, w, h), (label, conf) in zip(new_boxes, labels)
+        ]
+
+    # Tracker update: give every result its person ID
+    # It returns the list of new people.
+    def assign_ids(self, results):
+
+        ids, is_new = self.tracker.update([r["box"] for r in results])
+
+        new_people = []
+        for r, person_id, new in zip(results, ids, is_new):
+            r["id"] = person_id
+            if new:
+                new_people.append(r)
+
+        return new_people
+
+    # Fill the label and confidence of every result, and remember them in the tracks
+    def classify(self, frame, results):
+
+        # Faces whose cached label can't be reused
+        todo = []
+        for r in results:
+            cached = self.cache.lookup(r["id"], r["box"]) if self.cache is not None else None
+            if cached is None:
+                todo.append(r)
+            else:
+                r["label"], r["confidence"] = cached[0], float(cached[1])
+
+        # One forward pass of the mask model for all of them
+        corners = [(x, y, x + w, y + h) for x, y, w, h in (r["box"] for r in todo)]
+        preds = predict_faces(self.model, preprocess_faces(frame, corners))
+        self.stats["faces_classified"] += len(todo)
+
+        for r, pred in zip(todo, preds):
+            if self.cache is not None:
+                label, conf = self.cache.update(r["id"], r["box"], pred)
+            else:
+                label, conf = label_prediction(pred, self.threshold)
+            r["label"], r["confidence"] = label, float(conf)
+
+        tracks = self.tracker.tracks_by_id()
+        for r in results:
+            tracks[r["id"]].label = r["label"]
+            tracks[r["id"]].confidence = r["confidence"]
+
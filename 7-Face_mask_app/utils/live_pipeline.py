@@ -0,0 +1,186 @@
+import threading
+import time
+
+from utils.camera import get_camera
+from utils.camera_tracking import get_camera_tracking, tracking_settings
+from utils.display import get_display
+from utils.drawing import draw_results
+from utils.metrics import get_metrics
+from utils.pipeline import Pipeline
+
+
+# ---------------------------------------------------------
+# One live pipeline per camera, shared by every browser tab
+# ---------------------------------------------------------
+"""
+The Live Detection page used to start its own capture → inference → annotate pipeline in every session:
+two tabs on the same camera ran the model twice and published two interleaved streams of frames.
+Now the pipeline belongs to the camera (like its connection, its tracking and its display stream), and the
+browser tabs are only VIEWERS: they read the JPEG frames of the camera's display stream (utils/display.py).
+
+- attach(viewer) starts the pipeline with the first viewer, detach(viewer) stops it (and waits for its threads)
+  when the last viewer leaves.
+- The settings of the tracking (configure()) belong to this pipeline, not to the camera's shared tracker
+  (utils/camera_tracking.py): the Camera Wall keeps its own. All the tabs on this camera see the same frames,
+  so they share one setting: the last tab that called configure() sets it, and the others can show it.
+- The viewers call heartbeat(viewer) in their loop. A viewer that vanished without detaching (killed session)
+  is forgotten after idle_timeout seconds, and if nobody is left the pipeline's watchdog stops it by itself.
+
+Usage:
+    live_pipeline = get_live_pipeline(url, model)
+    live_pipeline.configure(threshold=0.5, detect_every=3, detection=None, use_cache=True)
+    live_pipeline.attach(viewer_id)
+    try:
+        while ...:
+            live_pipeline.heartbeat(viewer_id)
+            jpeg, seq, capture_ts = live_pipeline.display.wait_for_frame(seq, timeout=0.5)
+    finally:
+        live_pipeline.detach(viewer_id)
+"""
+class LivePipeline:
+
+    def __init__(self, url, model, idle_timeout=10.0):
+
+        self.url = url
+        self.idle_timeout = idle_timeout
+        self.camera = get_camera(url)
+        self.tracking = get_camera_tracking(url, model)
+        self.display = get_display(url)
+        self.settings = tracking_settings()
+
+        self.pipeline = None
+        self.viewers = {}               # viewer ID → time of its last heartbeat
+        self.lock = threading.Lock()
+        self.last_seq = 0
+        self.profiled_inference = None  # Inference stage wrapped by a FrameProfiler (trace mode)
+
+    # ------------------------------------------------
+    # Pipeline stages (each one runs in its own thread)
+    # ------------------------------------------------
+    # 1. Capture: wait for a frame newer than the last one we took (sequence number from camera.py).
+    # If the camera is reconnecting, nothing arrives and the stage simply keeps waiting.
+    def capture_stage(self):
+
+        frame, seq, timestamp = self.camera.wait_for_frame(self.last_seq, timeout=0.5)
+        if frame is None:
+            return None
+
+        self.last_seq = seq
+        # The camera keeps the frame as its "latest" → work on a copy because we draw on it.
+        # The capture time travels with the frame, to measure the latency up to the browser.
+        return frame.copy(), timestamp
+
+    # 2. Inference + Tracking + Logging (utils/camera_tracking.py)
+    def inference_stage(self, item):
+
+        profiled = self.profiled_inference
+        if profiled is not None:
+            return profiled(item)
+        return self.run_inference(item)
+
+    def run_inference(self, item):
+
+        frame, timestamp = item
+        results = self.tracking.process(frame, timestamp, self.settings)
+        # The Camera Wall already processed this frame
+        if results is None:
+            return None
+        return frame, results, timestamp
+
+    # 3. Drawing + Encoding: the sink of the pipeline, its output is the camera's display stream (no output queue)
+    def annotate_stage(self, item):
+
+        frame, results, timestamp = item
+
+        # Draw the boxes and write the ID on the frame (utils/drawing.py)
+        with get_metrics().timer("draw_ms"):
+            draw_results(frame, results)
+
+        # Downsize + JPEG-encode once for all the viewers (no RGB conversion: the encoder takes the BGR frame).
+        # Above the display FPS cap the frame is not encoded.
+        self.display.publish(frame, timestamp)
+        return None
+
+    # Tracking settings of this pipeline (Settings page), used from the next frame on
+    def configure(self, threshold=0.5, detect_every=1, detection=None, use_cache=True):
+
+        self.settings = tracking_settings(threshold, detect_every, detection, use_cache)
+
+    # ---------------
+    # Viewers
+    # ---------------
+    # A viewer (one run of the Live Detection page) starts watching, the pipeline starts if needed
+    def attach(self, viewer):
+
+        with self.lock:
+            self.viewers[viewer] = time.time()
+            if self.pipeline is not None and self.pipeline.is_running():
+                return
+
+            # Stopped by its watchdog, or a stage failed → wait for the old threads, then build a new one
+            if self.pipeline is not None:
+                self.pipeline.stop()
+            self.camera = get_camera(self.url)      # The camera may have been released meanwhile
+            self.last_seq = 0
+
+            # Capture → Inference → Tracking/Drawing/Encoding, connected by small queues that drop the oldest frame
+            # when full. So the slowest stage doesn't block the others, and the display always gets the freshest frame.
+            pipeline = Pipeline(queue_size=2, idle_timeout=self.idle_timeout)
+            pipeline.add_stage("capture", self.capture_stage)
+            pipeline.add_stage("inference", self.inference_stage)
+            pipeline.add_stage("annotate", self.annotate_stage, sink=True)
+            self.pipeline = pipeline.start()
+
+    # A viewer stopped watching: the pipeline stops (and its threads are joined) when nobody is left
+    def detach(self, viewer):
+
+        with self.lock:
+            self.viewers.pop(viewer, None)
+            # Forget the viewers that vanished without detaching
+            now = time.time()
+            for other, last_seen in list(self.viewers.items()):
+                if now - last_seen > self.idle_timeout:
+                    del self.viewers[other]
+
+            if not self.viewers and self.pipeline is not None:
+                self.pipeline.stop()
+                self.pipeline = None
+
+    def heartbeat(self, viewer):
+
+        with self.lock:
+            self.viewers[viewer] = time.time()
+        pipeline = self.pipeline
+        if pipeline is not None:
+            pipeline.heartbeat()
+
+    # Trace mode: profile the inference of the next frames with a FrameProfiler (utils/metrics.py)
+    def profile(self, profiler):
+
+        self.profiled_inference = profiler.wrap(self.run_inference)
+
+    # Error of a failed stage (or of the watchdog), None while it runs
+    def error(self):
+
+        pipeline = self.pipeline
+        return pipeline.error if pipeline is not None else None
+
+    def stats(self):
+
+        pipeline = self.pipeline
+        return pipeline.stats() if pipeline is not None else []
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_live_pipeline(url, model):
+
+    with _pipelines_lock:
+        live_pipeline = _pipelines.get(url)
+        if live_pipeline is None:
+            live_pipeline = _pipelines[url] = LivePipeline(url, model)
+    if live_pipeline.tracking.live.model is not model:
+        live_pipeline.tracking.set_model(model)
+    return live_pipeline
@@ -0,0 +1,269 @@
+import collections
+import cProfile
+import http.server
+import io
+import os
+import pstats
+import threading
+import time
+
+import numpy as np
+
+# ---------------------------------------------------------
+# Lightweight metrics for the hot path: timers, percentiles, FPS
+# ---------------------------------------------------------
+"""
+Every stage of the detection (face_net.forward, preprocessing, model.predict, tracking, drawing, display...)
+records its duration here. Recording is one perf_counter() call and one deque append (~1 µs),
+so the timers stay on all the time. Only the last `window` values of each metric are kept.
+
+Usage:
+    metrics = get_metrics()
+    with metrics.timer("face_net_forward"):
+        detections = face_net.forward()
+    metrics.observe("faces_per_frame", len(boxes))
+    metrics.tick("frames")                         # Counter + rate (FPS)
+    metrics.summary()                              # {"face_net_forward": {"p50": ..., "p95": ..., "p99": ...}, ...}
+    metrics.to_prometheus()                        # Prometheus text format
+
+The whole process shares one Metrics object, the Metrics page shows it and it can be exported:
+- to a file: metrics.write_prometheus("data/metrics.prom") (e.g. for the node_exporter textfile collector)
+- over HTTP: start_metrics_server(9108) → http://localhost:9108/metrics
+"""
+class Metrics:
+
+    def __init__(self, window=1000, prefix="facemask"):
+
+        self.window = window
+        self.prefix = prefix
+        self.values = {}            # name → deque of the last observed values (durations in ms, faces...)
+        self.sums = collections.Counter()
+        self.counts = collections.Counter()
+        self.ticks = {}             # name → deque of the last tick times (for the rate)
+        self.lock = threading.Lock()
+
+    # Record one value (a duration in ms for the timers)
+    # Called from many threads (pipeline stages, wall worker, cameras): `+=` on the counters is not atomic,
+    # so the updates are made under the lock, or some would be lost.
+    def observe(self, name, value):
+
+        with self.lock:
+            values = self.values.get(name)
+            if values is None:
+                values = self.values[name] = collections.deque(maxlen=self.window)
+            values.append(value)
+            self.sums[name] += value
+            self.counts[name] += 1
+
+    # Time a block of code: with metrics.timer("name"): ...
+    def timer(self, name):
+
+        return _Timer(self, name)
+
+    # Count one event (a frame...), the rate over the last events gives the FPS
+    def tick(self, name, n=1):
+
+        with self.lock:
+            ticks = self.ticks.get(name)
+            if ticks is None:
+                ticks = self.ticks[name] = collections.deque(maxlen=100)
+            ticks.append(time.perf_counter())
+            self.counts[name] += n
+
+    # Events per second over the last ticks
+    def rate(self, name):
+
+        with self.lock:
+            ticks = list(self.ticks.get(name, ()))
+        if len(ticks) < 2 or ticks[-1] == ticks[0]:
+            return 0.0
+        return (len(ticks) - 1) / (ticks[-1] - ticks[0])
+
+    # p50 / p95 / p99 / mean of every observed metric (over the last `window` values)
+    def summary(self):
+
+        # Copy under the lock, compute the percentiles outside (the threads keep observing meanwhile)
+        with self.lock:
+            snapshot = {name: (list(values), self.counts[name]) for name, values in self.values.items()}
+
+        result = {}
+        for name in sorted(snapshot):
+            values, count = snapshot[name]
+            values = np.array(values, dtype="float64")
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            result[name] = {
+                "p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2),
+                "mean": round(float(values.mean()), 2), "count": count,
+            }
+        return result
+
+    def rates(self):
+
+        with self.lock:
+            names = sorted(self.ticks)
+        return {name: round(self.rate(name), 2) for name in names}
+
+    def reset(self):
+
+        with self.lock:
+            self.values.clear()
+            self.ticks.clear()
+            self.sums.clear()
+            self.counts.clear()
+
+    # Prometheus text exposition format:
+    # the observed metrics are summaries (quantiles + _sum + _count), the ticks are counters + a rate gauge.
+    def to_prometheus(self):
+
+        with self.lock:
+            sums, counts, ticks = dict(self.sums), dict(self.counts), sorted(self.ticks)
+
+        lines = []
+        for name, stats in self.summary().items():
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric} summary")
+            for q in ("p50", "p95", "p99"):
+                lines.append(f'{metric}{{quantile="0.{q[1:]}"}} {stats[q]}')
+            lines.append(f"{metric}_sum {sums.get(name, 0)}")
+            lines.append(f"{metric}_count {counts.get(name, 0)}")
+
+        for name in ticks:
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric}_total counter")
+            lines.append(f"{metric}_total {counts.get(name, 0)}")
+            lines.append(f"# TYPE {metric}_per_second gauge")
+            lines.append(f"{metric}_per_second {self.rate(name):.3f}")
+
+        return "\n".join(lines) + "\n"
+
+    # Write the metrics to a file (written to a temporary file first, so a reader never sees half a file)
+    def write_prometheus(self, path):
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+class _Timer:
+
+    def __init__(self, metrics, name):
+
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+# One Metrics object for the whole process
+_metrics = Metrics()
+
+
+def get_metrics():
+
+    return _metrics
+
+
+# ---------------------------------------------------------
+# Local /metrics endpoint (Prometheus scrape target)
+# ---------------------------------------------------------
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=9108, host="127.0.0.1"):
+
+    global _server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = get_metrics().to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass        # No log line for every scrape
+
+    # Only one server per process, the next calls return the running one
+    with _server_lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+
+# ---------------------------------------------------------
+# Opt-in trace mode: cProfile over a fixed number of frames
+# ---------------------------------------------------------
+"""
+cProfile only sees the thread that enables it, so the profiler wraps the function of the stage we want to
+look at (e.g. the inference stage), whatever thread runs it. After `frames` calls it stops by itself and writes:
+- <output>.prof → open it with snakeviz, or pstats
+- <output>.txt → the 30 functions with the highest cumulative time
+
+For a sampling profile of all the threads without touching the code, py-spy works on the running app
+(the threads have names: camera-*, stage-*, event-writer...):
+    py-spy record -o profile.svg --pid <streamlit PID>
+    py-spy dump --pid <streamlit PID>
+
+Usage:
+    profiler = FrameProfiler(frames=300, output="data/profiles/live")
+    inference_stage = profiler.wrap(inference_stage)
+"""
+class FrameProfiler:
+
+    def __init__(self, frames=300, output="profile"):
+
+        self.frames = frames
+        self.output = output
+        self.profile = cProfile.Profile()
+        self.count = 0
+        self.done = False
+        self.lock = threading.Lock()
+
+    def wrap(self, fn):
+
+        def profiled(*args):
+            if self.done:
+                return fn(*args)
+
+            with self.lock:
+                self.profile.enable()
+                try:
+                    return fn(*args)
+                finally:
+                    self.profile.disable()
+                    self.count += 1
+                    if self.count >= self.frames:
+                        self.save()
+
+        return profiled
+
+    def save(self):
+
+        self.done = True
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        self.profile.dump_stats(self.output + ".prof")
+
+        text = io.StringIO()
+        pstats.Stats(self.profile, stream=text).sort_stats("cumulative").print_stats(30)
+        with open(self.output + ".txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+import cv2
+
+from utils.backends import load_backend
+
+# ---------------------------------------------------------
+# Model registry: lazy, one shared instance per process
+# ---------------------------------------------------------
+"""
+Nothing is loaded when this module is imported. The face detector and the mask classifier are loaded
+the first time they are needed, then the same instance is reused by every Streamlit session, rerun and
+thread of the process (Streamlit imports a module only once per process).
+
+Model files are looked up in the "Models" folder of the repository, or where the environment variables say:
+- FACE_MASK_MODELS_DIR → Folder with all the model files
+- FACE_MASK_PROTOTXT → Caffe face detector architecture (default: deploy.prototxt)
+- FACE_MASK_CAFFEMODEL → Caffe face detector weights (default: res10_300x300_ssd_iter_140000.caffemodel)
+- FACE_MASK_CLASSIFIER → Keras mask model (default: MobileNetV2.h5), the TFLite / ONNX files are expected next to it
+"""
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODELS_DIR = os.environ.get("FACE_MASK_MODELS_DIR", os.path.join(REPO_DIR, "Models"))
+
+PROTOTXT_PATH = os.environ.get("FACE_MASK_PROTOTXT", os.path.join(MODELS_DIR, "deploy.prototxt"))
+CAFFEMODEL_PATH = os.environ.get(
+    "FACE_MASK_CAFFEMODEL", os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+)
+CLASSIFIER_PATH = os.environ.get("FACE_MASK_CLASSIFIER", os.path.join(MODELS_DIR, "MobileNetV2.h5"))
+
+# The same classifier for every runtime: (backend, file). The lighter files are made by convert_model.py next to the .h5
+classifier_base = os.path.splitext(CLASSIFIER_PATH)[0]
+MODEL_VARIANTS = {
+    "keras": ("keras", CLASSIFIER_PATH),
+    "tflite-fp16": ("tflite", classifier_base + "_fp16.tflite"),
+    "tflite-int8": ("tflite", classifier_base + "_int8.tflite"),
+    "onnx": ("onnx", classifier_base + ".onnx"),
+}
+
+# Loaded models and how long each one took to load (seconds)
+_models = {}
+_load_times = {}
+_lock = threading.Lock()
+
+# An OpenCV Net can't run two forward passes at the same time → every caller of the shared face detector takes this lock.
+face_net_lock = threading.Lock()
+
+
+# Load a model once, with the function `loader`, and keep it for the whole process
+def _get(key, loader):
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        # Another thread may have loaded it while we were waiting for the lock
+        if key not in _models:
+            start = time.perf_counter()
+            _models[key] = loader()
+            _load_times[key] = time.perf_counter() - start
+
+    return _models[key]
+
+
+def _load_face_net():
+
+    for path in (PROTOTXT_PATH, CAFFEMODEL_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Face detector file not found: {path} (set FACE_MASK_MODELS_DIR)")
+
+    # Load the pre-trained Caffe model for face detection
+    # 1. prototxt: Defines the model architecture (layers)
+    # 2. caffemodel: Contains the trained weights
+    return cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, CAFFEMODEL_PATH)
+
+
+# The shared Caffe face detector
+def get_face_net():
+
+    return _get("face_net", _load_face_net)
+
+
+# The shared mask classifier
+# variant → "keras" (default), "tflite-fp16", "tflite-int8" or "onnx" (see utils/backends.py)
+def get_mask_model(variant="keras", path=None):
+
+    backend, default_path = MODEL_VARIANTS[variant]
+    path = path or default_path
+    return _get(f"classifier:{variant}:{path}", lambda: load_backend(backend, path))
+
+
+# Load times of everything loaded so far, e.g. {"face_net": 0.05, "classifier:keras:...": 3.2}
+def load_times():
+
+    return dict(_load_times)
@@ -0,0 +1,247 @@
+import collections
+import threading
+import time
+
+from utils.metrics import get_metrics
+
+
+# ---------------------------------------------------------
+# Bounded queue with a "drop-oldest" policy
+# ---------------------------------------------------------
+# When the queue is full, put() throws away the OLDEST item instead of blocking.
+# So a slow stage never makes the stages before it wait, and the next stage always gets the freshest data.
+class LatestQueue:
+
+    def __init__(self, maxsize=1):
+
+        self.items = collections.deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.dropped = 0          # How many items were thrown away because the queue was full
+
+    def put(self, item):
+
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)          # deque(maxlen) drops the oldest item by itself
+            self.cond.notify()
+
+    # It returns None if nothing arrived before the timeout.
+    def get(self, timeout=None):
+
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def depth(self):
+
+        return len(self.items)
+
+    def clear(self):
+
+        with self.cond:
+            self.items.clear()
+
+
+# ---------------------------------------------------------
+# One stage of the pipeline, running in its own thread
+# ---------------------------------------------------------
+"""
+- fn → The work of the stage.
+       Source stage (inbox=None): fn() takes nothing and returns a new item.
+       Other stages: fn(item) takes the item from the previous stage.
+       If fn returns None, nothing is sent to the next stage.
+- inbox → LatestQueue to read from (None for the source stage).
+- outbox → LatestQueue to write to (None for a sink stage: it consumes its items, e.g. publishes them itself).
+"""
+class Stage:
+
+    def __init__(self, name, fn, inbox, outbox, on_error=None):
+
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_error = on_error
+
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, name=f"stage-{name}", daemon=True)
+
+        # Statistics
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.recent = collections.deque(maxlen=30)      # Timestamps of the last processed items (for the FPS)
+
+    def start(self):
+
+        self.thread.start()
+        return self
+
+    def stop(self):
+
+        self.stopped = True
+
+    def run(self):
+
+        while not self.stopped:
+
+            if self.inbox is None:
+                item = None
+            else:
+                item = self.inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+
+            start = time.perf_counter()
+            try:
+                output = self.fn() if self.inbox is None else self.fn(item)
+            except Exception as e:
+                # An error stops the stage, the pipeline reports it to the UI.
+                self.stopped = True
+                if self.on_error is not None:
+                    self.on_error(self.name, e)
+                break
+
+            end = time.perf_counter()
+            # The source returned nothing (no new frame yet): it only waited, there is nothing to count
+            if self.inbox is None and output is None:
+                continue
+
+            # An item taken from the inbox is work done, even if nothing goes downstream
+            # (frame already processed by another producer, or a stage that consumes its items)
+            self.busy_seconds += end - start
+            self.processed += 1
+            get_metrics().observe(f"stage_{self.name}_ms", (end - start) * 1000)
+            self.recent.append(end)
+            if output is not None and self.outbox is not None:
+                self.outbox.put(output)
+
+    # Items per second over the last processed items
+    def fps(self):
+
+        recent = list(self.recent)
+        if len(recent) < 2 or recent[-1] == recent[0]:
+            return 0.0
+
+        return (len(recent) - 1) / (recent[-1] - recent[0])
+
+    def stats(self):
+
+        return {
+            "stage": self.name,
+            "fps": round(self.fps(), 1),
+            "processed": self.processed,
+            "avg_ms": round(1000 * self.busy_seconds / self.processed, 1) if self.processed else 0.0,
+            "queue_depth": self.outbox.depth() if self.outbox is not None else 0,
+            "dropped": self.outbox.dropped if self.outbox is not None else 0,
+        }
+
+
+# ---------------------------------------------------------
+# A chain of stages connected by bounded drop-oldest queues
+# ---------------------------------------------------------
+"""
+Usage:
+    pipeline = Pipeline(queue_size=2)
+    pipeline.add_stage("capture", read_frame)        # The first stage is the source
+    pipeline.add_stage("inference", detect)
+    pipeline.add_stage("annotate", draw)
+    pipeline.start()
+
+    item = pipeline.get(timeout=0.5)                 # The freshest output of the last stage (also a heartbeat)
+    ...
+    pipeline.stop()                                  # Stops the stages and waits for their threads
+
+    pipeline.add_stage("publish", show, sink=True)   # Or: the last stage consumes the items, no output queue.
+                                                     # The consumer then calls heartbeat() instead of get().
+
+Lifetime: the consumer must call get() (or heartbeat()) regularly. If nobody did during idle_timeout seconds
+(the browser tab was closed, the Streamlit session expired...), a watchdog thread stops the pipeline by itself,
+so its threads never keep the camera and the models busy for nobody.
+"""
+class Pipeline:
+
+    def __init__(self, queue_size=2, idle_timeout=10.0):
+
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.stages = []
+        self.output = None
+        self.error = None
+
+        self.stopped = False
+        self.last_heartbeat = time.time()
+        self.watchdog = None
+
+    def add_stage(self, name, fn, sink=False):
+
+        if self.stages and self.stages[-1].outbox is None:
+            raise ValueError(f"Stage {self.stages[-1].name} is a sink, no stage can follow it")
+        inbox = self.output
+        self.output = None if sink else LatestQueue(self.queue_size)
+        self.stages.append(Stage(name, fn, inbox, self.output, on_error=self.fail))
+        return self
+
+    def start(self):
+
+        self.last_heartbeat = time.time()
+        for stage in self.stages:
+            stage.start()
+        if self.idle_timeout:
+            self.watchdog = threading.Thread(target=self.watch, name="pipeline-watchdog", daemon=True)
+            self.watchdog.start()
+        return self
+
+    # Stop every stage, and wait (at most `timeout` seconds per stage) for their threads to finish their current item.
+    # So when stop() returns, no stage is still using the shared objects (tracker, classification cache...).
+    def stop(self, timeout=5.0):
+
+        self.stopped = True
+        for stage in self.stages:
+            stage.stop()
+
+        for stage in self.stages:
+            # A stage that fails calls stop() from its own thread → it can't wait for itself
+            if stage.thread.ident is not None and stage.thread is not threading.current_thread():
+                stage.thread.join(timeout)
+
+    # The freshest output of the last stage, or None after the timeout. Every call counts as a heartbeat.
+    def get(self, timeout=None):
+
+        if self.output is None:
+            raise RuntimeError("The last stage is a sink, use heartbeat() instead of get()")
+        self.heartbeat()
+        return self.output.get(timeout=timeout)
+
+    # "Somebody still uses this pipeline", for consumers that don't read the output queue
+    def heartbeat(self):
+
+        self.last_heartbeat = time.time()
+
+    # Watchdog: stop the pipeline when its consumer is gone (no get() during idle_timeout seconds)
+    def watch(self):
+
+        while not self.stopped:
+            if time.time() - self.last_heartbeat > self.idle_timeout:
+                self.error = f"No viewer for {self.idle_timeout:g} s, pipeline stopped"
+                self.stop()
+                break
+            time.sleep(0.5)
+
+    # Called by a stage when its function raises
+    def fail(self, name, error):
+
+        self.error = f"{name}: {error}"
+        self.stop()
+
+    def is_running(self):
+
+        return self.error is None and any(stage.thread.is_alive() for stage in self.stages)
+
+    # One dict per stage: throughput, average time and depth of its output queue
+    def stats(self):
+
+        return [stage.stats() for stage in self.stages]
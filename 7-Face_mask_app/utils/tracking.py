@@ -0,0 +1,195 @@
+import numpy as np
+
+# The Hungarian algorithm comes from SciPy. If SciPy is not installed we fall back to a greedy matching.
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+# Intersection over Union of two (x, y, width, height) boxes
+def iou(box1, box2):
+    x1, y1, w1, h1 = box1
+    X1, Y1, W1, H1 = x1, y1, x1 + w1, y1 + h1
+
+    x2, y2, w2, h2 = box2
+    X2, Y2, W2, H2 = x2, y2, x2 + w2, y2 + h2
+
+    xi1 = max(X1, X2)
+    yi1 = max(Y1, Y2)
+    xi2 = min(W1, W2)
+    yi2 = min(H1, H2)
+
+    inter_area = max(0, xi2 - xi1) * max(0, yi2 - yi1)
+    if inter_area == 0:
+        return 0.0
+
+    box1_area = (W1 - X1) * (H1 - Y1)
+    box2_area = (W2 - X2) * (H2 - Y2)
+
+    union = box1_area + box2_area - inter_area
+    return inter_area / union
+
+
+# IoU of every box of A with every box of B, in one go
+"""
+- boxes_a → (N, 4) array of (x, y, width, height)
+- boxes_b → (M, 4) array of (x, y, width, height)
+
+It returns an (N, M) matrix, matrix[i, j] = iou(boxes_a[i], boxes_b[j]).
+"""
+def iou_matrix(boxes_a, boxes_b):
+
+    a = np.asarray(boxes_a, dtype="float64").reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype="float64").reshape(-1, 4)
+
+    # Top-left and bottom-right corners, broadcast to (N, M)
+    ax1, ay1 = a[:, None, 0], a[:, None, 1]
+    ax2, ay2 = ax1 + a[:, None, 2], ay1 + a[:, None, 3]
+    bx1, by1 = b[None, :, 0], b[None, :, 1]
+    bx2, by2 = bx1 + b[None, :, 2], by1 + b[None, :, 3]
+
+    inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+
+    union = (a[:, None, 2] * a[:, None, 3]) + (b[None, :, 2] * b[None, :, 3]) - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+# Match rows (tracks) to columns (detections) so that the total IoU is maximal
+# It returns a list of (row, col) pairs with IoU > min_iou.
+def match_boxes(iou, min_iou):
+
+    if iou.size == 0:
+        return []
+
+    if linear_sum_assignment is not None:
+        # Optimal (Hungarian) assignment
+        rows, cols = linear_sum_assignment(-iou)
+    else:
+        # Greedy fallback: best remaining pair first
+        order = np.dstack(np.unravel_index(np.argsort(-iou, axis=None), iou.shape))[0]
+        used_rows, used_cols, rows, cols = set(), set(), [], []
+        for r, c in order:
+            if iou[r, c] <= min_iou:
+                break
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            rows.append(r)
+            cols.append(c)
+
+    return [(int(r), int(c)) for r, c in zip(rows, cols) if iou[r, c] > min_iou]
+
+
+# One tracked person
+class Track:
+
+    def __init__(self, track_id, box):
+
+        self.id = track_id
+        self.box = np.asarray(box, dtype="float64")     # (x, y, width, height)
+        self.velocity = np.zeros(4)                     # Change of the box per frame (constant-velocity model)
+        self.hits = 1                                   # Number of frames where this person was detected
+        self.missed = 0                                 # Frames since this person was last detected
+
+        # Last mask classification of this person (filled by the caller)
+        self.label = None
+        self.confidence = None
+
+    # Where we expect the box to be in the next frame
+    def predicted_box(self, use_velocity):
+
+        if not use_velocity:
+            return self.box
+
+        return self.box + self.velocity * (self.missed + 1)
+
+    def update(self, box):
+
+        box = np.asarray(box, dtype="float64")
+        step = (box - self.box) / (self.missed + 1)
+        self.velocity = 0.5 * self.velocity + 0.5 * step       # Smoothed velocity
+        self.box = box
+        self.hits += 1
+        self.missed = 0
+
+
+# ---------------------------------------------------------
+# IoU multi-object tracker
+# ---------------------------------------------------------
+"""
+Each frame:
+1. Compute the IoU matrix between the active tracks and the new detections (vectorized).
+2. Find the best one-to-one matching (Hungarian algorithm).
+3. Matched detections keep the ID of their track, the others get a new ID.
+4. Tracks that were not seen for more than max_age frames are removed,
+   so the cost per frame depends only on the number of people currently in front of the camera.
+
+- iou_threshold → Minimum IoU to consider it is the same person
+- max_age → Number of frames a track is kept without being detected
+- use_velocity → Predict the box with a constant-velocity model before matching (helps with fast movement)
+
+Usage:
+    tracker = Tracker()
+    ids, is_new = tracker.update([r["box"] for r in results])
+"""
+class Tracker:
+
+    def __init__(self, iou_threshold=0.35, max_age=30, use_velocity=False):
+
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.use_velocity = use_velocity
+
+        self.tracks = []
+        self.next_id = 1
+
+    # boxes → list of (x, y, width, height) of the current frame
+    # It returns (ids, is_new): the track ID of every box and whether it is a new person.
+    def update(self, boxes):
+
+        ids = [None] * len(boxes)
+        is_new = [False] * len(boxes)
+
+        # 1. + 2. Vectorized IoU and optimal matching
+        if self.tracks and len(boxes):
+            predicted = [track.predicted_box(self.use_velocity) for track in self.tracks]
+            matches = match_boxes(iou_matrix(predicted, boxes), self.iou_threshold)
+        else:
+            matches = []
+
+        matched_tracks = set()
+        for t, d in matches:
+            self.tracks[t].update(boxes[d])
+            ids[d] = self.tracks[t].id
+            matched_tracks.add(t)
+
+        # 4. Age the tracks that were not matched, and remove the old ones
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_age]
+
+        # 3. New people
+        for d, box in enumerate(boxes):
+            if ids[d] is None:
+                track = Track(self.next_id, box)
+                self.next_id += 1
+                self.tracks.append(track)
+                ids[d] = track.id
+                is_new[d] = True
+
+        return ids, is_new
+
+    # Active tracks by ID
+    def tracks_by_id(self):
+
+        return {track.id: track for track in self.tracks}
+
+    # Number of people currently tracked
+    def __len__(self):
+
+        return len(self.tracks)